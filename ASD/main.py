@@ -1,17 +1,46 @@
+import os
+import sys
+import time
 from kivy.app import App
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.label import Label
 from kivy.uix.textinput import TextInput
 from kivy.uix.button import Button
+from kivy.uix.image import Image
 from kivy.uix.scrollview import ScrollView
 from kivy.uix.screenmanager import ScreenManager, Screen
 from kivy.core.window import Window
 from kivy.clock import Clock
-from kivy_garden.matplotlib.backend_kivyagg import FigureCanvasKivyAgg
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
-import numpy as np
-import control as ctl
+from kivy.graphics.texture import Texture
+
+# Referência dos tempos de partida (janela desenhada e tela principal liberada)
+INICIO_PARTIDA = time.perf_counter()
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from nucleo_controle.aquecimento import ETAPAS_BIBLIOTECAS, aquecer, aquecer_matplotlib, aquecer_simulacao, formatar_partida
+from nucleo_controle.memoria import rss_mb
+from nucleo_controle.rastreio import rastreador
+from nucleo_controle.tarefas import Tarefa
+
+
+def importar_modulos():
+    """Importa as bibliotecas pesadas e os módulos de análise (na thread de aquecimento).
+
+    Os nomes viram globais deste módulo, como se importados no topo; a tela
+    principal só é criada depois que o aquecimento termina.
+    """
+    global plt, patches, Figure, FigureCanvasAgg, ctl
+    global identificar_curva_reacao, simular_degrau, malha_fechada_pid, simular_malha, formatar_ft, LinhaDecimada
+    import matplotlib.pyplot as plt
+    import matplotlib.patches as patches
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    import control as ctl
+    from nucleo_controle.motor import identificar_curva_reacao
+    from nucleo_controle.horizonte import simular_degrau
+    from nucleo_controle.malha_fechada import malha_fechada_pid, simular_malha
+    from nucleo_controle.formatacao import formatar_ft
+    from nucleo_controle.decimacao import LinhaDecimada
 
 def desenhar_diagrama_aberto(ax):
     ax.clear()
@@ -66,45 +95,23 @@ def desenhar_diagrama_fechado(ax):
 
     ax.text(1.2, 3, "- (feedback)", fontsize=10, color='red')
 
-def formatar_ft(num_coefs, den_coefs):
-    sobrescrito = {'0': '⁰', '1': '¹', '2': '²', '3': '³', '4': '⁴',
-                   '5': '⁵', '6': '⁶', '7': '⁷', '8': '⁸', '9': '⁹'}
-
-    def termo_str(coef, grau):
-        if abs(coef) < 1e-12:
-            return ''
-        s_coef = f"{abs(coef):.3g}" if abs(coef) != 1 or grau == 0 else ''
-        s_sinal = '-' if coef < 0 else ''
-        s_var = ''
-        if grau > 0:
-            expoente = ''.join(sobrescrito[d] for d in str(grau))
-            s_var = f"s{expoente}"
-        return f"{s_sinal}{s_coef}{s_var}"
-
-    def polinomio_str(coefs):
-        termos = []
-        grau_max = len(coefs) - 1
-        for i, c in enumerate(coefs):
-            grau = grau_max - i
-            t = termo_str(c, grau)
-            if t:
-                termos.append(t)
-        if not termos:
-            return '0'
-        s = termos[0]
-        for termo in termos[1:]:
-            if termo.startswith('-'):
-                s += ' - ' + termo[1:]
-            else:
-                s += ' + ' + termo
-        return s
-
-    num_str = polinomio_str(num_coefs)
-    den_str = polinomio_str(den_coefs)
-
-    largura = max(len(num_str), len(den_str))
-    barra = '―' * largura
-    return f"{num_str}\n{barra}\n{den_str}"
+_texturas_diagramas = {}
+
+
+def textura_diagrama(desenhar, figsize):
+    """Rasteriza um diagrama estático uma única vez e devolve a textura Kivy em cache."""
+    chave = (desenhar.__name__, figsize)
+    if chave not in _texturas_diagramas:
+        fig = Figure(figsize=figsize)
+        canvas = FigureCanvasAgg(fig)
+        desenhar(fig.subplots())
+        canvas.draw()
+        largura, altura = canvas.get_width_height()
+        textura = Texture.create(size=(largura, altura), colorfmt='rgba')
+        textura.blit_buffer(bytes(canvas.buffer_rgba()), colorfmt='rgba', bufferfmt='ubyte')
+        textura.flip_vertical()
+        _texturas_diagramas[chave] = textura
+    return _texturas_diagramas[chave]
 
 
 class MainLayout(BoxLayout):
@@ -163,7 +170,72 @@ class MainLayout(BoxLayout):
         self.resultado_scroll.add_widget(self.resultado)
         self.add_widget(self.resultado_scroll)
 
+        # Figuras e diagramas reaproveitados entre análises (evita crescimento de memória)
+        self._graficos = {}
+        self._diagramas = {}
+        self._n_analises = 0
+        self.desempenho = Label(text='', size_hint_y=None, height=30)
+        self.add_widget(self.desempenho)
+
+    def _grafico(self, chave, titulo, rotulo, tempo, resposta):
+        """Devolve o canvas do gráfico `chave`, criado na primeira análise e depois só atualizado."""
+        if chave not in self._graficos:
+            from kivy_garden.matplotlib.backend_kivyagg import FigureCanvasKivyAgg
+
+            fig, ax = plt.subplots(figsize=(12, 5))
+            # Envelope mín/máx na largura do widget, refeito quando o gráfico muda de tamanho
+            linha = LinhaDecimada(ax, [], [], label=rotulo)
+            ax.set_title(titulo)
+            ax.set_xlabel("Tempo (s)")
+            ax.set_ylabel("Saída")
+            ax.grid(True)
+            ax.legend()
+            grafico = FigureCanvasKivyAgg(fig)
+            grafico.size_hint_y = None
+            grafico.height = 300
+            self._graficos[chave] = (ax, linha, grafico)
+
+        ax, linha, grafico = self._graficos[chave]
+        linha.definir_dados(tempo, resposta)
+        ax.relim()
+        ax.autoscale_view()
+        grafico.draw_idle()
+        return grafico
+
+    def _diagrama(self, desenhar, figsize, altura):
+        if desenhar not in self._diagramas:
+            self._diagramas[desenhar] = Image(texture=textura_diagrama(desenhar, figsize),
+                                              size_hint_y=None, height=altura, allow_stretch=True)
+        return self._diagramas[desenhar]
+
+    def _atualizar_desempenho(self, inicio):
+        self._n_analises += 1
+        self.desempenho.text = (f"Análises: {self._n_analises} | última: {(time.perf_counter() - inicio) * 1000:.0f} ms"
+                                f" | memória: {rss_mb():.1f} MB")
+
+    def _painel_tempos(self):
+        """Botão que abre/fecha o tempo de cada etapa da análise; os trechos também vão para o trace."""
+        caminho = rastreador.exportar()
+        texto = rastreador.formatar_resumo() + (f"\n\nTrace: {caminho}" if caminho else "")
+        tabela = Label(text=texto, size_hint_y=None, height=0, opacity=0, halign='left', valign='top',
+                       font_name='RobotoMono-Regular')
+        tabela.bind(width=lambda instance, value: setattr(instance, 'text_size', (value, None)))
+        botao = Button(text='▸ Tempo por etapa', size_hint_y=None, height=40)
+
+        def alternar(_):
+            aberto = tabela.opacity == 0
+            tabela.texture_update()
+            tabela.height = tabela.texture_size[1] if aberto else 0
+            tabela.opacity = 1 if aberto else 0
+            botao.text = ('▾' if aberto else '▸') + ' Tempo por etapa'
+
+        botao.bind(on_press=alternar)
+        self.resultado.add_widget(botao)
+        self.resultado.add_widget(tabela)
+
     def analisar(self, instance):
+        inicio = time.perf_counter()
+        rastreador.iniciar_sessao()
         self.resultado.clear_widgets()
         try:
             entrada = self.entrada.text.strip() or 'u'
@@ -206,70 +278,42 @@ class MainLayout(BoxLayout):
             num = sys.num[0][0]  # lista dos coeficientes numerador
             den = sys.den[0][0]  # lista dos coeficientes denominador
 
-            ft_formatada_aberta = formatar_ft(num, den)
+            with rastreador.trecho("formatar_ft"):
+                ft_formatada_aberta = formatar_ft(num, den)
             self.resultado.add_widget(Label(
                 text=f"Função de Transferência (Malha Aberta):\n{ft_formatada_aberta}",
                 size_hint_y=None, height=100))
 
             # Resposta ao degrau em malha aberta
-            tempo, resposta = ctl.step_response(sys)
-            fig, ax = plt.subplots(figsize=(12, 5))
-            ax.plot(tempo, resposta, label='Malha Aberta')
-            ax.set_title("Resposta ao Degrau - Malha Aberta")
-            ax.set_xlabel("Tempo (s)")
-            ax.set_ylabel("Saída")
-            ax.grid(True)
-            ax.legend()
-            grafico1 = FigureCanvasKivyAgg(fig)
-            grafico1.size_hint_y = None
-            grafico1.height = 300
+            with rastreador.trecho("malha_aberta"):
+                tempo, resposta = simular_degrau(sys)
+            with rastreador.trecho("grafico_malha_aberta"):
+                grafico1 = self._grafico('aberta', "Resposta ao Degrau - Malha Aberta", 'Malha Aberta', tempo, resposta)
             self.resultado.add_widget(grafico1)
 
-            # Cálculo dos parâmetros L e T pelo método de Ziegler-Nichols
-            y_inf = resposta[-1]
-            dy = np.gradient(resposta, tempo)
-            idx_max = np.argmax(dy)
-            m = dy[idx_max]
-            t_inf = tempo[idx_max]
-
-            L = t_inf - resposta[idx_max] / m if m != 0 else 0.01
-            y_63 = 0.63 * y_inf
-            T_plus_L = np.interp(y_63, resposta, tempo)
-            T = T_plus_L - L
-
-            if L <= 0:
-                L = 0.01
-            if T <= 0:
-                T = 0.01
+            # Cálculo dos parâmetros L e T pelo método de Ziegler-Nichols (tangente + 63%)
+            with rastreador.trecho("curva_reacao"):
+                _, L, T = identificar_curva_reacao(tempo, resposta, metodo="63", minimo=0.01)[:3]
 
             Kp = 1.2 * T / L
             Ki = 2 * L
             Kd = 0.5 * L
 
-            pid_tf = ctl.TransferFunction([Kd, Kp, Ki], [1, 0])
-
-            sys_pid = ctl.feedback(pid_tf * sys, 1)
-
-            # FT malha fechada
-            num_pid = sys_pid.num[0][0]
-            den_pid = sys_pid.den[0][0]
+            # FT malha fechada (montada uma vez; a mesma malha é simulada abaixo)
+            malha = malha_fechada_pid(coef_u, coef_y, Kp, Ki, Kd)
+            num_pid = malha.num_referencia
+            den_pid = malha.den
             ft_formatada_fechada = formatar_ft(num_pid, den_pid)
             self.resultado.add_widget(Label(
                 text=f"Função de Transferência (Malha Fechada com PID):\n{ft_formatada_fechada}",
                 size_hint_y=None, height=100))
 
             # Resposta ao degrau em malha fechada com PID
-            t2, y2 = ctl.step_response(sys_pid)
-            fig2, ax2 = plt.subplots(figsize=(12, 5))
-            ax2.plot(t2, y2, label='Malha Fechada com PID')
-            ax2.set_title("Resposta ao Degrau - Malha Fechada (PID)")
-            ax2.set_xlabel("Tempo (s)")
-            ax2.set_ylabel("Saída")
-            ax2.grid(True)
-            ax2.legend()
-            grafico2 = FigureCanvasKivyAgg(fig2)
-            grafico2.size_hint_y = None
-            grafico2.height = 300
+            with rastreador.trecho("malha_fechada"):
+                resposta_mf = simular_malha(malha)
+            t2, y2 = resposta_mf.tempo, resposta_mf.saida
+            with rastreador.trecho("grafico_malha_fechada"):
+                grafico2 = self._grafico('fechada', "Resposta ao Degrau - Malha Fechada (PID)", 'Malha Fechada com PID', t2, y2)
             self.resultado.add_widget(grafico2)
 
             texto_parametros = (
@@ -278,6 +322,9 @@ class MainLayout(BoxLayout):
                 f"Kp = {Kp:.4f}\n"
                 f"Ki = {Ki:.4f}\n"
                 f"Kd = {Kd:.4f}\n"
+                f"Sobressinal = {resposta_mf.metricas['sobressinal']:.2f} %\n"
+                f"Tempo de acomodação = {resposta_mf.metricas['tempo_acomodacao']:.3f} s\n"
+                f"IAE = {resposta_mf.metricas['IAE']:.4f} | ISE = {resposta_mf.metricas['ISE']:.4f} | ITAE = {resposta_mf.metricas['ITAE']:.4f}\n"
             )
             label_param = Label(text=texto_parametros, size_hint_y=None, halign='left', valign='top')
             label_param.bind(size=lambda instance, value: instance.setter('text_size')(instance, value))
@@ -293,25 +340,22 @@ class MainLayout(BoxLayout):
                 height=80
             ))
 
-            # Diagramas de blocos
-            fig3, ax3 = plt.subplots(figsize=(12, 3))
-            desenhar_diagrama_aberto(ax3)
-            grafico3 = FigureCanvasKivyAgg(fig3)
-            grafico3.size_hint_y = None
-            grafico3.height = 150
+            # Diagramas de blocos (estáticos: rasterizados uma vez e mantidos como textura)
+            with rastreador.trecho("diagramas"):
+                grafico3 = self._diagrama(desenhar_diagrama_aberto, (12, 3), 150)
+                grafico4 = self._diagrama(desenhar_diagrama_fechado, (12, 4), 200)
             self.resultado.add_widget(Label(text="Diagrama de Blocos - Malha Aberta", size_hint_y=None, height=30))
             self.resultado.add_widget(grafico3)
 
-            fig4, ax4 = plt.subplots(figsize=(12, 4))
-            desenhar_diagrama_fechado(ax4)
-            grafico4 = FigureCanvasKivyAgg(fig4)
-            grafico4.size_hint_y = None
-            grafico4.height = 200
             self.resultado.add_widget(Label(text="Diagrama de Blocos - Malha Fechada com PID", size_hint_y=None, height=30))
             self.resultado.add_widget(grafico4)
 
         except Exception as e:
             self.resultado.add_widget(Label(text=f"Erro: {e}"))
+        finally:
+            self._atualizar_desempenho(inicio)
+            if rastreador.ativo:
+                self._painel_tempos()
 
 
 class SplashScreen(Screen):
@@ -341,8 +385,33 @@ class SplashScreen(Screen):
         label.bind(size=label.setter('text_size'))
         layout.add_widget(label)
 
+        self.status = Label(text="Carregando bibliotecas...", font_size=16, size_hint_y=None, height=60,
+                            color=(1, 1, 1, 1))
+        layout.add_widget(self.status)
+        self.layout = layout
+        self.botoes_falha = None
+
         self.add_widget(layout)
 
+    def mostrar_falha(self, texto, tentar, sair):
+        """Mensagem de falha do carregamento com as opções de tentar de novo ou sair."""
+        self.status.text = f"Falha ao carregar as bibliotecas de análise:\n{texto}"
+        if self.botoes_falha is None:
+            self.botoes_falha = BoxLayout(size_hint_y=None, height=50, spacing=10, padding=(10, 0))
+            botao_tentar = Button(text='Tentar novamente')
+            botao_tentar.bind(on_press=lambda _: tentar())
+            botao_sair = Button(text='Sair')
+            botao_sair.bind(on_press=lambda _: sair())
+            self.botoes_falha.add_widget(botao_tentar)
+            self.botoes_falha.add_widget(botao_sair)
+            self.layout.add_widget(self.botoes_falha)
+
+    def esconder_falha(self):
+        if self.botoes_falha is not None:
+            self.layout.remove_widget(self.botoes_falha)
+            self.botoes_falha = None
+        self.status.text = "Carregando bibliotecas..."
+
 
 class MainScreen(Screen):
     def __init__(self, **kwargs):
@@ -356,14 +425,48 @@ class SistemaApp(App):
         Window.size = (900, 900)
         self.title = "Analisador de Sistemas Dinâmicos - Desenvolvido por Tiago Carneiro"
 
-        sm = ScreenManager()
-        sm.add_widget(SplashScreen(name='splash'))
-        sm.add_widget(MainScreen(name='main'))
-
-        # Splash fica 15 segundos antes de mudar para main
-        Clock.schedule_once(lambda dt: setattr(sm, 'current', 'main'), 15)
-
-        return sm
+        self.sm = ScreenManager()
+        self.splash = SplashScreen(name='splash')
+        self.sm.add_widget(self.splash)
+
+        # Splash até o aquecimento terminar (bibliotecas importadas, primeira análise aquecida)
+        self._janela_s = None
+        Clock.schedule_once(lambda dt: setattr(self, '_janela_s', time.perf_counter() - INICIO_PARTIDA))
+        self._iniciar_aquecimento()
+
+        return self.sm
+
+    def _iniciar_aquecimento(self):
+        self.splash.esconder_falha()
+        self._erro_partida = None
+        self._aquecimento = Tarefa(self._trabalho_aquecimento).iniciar()
+        Clock.schedule_interval(self._processar_aquecimento, 1 / 30)
+
+    def _trabalho_aquecimento(self, tarefa):
+        etapas = ETAPAS_BIBLIOTECAS + (("interface", importar_modulos), ("matplotlib_fontes", aquecer_matplotlib),
+                                       ("simulacao", aquecer_simulacao))
+        progresso = lambda nome, i, total: tarefa.publicar("progresso", f"Carregando {nome} ({i + 1}/{total})...")
+        tarefa.publicar("pronto", aquecer(etapas, progresso))
+
+    def _processar_aquecimento(self, dt):
+        """Consome as mensagens do aquecimento; troca para a tela principal assim que ele termina."""
+        for tipo, dados in self._aquecimento.mensagens():
+            if tipo == "progresso":
+                self.splash.status.text = dados
+            elif tipo == "erro":
+                self._erro_partida = dados[1]
+            elif tipo == "pronto":
+                pronto_s = time.perf_counter() - INICIO_PARTIDA
+                principal = MainScreen(name='main')
+                principal.main_layout.desempenho.text = formatar_partida(dados, self._janela_s or pronto_s, pronto_s)
+                self.sm.add_widget(principal)
+                self.sm.current = 'main'
+            elif tipo == "fim":
+                # Terminou sem "pronto": fica no splash com a falha, sem esperar para sempre
+                if not self.sm.has_screen('main'):
+                    self.splash.mostrar_falha(self._erro_partida or "O carregamento terminou sem concluir.",
+                                              self._iniciar_aquecimento, self.stop)
+                return False
 
 
 if __name__ == '__main__':
@@ -1,20 +1,83 @@
 
+import os
+import sys
+import time
 import tkinter as tk
-from tkinter import ttk, messagebox, simpledialog
+from tkinter import ttk, messagebox, simpledialog, filedialog
 from io import BytesIO
-from PIL import Image, ImageTk
-import sympy as sp
-from sympy.abc import t, s
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import numpy as np
-import control as ctl
+
+# Referência dos tempos de partida (janela desenhada e análise liberada)
+INICIO_PARTIDA = time.perf_counter()
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from nucleo_controle.aquecimento import ETAPAS_BIBLIOTECAS, ETAPAS_PRIMEIRA_ANALISE, aquecer, formatar_partida
+from nucleo_controle.tarefas import Tarefa, TarefaCancelada
+from nucleo_controle.rastreio import rastreador, arquivo_rastreio_padrao
+
+
+def importar_modulos():
+    """Importa as bibliotecas pesadas e os módulos de análise (na thread de aquecimento).
+
+    Os nomes viram globais deste módulo, como se importados no topo; a
+    interface só os usa depois que o aquecimento termina.
+    """
+    global Image, ImageTk, sp, t, s, plt, FigureCanvasTkAgg, NavigationToolbar2Tk, Figure, np, ctl
+    global ganho_ultimo, margens, identificar_curva_reacao, sintonia_zn_reacao, sintonia_zn_frequencia
+    global simular_degrau, malha_fechada_pid, simular_malha, simular_malha_fechada, otimizar_pid
+    global CacheFT, diretorio_cache_padrao, AcervoRespostas, diretorio_acervo_padrao, CacheImagens
+    global ExploradorParametros, LinhaDecimada, IdentificadorStreaming, ler_blocos, sintonia_ensaio
+    from PIL import Image, ImageTk
+    import sympy as sp
+    from sympy.abc import t, s
+    import matplotlib.pyplot as plt
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+    from matplotlib.figure import Figure
+    import numpy as np
+    import control as ctl
+    from nucleo_controle.frequencia import ganho_ultimo, margens
+    from nucleo_controle.motor import identificar_curva_reacao, sintonia_zn_reacao, sintonia_zn_frequencia
+    from nucleo_controle.horizonte import simular_degrau
+    from nucleo_controle.malha_fechada import malha_fechada_pid, simular_malha, simular_malha_fechada
+    from nucleo_controle.otimizacao import otimizar_pid
+    from nucleo_controle.cache_ft import CacheFT, diretorio_cache_padrao
+    from nucleo_controle.acervo import AcervoRespostas, diretorio_acervo_padrao
+    from nucleo_controle.imagens import CacheImagens
+    from nucleo_controle.exploracao import ExploradorParametros
+    from nucleo_controle.decimacao import LinhaDecimada
+    from nucleo_controle.identificacao import IdentificadorStreaming, ler_blocos, sintonia_ensaio
+
+# --- Figuras estáticas: desenhadas numa Figure avulsa e guardadas em cache como imagem ---
+
+def desenhar_ft_malha_aberta(fig, latex_simbolica, latex_numerica):
+    if latex_simbolica is not None:
+        fig.text(0.5, 0.7, f"Simbólica (Genérica): $G(s) = {latex_simbolica}$", fontsize=16, ha="center", va="center")
+        fig.text(0.5, 0.3, f"Numérica: $G(s) = {latex_numerica}$", fontsize=16, ha="center", va="center", color="darkgreen")
+    else:
+        fig.text(0.5, 0.5, rf"$G(s) = {latex_numerica}$", fontsize=16, ha="center", va="center", color="darkgreen")
+
+def desenhar_diagrama_aberto(fig, var_u, var_y):
+    ax = fig.subplots(); ax.axis("off"); ax.set_xlim(0, 10); ax.set_ylim(0, 2)
+    ax.text(1, 1, f"${var_u.capitalize()}(s)$"); ax.arrow(1.5, 1, 2, 0, head_width=0.08, head_length=0.2, fc="k", ec="k")
+    ax.add_patch(plt.Rectangle((3.6, 0.6), 2.8, 0.8, fc="#add8e6", ec="k")); ax.text(5, 1, "G(s)", fontsize=12)
+    ax.arrow(6.4, 1, 2, 0, head_width=0.08, head_length=0.2, fc="k", ec="k"); ax.text(9, 1, f"${var_y.capitalize()}(s)$")
+
+def desenhar_ft_controlador(fig, latex_pid, latex_mf):
+    fig.text(0.5, 0.75, rf"$G_c(s) = {latex_pid}$", fontsize=14, ha="center", color="darkred"); fig.text(0.5, 0.25, rf"$G_{{MF}}(s) = {latex_mf}$", fontsize=14, ha="center", color="darkblue")
+
+def desenhar_diagrama_fechado(fig):
+    ax = fig.subplots(); ax.axis("off"); ax.set_xlim(0, 13); ax.set_ylim(-1, 2)
+    ax.text(0.5, 1, "R(s)"); ax.arrow(1, 1, 0.8, 0, head_width=0.1, head_length=0.2, fc='k', ec='k'); ax.add_patch(plt.Circle((2, 1), 0.2, fill=False, ec='k')); ax.text(2, 1, "+", ha='center', va='center'); ax.text(1.9, 0.7, "-", ha='center', va='center', fontsize=14); ax.arrow(2.2, 1, 1.1, 0, head_width=0.1, head_length=0.2, fc='k', ec='k'); ax.add_patch(plt.Rectangle((3.4, 0.6), 2.5, 0.8, fc="#f4cccc", ec="k")); ax.text(4.65, 1, r"$G_c(s)$", color="red"); ax.arrow(5.9, 1, 1.1, 0, head_width=0.1, head_length=0.2, fc='k', ec='k'); ax.add_patch(plt.Rectangle((7.1, 0.6), 2.5, 0.8, fc="#add8e6", ec="k")); ax.text(8.35, 1, r"$G(s)$", color="blue"); ax.arrow(9.6, 1, 1.2, 0, head_width=0.1, head_length=0.2, fc='k', ec='k'); ax.text(11.2, 1, "Y(s)"); ax.plot([8.35, 8.35, 2.3, 2.3], [0.6, -0.5, -0.5, 0.8], 'k-'); ax.arrow(2.3, 0.8, 0, 0.1, head_width=0.1, head_length=0.2, fc='k', ec='k')
 
 class AnalisadorDeSistemas(tk.Tk):
     def __init__(self):
         super().__init__()
         self.title("Analisador Dinâmico de Sistemas - Desenvolvido por Tiago Carneiro")
         self.geometry("1100x1000")
+        # Criados quando o aquecimento termina (dependem das bibliotecas pesadas)
+        self.cache_ft = self.cache_imagens = None
+        self._tarefa = None
+        self.acervo = None  # aberto na primeira análise com a opção de arquivar marcada
+        self.frame_ma = self.frame_mf = None
 
         # --- Estrutura com Scrollbar ---
         main_frame = ttk.Frame(self)
@@ -29,6 +92,10 @@ class AnalisadorDeSistemas(tk.Tk):
         scrollbar.pack(side="right", fill="y")
         
         self._criar_widgets()
+        self._janela_s = None
+        # Primeira chamada ociosa do laço de eventos: a janela já foi montada e desenhada
+        self.after_idle(lambda: setattr(self, "_janela_s", time.perf_counter() - INICIO_PARTIDA))
+        self._iniciar_aquecimento()
 
     def _criar_widgets(self):
         """Cria a estrutura estática da interface gráfica."""
@@ -56,8 +123,19 @@ class AnalisadorDeSistemas(tk.Tk):
         self.metodo_sintonia = tk.StringVar(value="reacao")
         ttk.Radiobutton(frame_controle, text="Curva de Reação (Z-N 1)", variable=self.metodo_sintonia, value="reacao").pack(anchor="w", padx=20)
         ttk.Radiobutton(frame_controle, text="Resposta em Frequência (Z-N 2)", variable=self.metodo_sintonia, value="frequencia").pack(anchor="w", padx=20)
+        self.otimizar_pid = tk.BooleanVar(value=False)
+        ttk.Checkbutton(frame_controle, text="Refinar os ganhos por otimização (ITAE, sobressinal ≤ 10%)", variable=self.otimizar_pid).pack(anchor="w", padx=20, pady=(5, 0))
+        self.medir_tempos = tk.BooleanVar(value=rastreador.ativo)
+        ttk.Checkbutton(frame_controle, text="Medir o tempo de cada etapa (painel no fim dos resultados + arquivo de trace)", variable=self.medir_tempos, command=self._alternar_rastreio).pack(anchor="w", padx=20)
+        self.arquivar_respostas = tk.BooleanVar(value=False)
+        self.chk_arquivar = ttk.Checkbutton(frame_controle, text="Arquivar respostas e ganhos no acervo", variable=self.arquivar_respostas); self.chk_arquivar.pack(anchor="w", padx=20)
 
-        ttk.Button(frame_controle, text="Analisar Sistema e Sintonizar PID", command=self.executar_analise, style="Accent.TButton").pack(pady=10)
+        frame_botoes = ttk.Frame(frame_controle)
+        frame_botoes.pack(pady=10)
+        self.btn_analisar = ttk.Button(frame_botoes, text="Analisar Sistema e Sintonizar PID", command=self.executar_analise, style="Accent.TButton"); self.btn_analisar.pack(side="left", padx=5)
+        self.btn_ensaio = ttk.Button(frame_botoes, text="Sintonizar por Ensaio Gravado (CSV/NPY)...", command=self.executar_ensaio); self.btn_ensaio.pack(side="left", padx=5)
+        self.btn_cancelar = ttk.Button(frame_botoes, text="Cancelar", command=self.cancelar_analise, state="disabled"); self.btn_cancelar.pack(side="left", padx=5)
+        self.lbl_status = ttk.Label(frame_controle, text=""); self.lbl_status.pack(pady=(0, 5))
         self.style = ttk.Style(self); self.style.configure("Accent.TButton", font=("", 10, "bold"))
 
         self.frame_resultados = ttk.Frame(self.area_scroll)
@@ -67,170 +145,471 @@ class AnalisadorDeSistemas(tk.Tk):
         for widget in self.frame_resultados.winfo_children(): widget.destroy()
     
     def _renderizar_figura(self, fig, parent_frame):
-        canvas = FigureCanvasTkAgg(fig, master=parent_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill="both", expand=True, padx=5, pady=5)
-        plt.close(fig)
+        with rastreador.trecho("renderizar_figura"):
+            canvas = FigureCanvasTkAgg(fig, master=parent_frame)
+            canvas.draw()
+            # Zoom e pan pela barra: as curvas decimadas (LinhaDecimada) são refeitas para o trecho visível
+            NavigationToolbar2Tk(canvas, parent_frame, pack_toolbar=False).pack(fill="x", padx=5)
+            canvas.get_tk_widget().pack(fill="both", expand=True, padx=5, pady=5)
+            plt.close(fig)
+
+    def _exibir_imagem(self, parent_frame, conteudo, desenhar, figsize, *args):
+        """Mostra a figura estática `conteudo` como imagem; só renderiza na primeira vez."""
+        foto = self.cache_imagens.obter(conteudo, lambda fig: desenhar(fig, *args), figsize)
+        rotulo = ttk.Label(parent_frame, image=foto)
+        # Referência no próprio widget: o Tk apaga a imagem se o LRU a descartar com o rótulo na tela
+        rotulo.image = foto
+        rotulo.pack(padx=5, pady=5)
+
+    def _alternar_rastreio(self):
+        rastreador.ativo = self.medir_tempos.get()
+        if rastreador.ativo and not rastreador.arquivo:
+            rastreador.arquivo = arquivo_rastreio_padrao()
 
     def executar_analise(self):
+        """Inicia a análise: a derivação simbólica roda numa thread e os resultados chegam pela fila."""
+        self.cancelar_analise()
+        self._limpar_resultados()
+        rastreador.iniciar_sessao()
+        eq_raw = self.txt_equacao.get("1.0", "end-1c").strip()
+        var_u, var_y = self.ent_entrada.get().strip() or 'u', self.ent_saida.get().strip() or 'y'
+        self._iniciar_tarefa(self._trabalho_derivacao, eq_raw, var_u, var_y)
+
+    def executar_ensaio(self):
+        """Identifica K, L, T de um ensaio ao degrau gravado (lido em blocos) e sintoniza por Z-N."""
+        caminho = filedialog.askopenfilename(parent=self, title="Ensaio ao degrau", filetypes=[("Ensaios", "*.csv *.txt *.npy"), ("Todos", "*.*")])
+        if not caminho:
+            return
+        colunas = simpledialog.askstring("Colunas do Ensaio", "Colunas de tempo, saída e entrada (nomes ou índices; sem a entrada, degrau unitário no início):", initialvalue="0, 1, 2", parent=self)
+        if colunas is None:
+            return
+        colunas = [c.strip() for c in colunas.split(",") if c.strip()]
+        if len(colunas) not in (2, 3):
+            self._exibir_erro(("Colunas Inválidas", "Informe 2 ou 3 colunas separadas por vírgula.")); return
+        self.cancelar_analise()
         self._limpar_resultados()
+        rastreador.iniciar_sessao()
+        self._iniciar_tarefa(self._trabalho_ensaio, caminho, colunas, self.otimizar_pid.get(), self._acervo_ativo())
+
+    def _acervo_ativo(self):
+        """Acervo onde a tarefa grava a resposta em malha fechada, ou None sem a opção marcada."""
+        if not self.arquivar_respostas.get():
+            return None
+        if self.acervo is None:
+            self.acervo = AcervoRespostas(diretorio_acervo_padrao())
+        return self.acervo
+
+    def cancelar_analise(self):
+        if self._tarefa is not None:
+            self._tarefa.cancelar()
+            self._tarefa = None
+            self.lbl_status.configure(text="Análise cancelada.")
+            self._alternar_botoes(ocupado=False)
+
+    def _iniciar_tarefa(self, alvo, *args):
+        self._tarefa = Tarefa(alvo, *args).iniciar()
+        self.lbl_status.configure(text="Analisando...")
+        self._alternar_botoes(ocupado=True)
+        self.after(30, self._processar_fila, self._tarefa)
+
+    def _iniciar_aquecimento(self):
+        self._iniciar_tarefa(self._trabalho_aquecimento)
+        self.lbl_status.configure(text="Carregando bibliotecas...")
+        self.btn_cancelar.configure(state="disabled")
+
+    def _alternar_botoes(self, ocupado):
+        # Sem os caches, o aquecimento ainda não terminou (ou falhou): a análise continua bloqueada
+        liberado = not ocupado and self.cache_ft is not None
+        self.btn_analisar.configure(state="normal" if liberado else "disabled")
+        self.btn_ensaio.configure(state="normal" if liberado else "disabled")
+        self.btn_cancelar.configure(state="normal" if ocupado else "disabled")
+
+    def _processar_fila(self, tarefa):
+        """Consome as mensagens da tarefa e desenha cada seção assim que fica pronta."""
+        if tarefa is not self._tarefa:
+            return
+        for tipo, dados in tarefa.mensagens():
+            if tipo == "fim":
+                if tarefa is self._tarefa:
+                    self._tarefa = None
+                    self.lbl_status.configure(text="")
+                    self._alternar_botoes(ocupado=False)
+                    self._exibir_tempos()
+                return
+            with rastreador.trecho(f"exibir_{tipo}"):
+                getattr(self, f"_exibir_{tipo}")(dados)
+            if tarefa is not self._tarefa:
+                return
+        self.after(30, self._processar_fila, tarefa)
+
+    # --- Etapas executadas na thread de trabalho ---
+
+    def _trabalho_aquecimento(self, tarefa):
+        etapas = ETAPAS_BIBLIOTECAS + (("interface", importar_modulos),) + ETAPAS_PRIMEIRA_ANALISE
+        progresso = lambda nome, i, total: tarefa.publicar("progresso_partida", f"Carregando {nome} ({i + 1}/{total})...")
         try:
-            eq_raw = self.txt_equacao.get("1.0", "end-1c").strip()
-            var_u, var_y = self.ent_entrada.get().strip() or 'u', self.ent_saida.get().strip() or 'y'
-            if not eq_raw: raise ValueError("O campo da equação está vazio.")
-
-            u_func, y_func = sp.Function(var_u)(t), sp.Function(var_y)(t)
-            U_s, Y_s = sp.symbols(f"{var_u.capitalize()}(s) {var_y.capitalize()}(s)")
-            
-            lado_esq_str, lado_dir_str = (eq_raw.split("=") if "=" in eq_raw else (eq_raw, "0"))
-            lado_esq = sp.sympify(lado_esq_str, locals={"diff": sp.diff})
-            lado_dir = sp.sympify(lado_dir_str, locals={"diff": sp.diff})
-
-            def aplicar_laplace(expr):
-                res = expr
-                for T_func, S_var in [(y_func, Y_s), (u_func, U_s)]:
-                    for ordem in range(10, -1, -1):
-                        res = res.replace(sp.Derivative(T_func, (t, ordem)), s**ordem * S_var) if ordem > 0 else res.replace(T_func, S_var)
-                return res
-            
-            eq_s = sp.Eq(aplicar_laplace(lado_esq), aplicar_laplace(lado_dir))
-            sol = sp.solve(eq_s, Y_s)
-            if not sol: raise ValueError("Não foi possível isolar a variável de saída Y(s).")
-            Gs_simbolica = sp.cancel(sol[0] / U_s)
-
-            simbolos = sorted(Gs_simbolica.free_symbols - {s}, key=str)
-            valores = {}
-            if simbolos:
-                for p in simbolos:
-                    valor_str = simpledialog.askstring("Entrada de Parâmetro", f"Digite o valor numérico para '{p}':", parent=self)
-                    if valor_str is None: raise ValueError("Análise cancelada pelo usuário.")
-                    valores[p] = float(valor_str.replace(",", "."))
-            
+            tempos = aquecer(etapas, progresso, tarefa.verificar)
+        except TarefaCancelada:
+            raise
+        except Exception as e:
+            tarefa.publicar("falha_partida", f"{type(e).__name__}: {e}"); return
+        tarefa.publicar("partida", tempos)
+
+    def _trabalho_derivacao(self, tarefa, eq_raw, var_u, var_y):
+        # Derivação simbólica reaproveitada enquanto o texto da equação não mudar
+        with rastreador.trecho("derivacao", equacao=eq_raw):
+            entrada_ft = self.cache_ft.obter(eq_raw, var_u, var_y)
+        tarefa.verificar()
+        tarefa.publicar("ft_simbolica", (entrada_ft, var_u, var_y))
+
+    def _trabalho_analise(self, tarefa, entrada_ft, valores, var_u, var_y, metodo, otimizar=False, acervo=None):
+        Gs_simbolica, simbolos = entrada_ft.Gs_simbolica, entrada_ft.simbolos
+        with rastreador.trecho("coeficientes"):
+            num_c, den_c = entrada_ft.coeficientes(valores)
             Gs_numerica = Gs_simbolica.subs(valores)
-            num_c, den_c = [float(c) for c in sp.Poly(sp.numer(Gs_numerica), s).all_coeffs()], [float(c) for c in sp.Poly(sp.denom(Gs_numerica), s).all_coeffs()]
             sistema_ma = ctl.TransferFunction(num_c, den_c)
+        with rastreador.trecho("latex"):
+            latex = {"latex_simbolica": sp.latex(Gs_simbolica) if simbolos else None, "latex_numerica": sp.latex(Gs_numerica)}
+        tarefa.publicar("malha_aberta", dict(latex, var_u=var_u, var_y=var_y))
+        tarefa.verificar()
 
-            frame_ma = ttk.LabelFrame(self.frame_resultados, text="Resultados - Malha Aberta")
-            frame_ma.pack(fill="x", pady=5)
-            
-            fig_ft = plt.figure(figsize=(8, 3)); plt.axis("off")
-            if simbolos:
-                fig_ft.text(0.5, 0.7, f"Simbólica (Genérica): $G(s) = {sp.latex(Gs_simbolica)}$", fontsize=16, ha="center", va="center")
-                fig_ft.text(0.5, 0.3, f"Numérica: $G(s) = {sp.latex(Gs_numerica)}$", fontsize=16, ha="center", va="center", color="darkgreen")
-            else:
-                fig_ft.text(0.5, 0.5, rf"$G(s) = {sp.latex(Gs_numerica)}$", fontsize=16, ha="center", va="center", color="darkgreen")
-            self._renderizar_figura(fig_ft, frame_ma)
-            
-            fig_diag, ax = plt.subplots(figsize=(7, 1.5)); ax.axis("off"); ax.set_xlim(0, 10); ax.set_ylim(0, 2)
-            ax.text(1, 1, f"${var_u.capitalize()}(s)$"); ax.arrow(1.5, 1, 2, 0, head_width=0.08, head_length=0.2, fc="k", ec="k")
-            ax.add_patch(plt.Rectangle((3.6, 0.6), 2.8, 0.8, fc="#add8e6", ec="k")); ax.text(5, 1, "G(s)", fontsize=12)
-            ax.arrow(6.4, 1, 2, 0, head_width=0.08, head_length=0.2, fc="k", ec="k"); ax.text(9, 1, f"${var_y.capitalize()}(s)$")
-            self._renderizar_figura(fig_diag, frame_ma)
-            
-            polos = sistema_ma.poles()
-            if np.any(np.real(polos) > 0):
-                messagebox.showerror("Sistema Instável", "O sistema em malha aberta é INSTÁVEL. Os métodos de sintonia não serão aplicados."); return
-
-            frame_mf = ttk.LabelFrame(self.frame_resultados, text="Resultados - Controle PID e Malha Fechada")
-            frame_mf.pack(fill="x", pady=5)
-
-            if self.metodo_sintonia.get() == "reacao":
-                self.sintonia_curva_reacao(sistema_ma, Gs_numerica, frame_ma, frame_mf)
+        polos = sistema_ma.poles()
+        if np.any(np.real(polos) > 0):
+            tarefa.publicar("erro", ("Sistema Instável", "O sistema em malha aberta é INSTÁVEL. Os métodos de sintonia não serão aplicados.")); return
+
+        with rastreador.trecho(f"sintonia_{metodo}"):
+            if metodo == "reacao":
+                ganhos = self.sintonia_curva_reacao(tarefa, sistema_ma)
             else:
-                self.sintonia_resposta_frequencia(sistema_ma, Gs_numerica, frame_mf)
+                ganhos = self.sintonia_resposta_frequencia(tarefa, sistema_ma)
+        if ganhos is None:
+            return
+        tarefa.verificar()
+        with rastreador.trecho("malha_fechada"):
+            resposta_zn = self.calcular_resultados_finais(tarefa, sistema_ma, *ganhos)
+        if acervo is not None:
+            self._arquivar(acervo, sistema_ma, ganhos, resposta_zn)
+        if simbolos:
+            tarefa.publicar("exploracao", ExploradorParametros(entrada_ft, valores, *ganhos, resposta_zn.tempo))
+        if otimizar:
+            tarefa.verificar()
+            with rastreador.trecho("otimizacao"):
+                self.sintonia_otimizada(tarefa, sistema_ma, ganhos, resposta_zn)
 
+    def _trabalho_ensaio(self, tarefa, caminho, colunas, otimizar=False, acervo=None):
+        identificador = IdentificadorStreaming(entrada_presente=len(colunas) == 3)
+        try:
+            with rastreador.trecho("identificar_arquivo", arquivo=caminho):
+                for t_bloco, y_bloco, u_bloco in ler_blocos(caminho, *colunas):
+                    identificador.alimentar(t_bloco, y_bloco, u_bloco)
+                    tarefa.verificar()
+            # Tangente para referência; o modelo de 28%/63% (menos sensível ao ruído) vai para a sintonia
+            tangente, ensaio = identificador.resultado("tangente"), identificador.resultado("28_63")
+        except (OSError, ValueError) as e:
+            tarefa.publicar("erro", ("Erro no Ensaio", f"Não foi possível identificar o modelo:\n{e}")); return
+        tarefa.publicar("ensaio", {"caminho": caminho, "ensaio": ensaio, "tangente": tangente})
+        tarefa.publicar("curva_reacao", {"tempo": ensaio.tempo, "resposta": ensaio.resposta, "K": ensaio.K, "L": ensaio.L, "T": ensaio.T})
+
+        # Modelo K·e^(-Ls)/(Ts + 1), com o atraso por Padé, para a malha fechada e as margens
+        num_pade, den_pade = ctl.pade(ensaio.L, 3)
+        sistema_ma = ctl.TransferFunction([ensaio.K], [ensaio.T, 1]) * ctl.TransferFunction(num_pade, den_pade)
+        ganhos = sintonia_ensaio(ensaio)
+        tarefa.verificar()
+        with rastreador.trecho("malha_fechada"):
+            resposta_zn = self.calcular_resultados_finais(tarefa, sistema_ma, *ganhos)
+        if acervo is not None:
+            self._arquivar(acervo, sistema_ma, ganhos, resposta_zn, K=ensaio.K, L=ensaio.L, T=ensaio.T)
+        if otimizar:
+            tarefa.verificar()
+            with rastreador.trecho("otimizacao"):
+                self.sintonia_otimizada(tarefa, sistema_ma, ganhos, resposta_zn)
+
+    def _arquivar(self, acervo, sistema_ma, ganhos, resposta, **identificacao):
+        with rastreador.trecho("arquivar"):
+            acervo.anexar_resposta(resposta, *ganhos, sistema_ma.num[0][0], sistema_ma.den[0][0], **identificacao)
+            acervo.sincronizar()
+
+    def sintonia_curva_reacao(self, tarefa, sistema_ma):
+        tempo, resposta = simular_degrau(sistema_ma)
+        try:
+            K, L, T = identificar_curva_reacao(tempo, resposta)[:3]
+        except ValueError as e:
+            tarefa.publicar("curva_reacao", {"tempo": tempo, "resposta": resposta})
+            tarefa.publicar("aviso", ("Análise Interrompida", str(e))); return None
+
+        tarefa.publicar("curva_reacao", {"tempo": tempo, "resposta": resposta, "K": K, "L": L, "T": T})
+        return sintonia_zn_reacao(K, L, T)
+    
+    def sintonia_resposta_frequencia(self, tarefa, sistema_ma):
+        try:
+            # Cruzamento exato com o eixo imaginário, calculado a partir dos polinômios
+            ponto = ganho_ultimo(sistema_ma.num[0][0], sistema_ma.den[0][0])
+            if ponto is None or ponto.Ku <= 1:
+                tarefa.publicar("aviso", ("Método Inaplicável", "O sistema não possui uma margem de ganho > 1. O método Z-N 2 não é aplicável."))
+                return None
+
+            Ku, Pu = ponto.Ku, ponto.Pu
+            tarefa.publicar("frequencia", {"Ku": Ku, "Pu": Pu})
+            return sintonia_zn_frequencia(Ku, Pu)
         except Exception as e:
-            messagebox.showerror("Erro Durante a Análise", f"Ocorreu um erro: {e}")
+            tarefa.publicar("erro", ("Erro no Método 2", f"Ocorreu um erro inesperado durante a sintonia por resposta em frequência:\n{e}"))
+            return None
+
+    def calcular_resultados_finais(self, tarefa, sistema_ma, Kp, Ki, Kd):
+        # Uma única montagem da malha: os mesmos polinômios servem para o LaTeX e para a simulação
+        malha = malha_fechada_pid(sistema_ma.num[0][0], sistema_ma.den[0][0], Kp, Ki, Kd)
+        with rastreador.trecho("latex"):
+            mf_simbolica = sp.Poly(malha.num_referencia, s) / sp.Poly(malha.den, s)
+            pid_simbolico = sp.Poly(malha.num_pid, s) / sp.Poly(malha.den_pid, s)
+            latex = {"latex_pid": sp.latex(sp.N(pid_simbolico, 3)), "latex_mf": sp.latex(sp.N(mf_simbolica, 3))}
+        tarefa.publicar("controlador", dict(latex, Kp=Kp, Ki=Ki, Kd=Kd))
+        tarefa.verificar()
+
+        # Referência, perturbação e esforço de controle saem da mesma integração
+        resposta = simular_malha(malha)
+        # Margens exatas da malha aberta C(s)G(s) com os ganhos sintonizados
+        margens_malha = margens(np.polymul(malha.num_pid, sistema_ma.num[0][0]), np.polymul(malha.den_pid, sistema_ma.den[0][0]))
+        tarefa.publicar("resposta_mf", {"tempo": resposta.tempo, "resposta": resposta.saida,
+                                        "controle": resposta.controle, "metricas": resposta.metricas, "margens": margens_malha})
+        tarefa.verificar()
+        tarefa.publicar("perturbacao", {"tempo": resposta.tempo, "resposta": resposta.perturbacao})
+        return resposta
 
-    def sintonia_curva_reacao(self, sistema_ma, Gs_numerica, frame_ma, frame_mf):
-        t_sim = np.linspace(0, 75, 2000)
-        tempo, resposta = ctl.step_response(sistema_ma, T=t_sim)
-        fig_resp_ma, ax_ma = plt.subplots(figsize=(8, 4)); ax_ma.plot(tempo, resposta, label="Saída")
+    def sintonia_otimizada(self, tarefa, sistema_ma, ganhos_zn, resposta_zn):
+        num, den = sistema_ma.num[0][0], sistema_ma.den[0][0]
+        otimo = otimizar_pid(num, den, ganhos_zn)
+        if not np.isfinite(otimo.custo):
+            tarefa.publicar("aviso", ("Otimização Inconclusiva", "Nenhum candidato estável foi encontrado; mantidos os ganhos de Ziegler-Nichols.")); return
+        tarefa.verificar()
+        resposta = simular_malha_fechada(num, den, otimo.Kp, otimo.Ki, otimo.Kd)
+        tarefa.publicar("otimizacao", {"zn": (ganhos_zn, resposta_zn), "otimo": ((otimo.Kp, otimo.Ki, otimo.Kd), resposta),
+                                       "avaliacoes": otimo.avaliacoes, "segundos": otimo.segundos})
+
+    # --- Seções desenhadas na thread principal ---
+
+    def _exibir_ft_simbolica(self, dados):
+        entrada_ft, var_u, var_y = dados
+        valores = {}
+        for p in entrada_ft.simbolos:
+            with rastreador.trecho("dialogo_parametro", parametro=p):
+                valor_str = simpledialog.askstring("Entrada de Parâmetro", f"Digite o valor numérico para '{p}':", parent=self)
+            if valor_str is None:
+                self._exibir_erro(("Erro Durante a Análise", "Ocorreu um erro: Análise cancelada pelo usuário.")); self.cancelar_analise(); return
+            try:
+                valores[p] = float(valor_str.replace(",", "."))
+            except ValueError as e:
+                self._exibir_erro(("Erro Durante a Análise", f"Ocorreu um erro: {e}")); self.cancelar_analise(); return
+        self._iniciar_tarefa(self._trabalho_analise, entrada_ft, valores, var_u, var_y, self.metodo_sintonia.get(), self.otimizar_pid.get(), self._acervo_ativo())
+
+    def _exibir_progresso_partida(self, texto):
+        self.lbl_status.configure(text=texto)
+
+    def _exibir_partida(self, tempos):
+        self.cache_ft = CacheFT(diretorio=diretorio_cache_padrao())
+        # Equações e diagramas já renderizados (PNG -> PhotoImage), reaproveitados entre análises
+        self.cache_imagens = CacheImagens(capacidade=64, converter=lambda png: ImageTk.PhotoImage(Image.open(BytesIO(png)), master=self))
+        self.chk_arquivar.configure(text=f"Arquivar respostas e ganhos no acervo ({diretorio_acervo_padrao()})")
+        pronto_s = time.perf_counter() - INICIO_PARTIDA
+        ttk.Label(self.frame_resultados, text=formatar_partida(tempos, self._janela_s or pronto_s, pronto_s), foreground="gray").pack(anchor="w")
+
+    def _exibir_falha_partida(self, texto):
+        if messagebox.askretrycancel("Falha ao Carregar", f"Não foi possível carregar as bibliotecas de análise:\n{texto}\n\nTentar novamente? (Cancelar fecha o programa)", parent=self):
+            self._iniciar_aquecimento()
+        else:
+            self._tarefa = None
+            self.destroy()
+
+    def _exibir_erro(self, dados):
+        messagebox.showerror(*dados)
+
+    def _exibir_aviso(self, dados):
+        messagebox.showwarning(*dados)
+
+    def _exibir_malha_aberta(self, dados):
+        var_u, var_y = dados["var_u"], dados["var_y"]
+        self.frame_ma = ttk.LabelFrame(self.frame_resultados, text="Resultados - Malha Aberta")
+        self.frame_ma.pack(fill="x", pady=5)
+
+        latex = (dados["latex_simbolica"], dados["latex_numerica"])
+        self._exibir_imagem(self.frame_ma, ("ft_malha_aberta",) + latex, desenhar_ft_malha_aberta, (8, 3), *latex)
+        self._exibir_imagem(self.frame_ma, ("diagrama_aberto", var_u, var_y), desenhar_diagrama_aberto, (7, 1.5), var_u, var_y)
+
+        self.frame_mf = None
+
+    def _exibir_ensaio(self, dados):
+        ensaio, tangente = dados["ensaio"], dados["tangente"]
+        self.frame_ma = ttk.LabelFrame(self.frame_resultados, text=f"Resultados - Ensaio ao Degrau ({os.path.basename(dados['caminho'])})")
+        self.frame_ma.pack(fill="x", pady=5)
+        texto = (f"{ensaio.amostras} amostras | degrau em t = {ensaio.t_degrau:.3f} s, amplitude {ensaio.amplitude:.3f} | "
+                 f"saída {ensaio.y_inicial:.3f} -> {ensaio.y_final:.3f}\n"
+                 f"Tangente: K = {tangente.K:.3f} | L = {tangente.L:.3f} s | T = {tangente.T:.3f} s      "
+                 f"28%/63% (usado na sintonia): L = {ensaio.L:.3f} s | T = {ensaio.T:.3f} s")
+        ttk.Label(self.frame_ma, text=texto, justify="left").pack(padx=5, pady=5)
+        self.frame_mf = None
+
+    def _frame_malha_fechada(self):
+        if self.frame_mf is None:
+            self.frame_mf = ttk.LabelFrame(self.frame_resultados, text="Resultados - Controle PID e Malha Fechada")
+            self.frame_mf.pack(fill="x", pady=5)
+        return self.frame_mf
+
+    def _exibir_curva_reacao(self, dados):
+        tempo, resposta = dados["tempo"], dados["resposta"]
+        fig_resp_ma, ax_ma = plt.subplots(figsize=(8, 4)); LinhaDecimada(ax_ma, tempo, resposta, label="Saída")
         ax_ma.set_title("Resposta ao Degrau em Malha Aberta"); ax_ma.set_xlabel("Tempo (s)"); ax_ma.set_ylabel("Amplitude"); ax_ma.grid(True)
-        
-        y_final = resposta[-1]
-        dy, idx_inf = np.gradient(resposta, tempo), np.argmax(np.gradient(resposta, tempo))
-        t_inf, y_inf, m = tempo[idx_inf], resposta[idx_inf], dy[idx_inf]
-        if m < 1e-6:
-            messagebox.showwarning("Análise Interrompida", "A inclinação da curva é muito baixa para este método."); self._renderizar_figura(fig_resp_ma, frame_ma); return
-        
-        K, L, T = y_final, t_inf - y_inf / m, y_final / m
-        if L <= 0: L = 1e-4
-        
+        if "K" not in dados:
+            self._renderizar_figura(fig_resp_ma, self.frame_ma); return
+
+        K, L, T = dados["K"], dados["L"], dados["T"]
         t_reta = np.array([L, L + T]); y_reta = np.array([0, K])
         ax_ma.plot(t_reta, y_reta, 'r--', label="Tangente (Z-N)"); ax_ma.legend()
-        self._renderizar_figura(fig_resp_ma, frame_ma)
+        self._renderizar_figura(fig_resp_ma, self.frame_ma)
 
         texto_analise = f"Parâmetros da Curva: K = {K:.3f} | L = {L:.3f} s | T = {T:.3f} s"
-        ttk.Label(frame_mf, text=texto_analise, font=("", 10, "bold")).pack(pady=5)
+        ttk.Label(self._frame_malha_fechada(), text=texto_analise, font=("", 10, "bold")).pack(pady=5)
 
-        Kp, Ki, Kd = (1.2 * T / L), (1.2 * T / L) / (2 * L), (1.2 * T / L) * (0.5 * L)
-        self.exibir_resultados_finais(sistema_ma, Gs_numerica, Kp, Ki, Kd, frame_mf)
-    
-    def sintonia_resposta_frequencia(self, sistema_ma, Gs_numerica, frame_mf):
-        try:
-            gm, _, _, wc = ctl.margin(sistema_ma)
-            
-            Ku = gm
-            if Ku <= 1 or not np.isfinite(Ku):
-                messagebox.showwarning("Método Inaplicável", "O sistema não possui uma margem de ganho > 1. O método Z-N 2 não é aplicável.")
-                return
+    def _exibir_frequencia(self, dados):
+        texto_analise = f"Parâmetros de Frequência: Ganho Último (Ku) = {dados['Ku']:.3f} | Período Último (Pu) = {dados['Pu']:.3f} s"
+        ttk.Label(self._frame_malha_fechada(), text=texto_analise, font=("", 10, "bold")).pack(pady=5)
 
-            if not np.isfinite(wc) or wc <= 0:
-                den_ma, num_ma = sistema_ma.den[0][0], sistema_ma.num[0][0]
-                char_poly_coeffs = den_ma + Ku * num_ma
-                polos_mf = np.roots(char_poly_coeffs)
-                
-                wc_calc = 0
-                for p in polos_mf:
-                    if abs(np.real(p)) < 1e-5 and np.imag(p) > 0:
-                        wc_calc = np.imag(p)
-                        break
-                if wc_calc == 0:
-                    raise ValueError(f"Não foi possível calcular a frequência de oscilação para Ku={Ku:.3f}.")
-                wc = wc_calc
-            
-            Pu = 2 * np.pi / wc
-            texto_analise = f"Parâmetros de Frequência: Ganho Último (Ku) = {Ku:.3f} | Período Último (Pu) = {Pu:.3f} s"
-            ttk.Label(frame_mf, text=texto_analise, font=("", 10, "bold")).pack(pady=5)
-            
-            Kp, Ki, Kd = 0.6 * Ku, (0.6 * Ku) / (0.5 * Pu), (0.6 * Ku) * (0.125 * Pu)
-            self.exibir_resultados_finais(sistema_ma, Gs_numerica, Kp, Ki, Kd, frame_mf)
-        except Exception as e:
-            messagebox.showerror("Erro no Método 2", f"Ocorreu um erro inesperado durante a sintonia por resposta em frequência:\n{e}")
-
-    def exibir_resultados_finais(self, sistema_ma, Gs_numerica, Kp, Ki, Kd, frame_mf):
-        texto_pid = f"Ganhos do Controlador: Kp = {Kp:.3f} | Ki = {Ki:.3f} | Kd = {Kd:.3f}"
+    def _exibir_controlador(self, dados):
+        frame_mf = self._frame_malha_fechada()
+        texto_pid = f"Ganhos do Controlador: Kp = {dados['Kp']:.3f} | Ki = {dados['Ki']:.3f} | Kd = {dados['Kd']:.3f}"
         ttk.Label(frame_mf, text=texto_pid, font=("", 10, "bold"), foreground="darkgreen").pack(pady=5)
-        
-        pid_numerico = ctl.TransferFunction([Kd, Kp, Ki], [1, 0])
-        sistema_mf = ctl.feedback(pid_numerico * sistema_ma, 1)
-
-        num_g, den_g = np.array(sistema_ma.num[0][0]), np.array(sistema_ma.den[0][0])
-        num_c, den_c = np.array(pid_numerico.num[0][0]), np.array(pid_numerico.den[0][0])
-        num_L = np.polymul(num_c, num_g); den_L = np.polymul(den_c, den_g)
-        den_MF = np.polyadd(den_L, num_L); num_MF = num_L
-        mf_simbolica = sp.Poly(num_MF, s) / sp.Poly(den_MF, s)
-        pid_simbolico = sp.Poly(num_c, s) / sp.Poly(den_c, s)
-
-        fig_ft_mf = plt.figure(figsize=(8, 3)); fig_ft_mf.text(0.5, 0.75, rf"$G_c(s) = {sp.latex(sp.N(pid_simbolico, 3))}$", fontsize=14, ha="center", color="darkred"); fig_ft_mf.text(0.5, 0.25, rf"$G_{{MF}}(s) = {sp.latex(sp.N(mf_simbolica, 3))}$", fontsize=14, ha="center", color="darkblue")
-        self._renderizar_figura(fig_ft_mf, frame_mf)
-        
-        fig_diag_mf, ax = plt.subplots(figsize=(9, 2)); ax.axis("off"); ax.set_xlim(0, 13); ax.set_ylim(-1, 2)
-        ax.text(0.5, 1, "R(s)"); ax.arrow(1, 1, 0.8, 0, head_width=0.1, head_length=0.2, fc='k', ec='k'); ax.add_patch(plt.Circle((2, 1), 0.2, fill=False, ec='k')); ax.text(2, 1, "+", ha='center', va='center'); ax.text(1.9, 0.7, "-", ha='center', va='center', fontsize=14); ax.arrow(2.2, 1, 1.1, 0, head_width=0.1, head_length=0.2, fc='k', ec='k'); ax.add_patch(plt.Rectangle((3.4, 0.6), 2.5, 0.8, fc="#f4cccc", ec="k")); ax.text(4.65, 1, r"$G_c(s)$", color="red"); ax.arrow(5.9, 1, 1.1, 0, head_width=0.1, head_length=0.2, fc='k', ec='k'); ax.add_patch(plt.Rectangle((7.1, 0.6), 2.5, 0.8, fc="#add8e6", ec="k")); ax.text(8.35, 1, r"$G(s)$", color="blue"); ax.arrow(9.6, 1, 1.2, 0, head_width=0.1, head_length=0.2, fc='k', ec='k'); ax.text(11.2, 1, "Y(s)"); ax.plot([8.35, 8.35, 2.3, 2.3], [0.6, -0.5, -0.5, 0.8], 'k-'); ax.arrow(2.3, 0.8, 0, 0.1, head_width=0.1, head_length=0.2, fc='k', ec='k')
-        self._renderizar_figura(fig_diag_mf, frame_mf)
-        
 
-        t_sim = np.linspace(0, 75, 2000)
-        tempo_mf, resposta_mf = ctl.step_response(sistema_mf, T=t_sim)
-        fig_resp_mf, ax_mf = plt.subplots(figsize=(8, 4)); ax_mf.plot(tempo_mf, resposta_mf, label="Saída com PID"); ax_mf.axhline(1, color='r', linestyle='--', label='Setpoint'); ax_mf.set_title("Resposta ao Degrau no Setpoint (Malha Fechada)"); ax_mf.set_xlabel("Tempo (s)"); ax_mf.set_ylabel("Amplitude"); ax_mf.grid(True); ax_mf.legend()
+        latex = (dados["latex_pid"], dados["latex_mf"])
+        self._exibir_imagem(frame_mf, ("ft_controlador",) + latex, desenhar_ft_controlador, (8, 3), *latex)
+        self._exibir_imagem(frame_mf, ("diagrama_fechado",), desenhar_diagrama_fechado, (9, 2))
+
+    def _exibir_resposta_mf(self, dados):
+        tempo_mf, resposta_mf = dados["tempo"], dados["resposta"]
+        fig_resp_mf, ax_mf = plt.subplots(figsize=(8, 4)); LinhaDecimada(ax_mf, tempo_mf, resposta_mf, label="Saída com PID"); ax_mf.axhline(1, color='r', linestyle='--', label='Setpoint'); ax_mf.set_title("Resposta ao Degrau no Setpoint (Malha Fechada)"); ax_mf.set_xlabel("Tempo (s)"); ax_mf.set_ylabel("Amplitude"); ax_mf.grid(True)
+        ax_u = ax_mf.twinx(); LinhaDecimada(ax_u, tempo_mf, dados["controle"], color='green', alpha=0.6, label="Esforço u(t)"); ax_u.set_ylabel("u(t)")
+        linhas, rotulos = ax_mf.get_legend_handles_labels(); linhas_u, rotulos_u = ax_u.get_legend_handles_labels(); ax_mf.legend(linhas + linhas_u, rotulos + rotulos_u)
+        frame_mf = self._frame_malha_fechada()
         self._renderizar_figura(fig_resp_mf, frame_mf)
 
-        tf_pert = sistema_ma / (1 + pid_numerico * sistema_ma)
-        t_pert, r_pert = ctl.step_response(tf_pert, T=t_sim)
-        fig_pert, ax_pert = plt.subplots(figsize=(8, 4)); ax_pert.plot(t_pert, r_pert, label="Desvio na Saída", color='orange')
+        m = dados["metricas"]
+        texto_metricas = (f"Sobressinal = {m['sobressinal']:.1f} % | Subida = {m['tempo_subida']:.3f} s | Acomodação (2%) = {m['tempo_acomodacao']:.3f} s\n"
+                          f"IAE = {m['IAE']:.3f} | ISE = {m['ISE']:.3f} | ITAE = {m['ITAE']:.3f} | IAE perturbação = {m['IAE_perturbacao']:.3f}\n"
+                          f"Margem de ganho = {20 * np.log10(dados['margens'].ganho):.2f} dB | Margem de fase = {dados['margens'].fase:.1f}° "
+                          f"(ωc = {dados['margens'].w_c:.3f} rad/s) | Margem de atraso = {dados['margens'].atraso:.3f} s")
+        ttk.Label(frame_mf, text=texto_metricas, font=("", 10), justify="center").pack(pady=5)
+
+    def _exibir_perturbacao(self, dados):
+        t_pert, r_pert = dados["tempo"], dados["resposta"]
+        fig_pert, ax_pert = plt.subplots(figsize=(8, 4)); LinhaDecimada(ax_pert, t_pert, r_pert, label="Desvio na Saída", color='orange')
         ax_pert.set_title("Rejeição a Perturbação em Degrau na Entrada da Planta"); ax_pert.set_xlabel("Tempo (s)"); ax_pert.set_ylabel("Amplitude do Desvio"); ax_pert.grid(True); ax_pert.legend()
-        self._renderizar_figura(fig_pert, frame_mf)
+        self._renderizar_figura(fig_pert, self._frame_malha_fechada())
+
+    def _exibir_exploracao(self, explorador):
+        """Um controle deslizante por parâmetro; as respostas são atualizadas no lugar, com blitting."""
+        frame_exp = ttk.LabelFrame(self.frame_resultados, text="Exploração dos Parâmetros (ganhos do PID fixos)")
+        frame_exp.pack(fill="x", pady=5)
+
+        resposta = explorador.simular()
+        fig = Figure(figsize=(10, 3.5))
+        ax_y, ax_d = fig.subplots(1, 2)
+        linha_y, = ax_y.plot(resposta.tempo, resposta.saida, animated=True); ax_y.axhline(1, color='r', linestyle='--')
+        linha_d, = ax_d.plot(resposta.tempo, resposta.perturbacao, color='orange', animated=True)
+        ax_y.set_title("Degrau no Setpoint"); ax_d.set_title("Perturbação na Entrada da Planta")
+        for ax in (ax_y, ax_d):
+            ax.set_xlabel("Tempo (s)"); ax.grid(True); ax.set_xlim(resposta.tempo[0], resposta.tempo[-1])
+        fig.tight_layout()
+        canvas = FigureCanvasTkAgg(fig, master=frame_exp)
+        canvas.get_tk_widget().pack(fill="both", expand=True, padx=5, pady=5)
+        lbl_info = ttk.Label(frame_exp, text=""); lbl_info.pack()
+
+        estado = {"fundo": None, "pendente": False, "ms": None}
+        def ajustar_limites(saida, perturbacao):
+            # Limites com folga: só mudam (e forçam redesenho completo) se a resposta sair deles
+            mudou = False
+            for ax, dados_eixo in ((ax_y, saida), (ax_d, perturbacao)):
+                finitos = dados_eixo[np.isfinite(dados_eixo)]
+                baixo, alto = (min(finitos.min(), 0.0), max(finitos.max(), 1e-6)) if len(finitos) else (-1.0, 1.0)
+                y0, y1 = ax.get_ylim()
+                if baixo < y0 or alto > y1 or estado["fundo"] is None:
+                    folga = 0.25 * (alto - baixo)
+                    ax.set_ylim(baixo - folga, alto + folga); mudou = True
+            return mudou
+        def desenhar_linhas(_evento=None):
+            estado["fundo"] = canvas.copy_from_bbox(fig.bbox)
+            ax_y.draw_artist(linha_y); ax_d.draw_artist(linha_d); canvas.blit(fig.bbox)
+        canvas.mpl_connect("draw_event", desenhar_linhas)
+        ajustar_limites(resposta.saida, resposta.perturbacao)
+        canvas.draw()
+
+        def atualizar():
+            estado["pendente"] = False
+            inicio = time.perf_counter()
+            resposta = explorador.simular(**{nome: var.get() for nome, var in variaveis.items()})
+            linha_y.set_ydata(resposta.saida); linha_d.set_ydata(resposta.perturbacao)
+            if ajustar_limites(resposta.saida, resposta.perturbacao) or estado["fundo"] is None:
+                canvas.draw()
+            else:
+                canvas.restore_region(estado["fundo"]); ax_y.draw_artist(linha_y); ax_d.draw_artist(linha_d); canvas.blit(fig.bbox)
+            ms = (time.perf_counter() - inicio) * 1000
+            estado["ms"] = ms if estado["ms"] is None else 0.8 * estado["ms"] + 0.2 * ms
+            m = resposta.metricas
+            lbl_info.configure(text=f"Sobressinal = {m['sobressinal']:.1f} % | Acomodação (2%) = {m['tempo_acomodacao']:.3f} s | "
+                                    f"ITAE = {m['ITAE']:.3f} || atualização: {estado['ms']:.1f} ms ({1000 / estado['ms']:.0f} quadros/s)")
+        def agendar(*_):
+            # Vários eventos do controle entre dois quadros viram uma única simulação
+            if not estado["pendente"]:
+                estado["pendente"] = True
+                self.after_idle(atualizar)
+
+        variaveis = {}
+        frame_sliders = ttk.Frame(frame_exp); frame_sliders.pack(fill="x", padx=10, pady=5)
+        for i, (nome, (minimo, maximo)) in enumerate(explorador.faixas().items()):
+            variaveis[nome] = tk.DoubleVar(value=explorador.valores[nome])
+            ttk.Label(frame_sliders, text=f"{nome}:").grid(row=i, column=0, sticky="e")
+            ttk.Scale(frame_sliders, from_=minimo, to=maximo, variable=variaveis[nome], command=agendar, length=500).grid(row=i, column=1, sticky="we", padx=5)
+            lbl_valor = ttk.Label(frame_sliders, width=10); lbl_valor.grid(row=i, column=2, sticky="w")
+            variaveis[nome].trace_add("write", lambda *_, v=variaveis[nome], l=lbl_valor: l.configure(text=f"{v.get():.4g}"))
+            lbl_valor.configure(text=f"{explorador.valores[nome]:.4g}")
+        frame_sliders.columnconfigure(1, weight=1)
+        atualizar()
+
+    def _exibir_otimizacao(self, dados):
+        frame_opt = ttk.LabelFrame(self.frame_resultados, text="Sintonia Otimizada (ITAE) x Ziegler-Nichols")
+        frame_opt.pack(fill="x", pady=5)
+
+        fig_opt, ax_opt = plt.subplots(figsize=(8, 4))
+        for nome, cor in (("zn", "tab:blue"), ("otimo", "darkgreen")):
+            _, resposta = dados[nome]
+            LinhaDecimada(ax_opt, resposta.tempo, resposta.saida, color=cor, label="Ziegler-Nichols" if nome == "zn" else "Otimizado (ITAE)")
+        ax_opt.axhline(1, color='r', linestyle='--', label='Setpoint'); ax_opt.set_title("Resposta ao Degrau no Setpoint: Z-N x Otimizado"); ax_opt.set_xlabel("Tempo (s)"); ax_opt.set_ylabel("Amplitude"); ax_opt.grid(True); ax_opt.legend()
+        self._renderizar_figura(fig_opt, frame_opt)
+
+        for nome, titulo in (("zn", "Ziegler-Nichols"), ("otimo", "Otimizado")):
+            (Kp, Ki, Kd), resposta = dados[nome]
+            m = resposta.metricas
+            texto = (f"{titulo}: Kp = {Kp:.3f} | Ki = {Ki:.3f} | Kd = {Kd:.3f} || Sobressinal = {m['sobressinal']:.1f} % | "
+                     f"Acomodação = {m['tempo_acomodacao']:.3f} s | ITAE = {m['ITAE']:.3f} | IAE = {m['IAE']:.3f}")
+            ttk.Label(frame_opt, text=texto, font=("", 10, "bold" if nome == "otimo" else ""), foreground="darkgreen" if nome == "otimo" else "").pack(pady=2)
+        ttk.Label(frame_opt, text=f"{dados['avaliacoes']} candidatos avaliados em {dados['segundos']:.2f} s").pack(pady=(0, 5))
+
+    def _exibir_tempos(self):
+        """Painel recolhível com o tempo de cada etapa da análise; os trechos também vão para o trace."""
+        if not rastreador.ativo or not rastreador.trechos():
+            return
+        caminho = rastreador.exportar()
+        frame_tempos = ttk.Frame(self.frame_resultados)
+        frame_tempos.pack(fill="x", pady=5)
+        corpo = ttk.Frame(frame_tempos)
+        texto = rastreador.formatar_resumo() + (f"\n\nTrace (chrome://tracing): {caminho}" if caminho else "")
+        ttk.Label(corpo, text=texto, font=("Courier New", 9), justify="left").pack(anchor="w", padx=10, pady=5)
+
+        aberto = tk.BooleanVar(value=False)
+        def alternar():
+            aberto.set(not aberto.get())
+            if aberto.get():
+                corpo.pack(fill="x"); botao.configure(text="▾ Tempo por etapa")
+            else:
+                corpo.pack_forget(); botao.configure(text="▸ Tempo por etapa")
+        botao = ttk.Button(frame_tempos, text="▸ Tempo por etapa", command=alternar)
+        botao.pack(anchor="w")
 
 if __name__ == "__main__":
     app = AnalisadorDeSistemas()
@@ -0,0 +1,316 @@
+"""Benchmarks das etapas de análise do FT_Controle, do ASD e dos modelos do pêndulo.
+
+Roda sem interface gráfica (matplotlib com backend Agg) e cronometra cada
+etapa separadamente, para plantas de 1ª a 10ª ordem, com coeficientes
+numéricos e com parâmetros simbólicos:
+
+    sympify          texto da EDO -> expressões SymPy
+    derivacao        derivar_ft completo (EDO -> G(s))
+    solve            sp.solve da equação já no domínio de Laplace
+    ft_numerica      substituição dos parâmetros (só plantas simbólicas)
+
+e, a partir daí, a mesma FT numérica nas duas variantes - por isso estas
+etapas só são medidas na variante numérica:
+
+    step_response    ctl.step_response na grade de horizonte.py
+    margin           ctl.margin da malha aberta
+    margens          margens exatas de frequencia.py (mesma planta)
+    routh            primeira coluna de Routh da malha com os ganhos de Z-N
+    formatar_ft      texto da FT mostrado no ASD
+    figura           resposta ao degrau desenhada e rasterizada (Agg)
+    latex            G(s) em LaTeX desenhada pelo mathtext
+
+e algumas etapas de tamanho fixo (região de estabilidade, otimizador,
+pêndulo não linear e Monte Carlo). O cache do SymPy é limpo antes de cada
+repetição das etapas simbólicas, para medir a derivação de fato.
+
+O resultado vai para um JSON com as versões das bibliotecas e, para cada
+etapa, a mediana e o mínimo das repetições. Com --base, compara com um
+JSON gravado antes (na mesma máquina) e sai com código 1 se alguma etapa
+ficou mais lenta que o limiar.
+
+A base não fica no repositório: os tempos só valem na máquina em que
+foram medidos. Cada máquina grava a sua a partir do commit de referência,
+por convenção em ~/.cache/nucleo_controle/benchmark_base.json (mesma pasta
+do rastreio e do acervo), e compara as mudanças seguintes com ela.
+
+Uso:
+    python benchmarks/analise.py -o ~/.cache/nucleo_controle/benchmark_base.json
+    python benchmarks/analise.py -o atual.json --base ~/.cache/nucleo_controle/benchmark_base.json --limiar 0.2
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from io import BytesIO
+
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib.figure import Figure
+import numpy as np
+import sympy as sp
+from sympy.abc import s
+import control as ctl
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from nucleo_controle.acervo import AcervoRespostas
+from nucleo_controle.decimacao import PiramideMinMax
+from nucleo_controle.formatacao import formatar_ft
+from nucleo_controle.horizonte import grade_tempo
+from nucleo_controle.identificacao import IdentificadorStreaming
+from nucleo_controle.motor import derivar_ft, ft_numerica, sintonia_zn_frequencia
+from nucleo_controle.frequencia import ganho_ultimo, margens
+from nucleo_controle.otimizacao import otimizar_pid
+from nucleo_controle.pendulo import (autovalores_lote, funcoes_transferencia_lote, matrizes_lote, postos_lote,
+                                     simular_carro_pendulo)
+from nucleo_controle.robustez import analise_robustez
+from nucleo_controle.polinomios import polinomio_caracteristico_pid
+from nucleo_controle.routh import primeira_coluna_routh, regiao_estabilidade_pid
+from nucleo_controle.routh_simbolico import RouthSimbolico, polinomio_pid_simbolico, routh_pid
+
+ORDENS = range(1, 11)
+ETAPAS_SIMBOLICAS = {"sympify", "derivacao", "solve", "ft_numerica"}
+
+
+def planta(ordem):
+    """den = (s + 1)(s/2 + 1)...(s/n + 1), num = 1: polos reais em -1, ..., -n."""
+    den = np.array([1.0])
+    for k in range(1, ordem + 1):
+        den = np.polymul(den, [1.0 / k, 1.0])
+    return [1.0], list(den)
+
+
+def equacao(den, simbolica):
+    """EDO em texto com os coeficientes de den (ou símbolos a0, a1, ... valendo os mesmos números)."""
+    termos = []
+    for grau, coef in enumerate(reversed(den)):
+        fator = f"a{grau}" if simbolica else repr(float(coef))
+        termos.append(f"{fator}*diff(y(t),t,{grau})" if grau else f"{fator}*y(t)")
+    valores = {f"a{grau}": float(c) for grau, c in enumerate(reversed(den))} if simbolica else {}
+    return " + ".join(termos) + " = u(t)", valores
+
+
+def _equacao_laplace(den, simbolica):
+    Y, U = sp.symbols("Y U")
+    coefs = [sp.Symbol(f"a{g}") if simbolica else sp.Float(c) for g, c in enumerate(reversed(den))]
+    return sp.Eq(sum(c * s**g for g, c in enumerate(coefs)) * Y, U), Y
+
+
+def _figura_degrau(tempo, resposta):
+    fig = Figure(figsize=(8, 4))
+    ax = fig.subplots()
+    ax.plot(tempo, resposta)
+    ax.set_title("Resposta ao Degrau"); ax.set_xlabel("Tempo (s)"); ax.grid(True)
+    fig.savefig(BytesIO(), format="png")
+
+
+def _figura_latex(latex):
+    fig = Figure(figsize=(8, 3))
+    fig.text(0.5, 0.5, rf"$G(s) = {latex}$", fontsize=16, ha="center", va="center")
+    fig.savefig(BytesIO(), format="png")
+
+
+def cronometrar(funcao, repeticoes, limpar_sympy=False, tempo_max=5.0):
+    """Mediana e mínimo (s) de até `repeticoes` execuções, após uma de aquecimento.
+
+    Para antes se as execuções já somarem `tempo_max` segundos (as etapas
+    lentas de ordem alta ficam com menos repetições).
+    """
+    funcao()
+    tempos, total = [], 0.0
+    for _ in range(repeticoes):
+        if limpar_sympy:
+            sp.core.cache.clear_cache()
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+        total += tempos[-1]
+        if total > tempo_max:
+            break
+    return {"mediana_s": statistics.median(tempos), "min_s": min(tempos), "repeticoes": len(tempos)}
+
+
+def etapas_planta(ordem, simbolica):
+    """{nome da etapa: função sem argumentos} para uma planta de `ordem`.
+
+    A variante simbólica só tem as etapas de ETAPAS_SIMBOLICAS: depois de
+    ft_numerica a FT é a mesma ctl.tf(num, den) da variante numérica.
+    """
+    num, den = planta(ordem)
+    texto, valores = equacao(den, simbolica)
+    lado_esq, lado_dir = texto.split("=")
+    Gs = derivar_ft(texto)
+    eq_laplace, Y = _equacao_laplace(den, simbolica)
+    etapas = {
+        "sympify": lambda: (sp.sympify(lado_esq, locals={"diff": sp.diff}), sp.sympify(lado_dir, locals={"diff": sp.diff})),
+        "derivacao": lambda: derivar_ft(texto),
+        "solve": lambda: sp.solve(eq_laplace, Y),
+    }
+    if simbolica:
+        etapas["ft_numerica"] = lambda: ft_numerica(Gs, valores)
+        return etapas
+
+    sistema = ctl.tf(num, den)
+    tempo = grade_tempo(sistema)
+    resposta = np.asarray(ctl.step_response(sistema, T=tempo).outputs)
+    ponto = ganho_ultimo(num, den)
+    Kp, Ki, Kd = sintonia_zn_frequencia(ponto.Ku, ponto.Pu) if ponto is not None else (1.0, 0.5, 0.1)
+    latex = sp.latex(Gs)
+    etapas.update({
+        "step_response": lambda: ctl.step_response(sistema, T=tempo),
+        "margin": lambda: ctl.margin(sistema),
+        "margens": lambda: margens(num, den),
+        "routh": lambda: primeira_coluna_routh(polinomio_caracteristico_pid(num, den, Kp, Ki, Kd)),
+        "formatar_ft": lambda: formatar_ft(num, den),
+        "figura": lambda: _figura_degrau(tempo, resposta),
+        "latex": lambda: _figura_latex(latex),
+    })
+    return etapas
+
+
+def _identificar(tempo, resposta, bloco=100_000):
+    identificador = IdentificadorStreaming()
+    for inicio in range(0, len(tempo), bloco):
+        identificador.alimentar(tempo[inicio:inicio + bloco], resposta[inicio:inicio + bloco])
+    return identificador.resultado("28_63")
+
+
+def _escrever_acervo(pasta, tempo, valores, lotes=10):
+    shutil.rmtree(pasta, ignore_errors=True)
+    with AcervoRespostas(pasta) as acervo:
+        for _ in range(lotes):
+            acervo.anexar_lote(tempo, valores, tipo="varredura", Kp=valores[:, -1])
+        acervo.sincronizar()
+
+
+def _ler_acervo(pasta, tempo, valores, ids):
+    if not os.path.exists(os.path.join(pasta, "indice.bin")):
+        _escrever_acervo(pasta, tempo, valores)
+    with AcervoRespostas(pasta) as acervo:
+        return sum(float(acervo.traco(i).canais[0, -1]) for i in ids)
+
+
+def etapas_fixas():
+    num, den = planta(3)
+    ponto = ganho_ultimo(num, den)
+    ganhos = sintonia_zn_frequencia(ponto.Ku, ponto.Pu)
+    grade = np.linspace(0.01, 10, 40)
+    estado0 = np.zeros((1000, 4))
+    estado0[:, 2] = np.linspace(-0.5, 0.5, 1000)
+    t_ensaio = np.arange(1_000_000) * 1e-3
+    y_ensaio = 1 - np.exp(-np.clip(t_ensaio - 2.0, 0, None) / 10) + np.random.default_rng(0).normal(0, 0.01, len(t_ensaio))
+    piramide = PiramideMinMax(t_ensaio, y_ensaio)
+    Kp_g, Ki_g, Kd_g = np.meshgrid(grade, grade, grade, indexing="ij")
+    lote = {"M": np.linspace(0.3, 1.0, 100_000), "m": np.linspace(0.5, 0.1, 100_000)}
+    # Acervo de 1M curvas de 32 amostras (10 lotes de 100k), num diretório temporário refeito a cada repetição
+    pasta_acervo = os.path.join(tempfile.gettempdir(), "benchmark_acervo")
+    t_acervo = np.linspace(0, 10, 32)
+    y_acervo = 1 - np.exp(-t_acervo / np.linspace(0.5, 5, 100_000)[:, None])
+    ids_acervo = np.random.default_rng(0).integers(0, 1_000_000, 10_000).tolist()
+    return {
+        "routh/regiao_40x40x40": lambda: regiao_estabilidade_pid(num, den, grade, grade, grade),
+        "routh/simbolico_montagem": lambda: RouthSimbolico(polinomio_pid_simbolico(num, den)),
+        "routh/simbolico_40x40x40": lambda: routh_pid(num, den).estavel(Kp=Kp_g, Ki=Ki_g, Kd=Kd_g),
+        "margens/lote_10000": lambda: margens(np.tile(num, (10000, 1)) * grade.repeat(250)[:, None], np.tile(den, (10000, 1))),
+        "otimizacao/ordem_3": lambda: otimizar_pid(num, den, ganhos, semente=0),
+        "pendulo/1000_trajetorias_2s": lambda: simular_carro_pendulo(estado0, 60.0, 5.0, 8.0, t_final=2.0),
+        "pendulo/robustez_100k": lambda: analise_robustez(60.0, 5.0, 8.0, amostras=100_000, semente=0),
+        "identificacao/streaming_1M": lambda: _identificar(t_ensaio, y_ensaio),
+        "decimacao/piramide_1M": lambda: PiramideMinMax(t_ensaio, y_ensaio),
+        "decimacao/consulta_1M_800px": lambda: piramide.decimar(100.0, 900.0, 800),
+        "pendulo/matrizes_100k": lambda: matrizes_lote(lote),
+        "pendulo/autovalores_100k": lambda: autovalores_lote(lote),
+        "pendulo/postos_100k": lambda: postos_lote(*matrizes_lote(lote)[:3]),
+        "pendulo/fts_100k": lambda: funcoes_transferencia_lote(lote),
+        "acervo/escrita_1M": lambda: _escrever_acervo(pasta_acervo, t_acervo, y_acervo),
+        "acervo/leitura_10k": lambda: _ler_acervo(pasta_acervo, t_acervo, y_acervo, ids_acervo),
+    }
+
+
+def executar(ordens=ORDENS, repeticoes=7, filtro=None, relatorio=None):
+    """Roda todas as etapas e devolve o dicionário que vai para o JSON."""
+    resultados = {}
+
+    def medir(nome, funcao, limpar_sympy=False):
+        if filtro and filtro not in nome:
+            return
+        resultados[nome] = cronometrar(funcao, repeticoes, limpar_sympy)
+        if relatorio:
+            relatorio(f"{nome:<40} {1e3 * resultados[nome]['mediana_s']:10.3f} ms")
+
+    for ordem in ordens:
+        for simbolica in (False, True):
+            variante = "simbolica" if simbolica else "numerica"
+            for etapa, funcao in etapas_planta(ordem, simbolica).items():
+                medir(f"{etapa}/ordem_{ordem}/{variante}", funcao, etapa in ETAPAS_SIMBOLICAS)
+    for nome, funcao in etapas_fixas().items():
+        medir(nome, funcao)
+
+    return {
+        "meta": {
+            "data": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(), "plataforma": platform.platform(), "processador": platform.processor(),
+            "numpy": np.__version__, "sympy": sp.__version__, "control": ctl.__version__,
+            "matplotlib": matplotlib.__version__, "repeticoes": repeticoes,
+        },
+        "resultados": resultados,
+    }
+
+
+def comparar(atual, base, limiar=0.2, minimo_s=1e-4):
+    """Etapas presentes nos dois JSONs cuja mediana cresceu mais que `limiar` (fração).
+
+    Diferenças absolutas abaixo de `minimo_s` são ignoradas (ruído de
+    cronômetro em etapas de microssegundos). Retorna uma lista de
+    (etapa, mediana base, mediana atual, razão), da pior para a melhor.
+    """
+    regressoes = []
+    for nome, medida in atual["resultados"].items():
+        anterior = base["resultados"].get(nome)
+        if anterior is None:
+            continue
+        antes, agora = anterior["mediana_s"], medida["mediana_s"]
+        if agora - antes > minimo_s and agora > (1 + limiar) * antes:
+            regressoes.append((nome, antes, agora, agora / antes))
+    return sorted(regressoes, key=lambda r: r[3], reverse=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks das etapas de análise, sem interface gráfica.")
+    parser.add_argument("-o", "--saida", default="benchmark.json", help="JSON de resultados")
+    parser.add_argument("--base", default=None, help="JSON de referência para comparação")
+    parser.add_argument("--limiar", type=float, default=0.2, help="aumento relativo da mediana tratado como regressão")
+    parser.add_argument("--ordens", type=int, nargs="+", default=list(ORDENS), help="ordens das plantas")
+    parser.add_argument("--repeticoes", type=int, default=7)
+    parser.add_argument("--filtro", default=None, help="só etapas cujo nome contém este texto")
+    args = parser.parse_args(argv)
+
+    def relatorio(msg):
+        print(msg, file=sys.stderr, flush=True)
+
+    atual = executar(args.ordens, args.repeticoes, args.filtro, relatorio)
+    os.makedirs(os.path.dirname(os.path.abspath(args.saida)), exist_ok=True)
+    with open(args.saida, "w", encoding="utf-8") as arquivo:
+        json.dump(atual, arquivo, indent=2, ensure_ascii=False)
+    relatorio(f"Resultados gravados em {args.saida}")
+
+    if args.base:
+        with open(args.base, encoding="utf-8") as arquivo:
+            base = json.load(arquivo)
+        regressoes = comparar(atual, base, args.limiar)
+        for nome, antes, agora, razao in regressoes:
+            relatorio(f"REGRESSÃO {nome}: {1e3 * antes:.3f} ms -> {1e3 * agora:.3f} ms ({razao:.2f}x)")
+        if base.get("meta", {}).get("plataforma") != atual["meta"]["plataforma"]:
+            relatorio("Aviso: a base foi gravada em outra plataforma; a comparação pode não ser significativa.")
+        relatorio(f"{len(regressoes)} regressão(ões) acima de {100 * args.limiar:.0f}%.")
+        sys.exit(1 if regressoes else 0)
+
+
+if __name__ == "__main__":
+    main()
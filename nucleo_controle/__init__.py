@@ -0,0 +1 @@
+"""Núcleo numérico compartilhado pelo FT_Controle, pelo ASD e pelo notebook do pêndulo."""
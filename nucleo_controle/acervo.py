@@ -0,0 +1,264 @@
+"""Acervo em disco de respostas simuladas e resultados de sintonia.
+
+Varreduras grandes (lote.py, Monte Carlo) produzem milhões de curvas que
+depois só precisam ser comparadas ou desenhadas de novo. Em vez de
+re-simular, cada curva vai uma vez para um diretório com três arquivos
+apenas acrescentados (nunca reescritos):
+
+    amostras.bin   amostras de dtype fixo; cada curva é um bloco contíguo
+                   (1 + canais, n): a linha 0 é o tempo, as demais os canais
+    indice.bin     um registro INDICE_DTYPE por curva: posição no
+                   amostras.bin, tipo, planta, K/L/T, Ku/Pu, ganhos e métricas
+    plantas.jsonl  num/den de cada planta citada no índice (id = linha)
+
+Os dois binários são lidos por np.memmap: `traco(i)` devolve visões do
+arquivo (sem cópia) e filtros sobre ganhos ou métricas são máscaras
+vetorizadas sobre o índice mapeado. As amostras são gravadas (e
+descarregadas) antes do registro do índice, então uma gravação interrompida
+deixa no máximo bytes órfãos no fim do amostras.bin, nunca um registro
+apontando para o vazio; o índice vale até o último registro completo, e a
+próxima abertura para gravação corta os dois arquivos nesse ponto.
+
+Um único processo deve gravar num acervo de cada vez; leitores podem ser
+vários (veem o que já foi descarregado com `sincronizar`).
+"""
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+
+VERSAO_FORMATO = 1
+
+INDICE_DTYPE = np.dtype([
+    ("inicio", "<i8"), ("amostras", "<i8"), ("canais", "<i2"), ("tipo", "S16"), ("planta", "<i8"),
+    ("K", "<f8"), ("L", "<f8"), ("T", "<f8"), ("Ku", "<f8"), ("Pu", "<f8"),
+    ("Kp", "<f8"), ("Ki", "<f8"), ("Kd", "<f8"),
+    ("sobressinal", "<f8"), ("tempo_acomodacao", "<f8"), ("IAE", "<f8"), ("ISE", "<f8"), ("ITAE", "<f8"),
+    ("criado", "<f8"),
+])
+# Campos numéricos do índice que o chamador pode preencher (os ausentes ficam NaN)
+CAMPOS_METADADOS = ("K", "L", "T", "Ku", "Pu", "Kp", "Ki", "Kd",
+                    "sobressinal", "tempo_acomodacao", "IAE", "ISE", "ITAE")
+
+# Ordem dos canais gravados pelas interfaces, por tipo de curva
+CANAIS_POR_TIPO = {
+    "malha_fechada": ("saida", "perturbacao", "controle"),
+    "malha_aberta": ("resposta",),
+}
+
+Traco = namedtuple("Traco", ["tempo", "canais", "registro"])
+
+
+class AcervoRespostas:
+    """Diretório de curvas (tempo + canais) com índice de metadados, lido por mapeamento em memória."""
+
+    def __init__(self, diretorio, dtype="<f4"):
+        self.diretorio = diretorio
+        os.makedirs(diretorio, exist_ok=True)
+        caminho_meta = os.path.join(diretorio, "acervo.json")
+        if os.path.exists(caminho_meta):
+            with open(caminho_meta, encoding="utf-8") as arquivo:
+                meta = json.load(arquivo)
+            if meta.get("versao") != VERSAO_FORMATO:
+                raise ValueError(f"Acervo {diretorio!r} com formato {meta.get('versao')!r}; esperado {VERSAO_FORMATO}.")
+        else:
+            meta = {"versao": VERSAO_FORMATO, "dtype": np.dtype(dtype).str}
+            with open(caminho_meta, "w", encoding="utf-8") as arquivo:
+                json.dump(meta, arquivo)
+        # O dtype das amostras é o da criação do acervo, não o pedido agora
+        self.dtype = np.dtype(meta["dtype"])
+        self._caminho_amostras = os.path.join(diretorio, "amostras.bin")
+        self._caminho_indice = os.path.join(diretorio, "indice.bin")
+        self._caminho_plantas = os.path.join(diretorio, "plantas.jsonl")
+        self._trava = threading.Lock()
+        self._gravacao = None  # (amostras, indice, plantas) abertos em modo "ab" na primeira gravação
+        self._fim_amostras = self._total = None
+        self._plantas = None
+        self._ids_plantas = None
+        self._mapa_amostras = None
+        self._mapa_indice = None
+
+    # --- Gravação ---
+
+    def _abrir_gravacao(self):
+        if self._gravacao is None:
+            self._gravacao = tuple(open(caminho, "ab") for caminho in
+                                   (self._caminho_amostras, self._caminho_indice, self._caminho_plantas))
+            # Restos de uma gravação interrompida (registro parcial no índice, amostras sem registro)
+            # são cortados antes de acrescentar, para que o "ab" continue onde o último registro termina
+            self._total, sobra = divmod(os.path.getsize(self._caminho_indice), INDICE_DTYPE.itemsize)
+            if sobra:
+                self._gravacao[1].truncate(self._total * INDICE_DTYPE.itemsize)
+            self._fim_amostras = 0
+            if self._total:
+                registros = np.memmap(self._caminho_indice, dtype=INDICE_DTYPE, mode="r", shape=(self._total,))
+                self._fim_amostras = int(np.max(registros["inicio"] + (1 + registros["canais"].astype(np.int64))
+                                                * registros["amostras"]))
+                del registros
+            if os.path.getsize(self._caminho_amostras) > self._fim_amostras * self.dtype.itemsize:
+                self._gravacao[0].truncate(self._fim_amostras * self.dtype.itemsize)
+        return self._gravacao
+
+    def _carregar_plantas(self):
+        if self._plantas is None:
+            self._plantas, self._ids_plantas = [], {}
+            if os.path.exists(self._caminho_plantas):
+                with open(self._caminho_plantas, encoding="utf-8") as arquivo:
+                    for linha in arquivo:
+                        if linha.strip():
+                            self._registrar_planta_lida(json.loads(linha))
+
+    def _registrar_planta_lida(self, planta):
+        chave = (tuple(planta["num"]), tuple(planta["den"]))
+        self._ids_plantas.setdefault(chave, len(self._plantas))
+        self._plantas.append((planta["num"], planta["den"]))
+
+    def registrar_planta(self, num, den):
+        """Id da planta num/den no acervo; plantas já vistas não são gravadas de novo."""
+        num, den = [float(c) for c in np.ravel(num)], [float(c) for c in np.ravel(den)]
+        with self._trava:
+            self._carregar_plantas()
+            chave = (tuple(num), tuple(den))
+            if chave not in self._ids_plantas:
+                planta = {"num": num, "den": den}
+                self._abrir_gravacao()[2].write((json.dumps(planta) + "\n").encode("utf-8"))
+                self._registrar_planta_lida(planta)
+            return self._ids_plantas[chave]
+
+    def anexar(self, tempo, *canais, tipo="", planta=-1, **metadados):
+        """Acrescenta uma curva (tempo e um ou mais canais na mesma grade) e devolve seu id."""
+        tempo = np.asarray(tempo)
+        bloco = np.empty((1 + len(canais), len(tempo)), dtype=self.dtype)
+        bloco[0] = tempo
+        for linha, canal in zip(bloco[1:], canais):
+            linha[...] = canal
+        return self._gravar(bloco[None], tipo, planta, metadados)[0]
+
+    def anexar_lote(self, tempo, valores, tipo="", planta=-1, **metadados):
+        """Acrescenta m curvas de mesmo tamanho numa única gravação; devolve o range de ids.
+
+        `valores` tem forma (m, n) (um canal) ou (m, canais, n); `tempo` é a
+        grade comum (n,) ou uma por curva (m, n). `planta` e cada metadado
+        podem ser escalares ou vetores de tamanho m.
+        """
+        valores = np.asarray(valores)
+        if valores.ndim == 2:
+            valores = valores[:, None, :]
+        m, canais, n = valores.shape
+        blocos = np.empty((m, 1 + canais, n), dtype=self.dtype)
+        blocos[:, 0] = tempo
+        blocos[:, 1:] = valores
+        return self._gravar(blocos, tipo, planta, metadados)
+
+    def _gravar(self, blocos, tipo, planta, metadados):
+        desconhecidos = set(metadados) - set(CAMPOS_METADADOS)
+        if desconhecidos:
+            raise ValueError(f"Metadados desconhecidos: {', '.join(sorted(desconhecidos))}.")
+        m, linhas, n = blocos.shape
+        registros = np.zeros(m, dtype=INDICE_DTYPE)
+        registros["amostras"], registros["canais"] = n, linhas - 1
+        registros["tipo"], registros["planta"], registros["criado"] = tipo, planta, time.time()
+        for campo in CAMPOS_METADADOS:
+            registros[campo] = metadados.get(campo, np.nan)
+        with self._trava:
+            amostras, indice, _ = self._abrir_gravacao()
+            registros["inicio"] = self._fim_amostras + np.arange(m) * (linhas * n)
+            primeiro = self._total
+            amostras.write(memoryview(np.ascontiguousarray(blocos)).cast("B"))
+            # Os dois arquivos têm buffers próprios: as amostras chegam ao disco antes do registro
+            amostras.flush()
+            indice.write(registros.tobytes())
+            self._fim_amostras += blocos.size
+            self._total += m
+        return range(primeiro, primeiro + m)
+
+    def anexar_resposta(self, resposta, Kp, Ki, Kd, num=None, den=None, **identificacao):
+        """Grava uma RespostaMalhaFechada (saída, perturbação e controle) com ganhos e métricas."""
+        planta = self.registrar_planta(num, den) if num is not None else -1
+        metricas = {k: v for k, v in resposta.metricas.items() if k in CAMPOS_METADADOS}
+        return self.anexar(resposta.tempo, resposta.saida, resposta.perturbacao, resposta.controle,
+                           tipo="malha_fechada", planta=planta, Kp=Kp, Ki=Ki, Kd=Kd, **metricas, **identificacao)
+
+    def sincronizar(self):
+        """Descarrega o que foi acrescentado, tornando-o visível para leituras (deste e de outros processos)."""
+        with self._trava:
+            if self._gravacao is not None:
+                for arquivo in self._gravacao:
+                    arquivo.flush()
+
+    def fechar(self):
+        with self._trava:
+            if self._gravacao is not None:
+                for arquivo in self._gravacao:
+                    arquivo.close()
+                self._gravacao = None
+            self._mapa_amostras = self._mapa_indice = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.fechar()
+
+    # --- Leitura ---
+
+    def _mapear(self, mapa, caminho, dtype):
+        """np.memmap do arquivo inteiro, refeito só quando o arquivo cresceu desde o último mapeamento."""
+        tamanho = os.path.getsize(caminho) // dtype.itemsize if os.path.exists(caminho) else 0
+        if mapa is not None and len(mapa) == tamanho:
+            return mapa
+        if tamanho == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(caminho, dtype=dtype, mode="r", shape=(tamanho,))
+
+    @property
+    def indice(self):
+        """Registros de todas as curvas (INDICE_DTYPE), mapeados do disco e somente leitura."""
+        self.sincronizar()
+        self._mapa_indice = self._mapear(self._mapa_indice, self._caminho_indice, INDICE_DTYPE)
+        return self._mapa_indice
+
+    def __len__(self):
+        return len(self.indice)
+
+    def traco(self, i):
+        """Tempo (n,), canais (canais, n) e registro da curva i, como visões do arquivo (sem cópia)."""
+        indice = self._mapa_indice
+        if indice is None or not -len(indice) <= i < len(indice):
+            indice = self.indice
+        registro = indice[i]
+        inicio, n, canais = int(registro["inicio"]), int(registro["amostras"]), int(registro["canais"])
+        fim = inicio + (1 + canais) * n
+        if self._mapa_amostras is None or len(self._mapa_amostras) < fim:
+            self._mapa_amostras = self._mapear(self._mapa_amostras, self._caminho_amostras, self.dtype)
+        bloco = self._mapa_amostras[inicio:fim].reshape(1 + canais, n)
+        return Traco(bloco[0], bloco[1:], registro)
+
+    def buscar(self, tipo=None, planta=None, **intervalos):
+        """Ids das curvas do tipo/planta dados e com cada metadado no intervalo (mín, máx) pedido.
+
+        Ex.: acervo.buscar("malha_fechada", sobressinal=(0, 10), Kp=(1, np.inf)).
+        """
+        indice = self.indice
+        mascara = np.ones(len(indice), dtype=bool)
+        if tipo is not None:
+            mascara &= indice["tipo"] == tipo.encode()
+        if planta is not None:
+            mascara &= indice["planta"] == planta
+        for campo, (minimo, maximo) in intervalos.items():
+            valores = indice[campo]
+            mascara &= (valores >= minimo) & (valores <= maximo)
+        return np.flatnonzero(mascara)
+
+    def planta(self, id_planta):
+        """(num, den) da planta registrada com esse id."""
+        with self._trava:
+            self._carregar_plantas()
+            return self._plantas[id_planta]
+
+
+def diretorio_acervo_padrao():
+    return os.path.join(os.path.expanduser("~"), ".cache", "nucleo_controle", "acervo")
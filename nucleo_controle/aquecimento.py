@@ -0,0 +1,90 @@
+"""Partida das interfaces: bibliotecas pesadas e primeira análise aquecidas em segundo plano.
+
+Numa partida a frio, importar sympy, control (que traz scipy.signal) e
+matplotlib leva segundos, e a primeira análise ainda paga o parser e as
+regras de Laplace do SymPy, a leitura do cache de fontes e do mathtext do
+matplotlib e a primeira simulação. As interfaces abrem a janela só com o
+toolkit gráfico e chamam `aquecer` numa thread: cada etapa é cronometrada
+(e vai para o rastreio, se ativo) e a análise é liberada quando a última
+termina, em vez de depois de um tempo fixo.
+
+As etapas só importam e exercitam código; nenhuma cria widgets, figuras do
+pyplot ou qualquer coisa ligada ao laço de eventos, que continuam na thread
+principal.
+"""
+import importlib
+import time
+from collections import namedtuple
+
+from .rastreio import rastreador
+
+EtapaAquecimento = namedtuple("EtapaAquecimento", ["nome", "segundos"])
+
+
+def _importar(*modulos):
+    return lambda: [importlib.import_module(modulo) for modulo in modulos]
+
+
+def aquecer_parser_sympy():
+    """Deriva uma EDO de 2ª ordem com parâmetros: sympify, Laplace e solve ficam carregados."""
+    from .motor import derivar_ft
+    derivar_ft("a*diff(y(t),t,2) + b*diff(y(t),t) + y(t) = k*u(t)", "u", "y")
+
+
+def aquecer_matplotlib():
+    """Lê o cache de fontes (criado na primeira execução) e desenha uma equação e uma curva no Agg."""
+    from matplotlib import font_manager
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    font_manager.findfont("DejaVu Sans")
+    fig = Figure(figsize=(2, 1))
+    fig.text(0.5, 0.5, r"$G(s) = \frac{2}{10 s + 1}$")
+    fig.subplots().plot([0, 1], [0, 1])
+    FigureCanvasAgg(fig).draw()
+
+
+def aquecer_simulacao():
+    import control as ctl
+    from .horizonte import simular_degrau
+    simular_degrau(ctl.TransferFunction([2], [10, 1]))
+
+
+# Uma etapa por biblioteca, para ver qual pesa na partida (control já traz scipy.signal)
+ETAPAS_BIBLIOTECAS = (
+    ("numpy", _importar("numpy")),
+    ("sympy", _importar("sympy")),
+    ("control", _importar("control")),
+    ("matplotlib", _importar("matplotlib.figure", "matplotlib.backends.backend_agg")),
+)
+# Etapas da primeira análise; cada interface usa as que lhe servem (o ASD não deriva EDOs pelo SymPy)
+ETAPAS_PRIMEIRA_ANALISE = (
+    ("parser_sympy", aquecer_parser_sympy),
+    ("matplotlib_fontes", aquecer_matplotlib),
+    ("simulacao", aquecer_simulacao),
+)
+
+
+def aquecer(etapas, progresso=None, verificar=None):
+    """Executa as etapas (nome, função) em ordem e devolve uma lista de EtapaAquecimento.
+
+    `progresso(nome, i, total)` é chamado antes de cada etapa e `verificar()`
+    entre etapas (ex.: Tarefa.verificar, para cancelar), ambos na thread que
+    aquece.
+    """
+    tempos = []
+    for i, (nome, funcao) in enumerate(etapas):
+        if verificar:
+            verificar()
+        if progresso:
+            progresso(nome, i, len(etapas))
+        inicio = time.perf_counter()
+        with rastreador.trecho(f"aquecimento_{nome}"):
+            funcao()
+        tempos.append(EtapaAquecimento(nome, time.perf_counter() - inicio))
+    return tempos
+
+
+def formatar_partida(tempos, janela_s, pronto_s):
+    """Resumo de uma linha: tempo até a janela, até a análise liberada e as etapas mais caras."""
+    etapas = ", ".join(f"{e.nome} {e.segundos:.2f} s" for e in sorted(tempos, key=lambda e: -e.segundos)[:4])
+    return f"Partida: janela em {janela_s:.2f} s, pronto em {pronto_s:.2f} s ({etapas})"
@@ -0,0 +1,145 @@
+"""Cache da derivação simbólica EDO -> G(s).
+
+A derivação (sympify, Laplace, solve, cancel) depende só do texto da equação
+e dos nomes de entrada/saída; os valores numéricos dos parâmetros mudam a
+cada análise. Cada entrada guarda a G(s) simbólica, seus parâmetros livres e
+uma função compilada (lambdify) que devolve os coeficientes numéricos de
+num/den, de modo que análises repetidas não passam mais pelo SymPy.
+
+As entradas ficam num LRU em memória e, opcionalmente, num diretório em
+disco (um pickle por equação) que sobrevive entre execuções.
+"""
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+import sympy as sp
+from sympy.abc import s
+
+from .motor import derivar_ft, parametros_livres
+
+VERSAO_FORMATO = 1
+
+
+def normalizar_equacao(equacao, var_u="u", var_y="y"):
+    """Chave do cache: equação sem espaços + nomes de entrada e saída."""
+    return f"{''.join(equacao.split())}|{var_u.strip()}|{var_y.strip()}"
+
+
+def _sem_zeros_iniciais(coefs):
+    i = 0
+    while i < len(coefs) - 1 and coefs[i] == 0:
+        i += 1
+    return coefs[i:]
+
+
+class EntradaFT:
+    """G(s) simbólica já derivada, com avaliação numérica compilada dos coeficientes."""
+
+    def __init__(self, Gs_simbolica):
+        self.Gs_simbolica = Gs_simbolica
+        self.simbolos = parametros_livres(Gs_simbolica)
+        self.num_expr = sp.Poly(sp.numer(Gs_simbolica), s).all_coeffs()
+        self.den_expr = sp.Poly(sp.denom(Gs_simbolica), s).all_coeffs()
+        self._funcao = None
+
+    def __getstate__(self):
+        estado = self.__dict__.copy()
+        estado["_funcao"] = None
+        return estado
+
+    @property
+    def funcao_coeficientes(self):
+        """f(*valores dos símbolos) -> (num, den); compilada na primeira chamada."""
+        if self._funcao is None:
+            self._funcao = sp.lambdify(self.simbolos, (self.num_expr, self.den_expr), modules="math")
+        return self._funcao
+
+    def coeficientes(self, valores=None):
+        """Coeficientes float de num e den para os valores dados (chaves Symbol ou str)."""
+        valores = {str(k): v for k, v in (valores or {}).items()}
+        faltando = [str(p) for p in self.simbolos if str(p) not in valores]
+        if faltando:
+            raise ValueError(f"Faltam valores para os parâmetros: {', '.join(faltando)}.")
+        num, den = self.funcao_coeficientes(*(float(valores[str(p)]) for p in self.simbolos))
+        return _sem_zeros_iniciais([float(c) for c in num]), _sem_zeros_iniciais([float(c) for c in den])
+
+
+class CacheFT:
+    """LRU de EntradaFT com persistência opcional em `diretorio`."""
+
+    def __init__(self, capacidade=128, diretorio=None):
+        self.capacidade = capacidade
+        self.diretorio = diretorio
+        self.acertos = self.falhas = 0
+        self._entradas = OrderedDict()
+        self._trava = threading.Lock()
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+
+    def _arquivo(self, chave):
+        resumo = hashlib.sha256(f"{VERSAO_FORMATO}|{sp.__version__}|{chave}".encode("utf-8")).hexdigest()[:32]
+        return os.path.join(self.diretorio, f"{resumo}.pkl")
+
+    def _ler_disco(self, chave):
+        if not self.diretorio:
+            return None
+        try:
+            with open(self._arquivo(chave), "rb") as arquivo:
+                chave_salva, entrada = pickle.load(arquivo)
+            return entrada if chave_salva == chave else None
+        except (OSError, pickle.PickleError, EOFError, AttributeError, ValueError):
+            return None
+
+    def _gravar_disco(self, chave, entrada):
+        if not self.diretorio:
+            return
+        destino = self._arquivo(chave)
+        temporario = f"{destino}.{os.getpid()}.tmp"
+        try:
+            with open(temporario, "wb") as arquivo:
+                pickle.dump((chave, entrada), arquivo, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporario, destino)
+        except OSError:
+            pass
+
+    def obter(self, equacao, var_u="u", var_y="y"):
+        """Devolve a EntradaFT da equação, derivando-a só se não estiver em cache."""
+        chave = normalizar_equacao(equacao, var_u, var_y)
+        with self._trava:
+            entrada = self._entradas.get(chave)
+            if entrada is not None:
+                self._entradas.move_to_end(chave)
+                self.acertos += 1
+                return entrada
+
+        entrada = self._ler_disco(chave)
+        if entrada is None:
+            entrada = EntradaFT(derivar_ft(equacao, var_u, var_y))
+            self._gravar_disco(chave, entrada)
+            with self._trava:
+                self.falhas += 1
+        else:
+            with self._trava:
+                self.acertos += 1
+
+        with self._trava:
+            self._entradas[chave] = entrada
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.capacidade:
+                self._entradas.popitem(last=False)
+        return entrada
+
+    def limpar(self, disco=False):
+        with self._trava:
+            self._entradas.clear()
+        if disco and self.diretorio:
+            for nome in os.listdir(self.diretorio):
+                if nome.endswith(".pkl"):
+                    os.remove(os.path.join(self.diretorio, nome))
+
+
+def diretorio_cache_padrao():
+    return os.path.join(os.path.expanduser("~"), ".cache", "nucleo_controle", "ft")
@@ -0,0 +1,118 @@
+"""Decimação mín/máx por largura em pixels para os gráficos de resposta.
+
+Desenhar uma curva com milhões de pontos custa ao Agg o mesmo a cada
+redesenho, zoom ou redimensionamento, mas a tela só mostra algumas
+centenas de colunas. Para cada coluna de pixel basta o mínimo e o máximo
+das amostras que caem nela (na ordem em que ocorrem): picos, sobressinal e
+vales ficam exatos e o traçado é visualmente idêntico.
+
+`PiramideMinMax` pré-calcula, uma vez por curva, níveis com os índices do
+mínimo e do máximo de grupos de 4, 16, 64, ... amostras; uma consulta
+(trecho visível, largura em pixels) usa o nível mais grosso que ainda tem
+ao menos um grupo por pixel e custa O(pixels), independente do número de
+amostras. `LinhaDecimada` liga a pirâmide a uma Line2D e redecima quando os
+limites do eixo x mudam (zoom, pan, autoscale) ou quando a figura muda de
+tamanho.
+"""
+import numpy as np
+
+
+class PiramideMinMax:
+    """Índices de mínimo e máximo por grupos de fator**k amostras de y(x), com x crescente."""
+
+    def __init__(self, x, y, fator=4, grupos_minimos=64):
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+        self.fator = fator
+        # niveis[k] = (índice do mínimo, índice do máximo) de cada grupo de fator**(k+1) amostras
+        self.niveis = []
+        i_min = i_max = np.arange(len(self.y))
+        while len(i_min) // fator >= grupos_minimos:
+            i_min, i_max = self._agrupar(i_min, i_max)
+            self.niveis.append((i_min, i_max))
+
+    def _agrupar(self, i_min, i_max):
+        n = len(i_min)
+        completo = n - n % self.fator
+        grupos = [self._extremos(i_min[:completo].reshape(-1, self.fator), i_max[:completo].reshape(-1, self.fator))]
+        if completo < n:
+            grupos.append(self._extremos(i_min[None, completo:], i_max[None, completo:]))
+        return tuple(np.concatenate(partes) for partes in zip(*grupos))
+
+    def _extremos(self, i_min, i_max):
+        """Para cada linha de índices, o do menor y (entre i_min) e o do maior y (entre i_max)."""
+        linhas = np.arange(len(i_min))
+        return (i_min[linhas, np.argmin(self.y[i_min], axis=1)],
+                i_max[linhas, np.argmax(self.y[i_max], axis=1)])
+
+    def __len__(self):
+        return len(self.x)
+
+    def decimar(self, x_inicio, x_fim, pixels):
+        """Pontos (x, y) do trecho [x_inicio, x_fim] reduzidos a ~2 por pixel, mais uma amostra de cada lado.
+
+        Trechos com até 2·pixels amostras voltam inteiros.
+        """
+        n = len(self.x)
+        if n == 0:
+            return self.x, self.y
+        i0 = max(int(np.searchsorted(self.x, x_inicio, side="left")) - 1, 0)
+        i1 = min(int(np.searchsorted(self.x, x_fim, side="right")) + 1, n)
+        pixels = max(int(pixels), 1)
+        if i1 - i0 <= 2 * pixels:
+            return self.x[i0:i1], self.y[i0:i1]
+
+        # Nível mais grosso com ao menos um grupo por pixel no trecho
+        nivel = 0
+        while nivel < len(self.niveis) and (i1 - i0) // self.fator ** (nivel + 1) >= pixels:
+            nivel += 1
+        tamanho = self.fator ** nivel
+        if nivel == 0:
+            i_min = i_max = np.arange(i0, i1)
+        else:
+            i_min, i_max = (indices[i0 // tamanho:-(-i1 // tamanho)] for indices in self.niveis[nivel - 1])
+
+        # Grupos do nível juntados em ~`pixels` colunas de mesmo tamanho (a sobra vira uma coluna a mais)
+        por_coluna = max(len(i_min) // pixels, 1)
+        completo = len(i_min) - len(i_min) % por_coluna
+        partes = [self._extremos(i_min[:completo].reshape(-1, por_coluna), i_max[:completo].reshape(-1, por_coluna))]
+        if completo < len(i_min):
+            partes.append(self._extremos(i_min[None, completo:], i_max[None, completo:]))
+        indices = np.unique(np.concatenate([np.concatenate(p) for p in partes] + [[i0, i1 - 1]]))
+        return self.x[indices], self.y[indices]
+
+
+class LinhaDecimada:
+    """Line2D que mostra só o envelope mín/máx do trecho visível, na largura atual do eixo.
+
+    Uso como ax.plot: LinhaDecimada(ax, tempo, resposta, label=..., color=...).
+    `definir_dados` troca a curva (ex.: gráficos reaproveitados entre análises).
+    """
+
+    def __init__(self, ax, x, y, *args, **kwargs):
+        self.ax = ax
+        self.piramide = PiramideMinMax(x, y)
+        x_vis, y_vis = self._decimar(*self._limites_dados())
+        self.linha, = ax.plot(x_vis, y_vis, *args, **kwargs)
+        # Funções comuns (não métodos) ficam com referência forte nos registros de callbacks
+        ax.callbacks.connect("xlim_changed", lambda _ax: self.atualizar())
+        ax.figure.canvas.mpl_connect("resize_event", lambda _evento: self.atualizar())
+
+    def _limites_dados(self):
+        x = self.piramide.x
+        return (x[0], x[-1]) if len(x) else (0.0, 1.0)
+
+    def _pixels(self):
+        return max(int(self.ax.get_window_extent().width), 100)
+
+    def _decimar(self, x_inicio, x_fim):
+        return self.piramide.decimar(x_inicio, x_fim, self._pixels())
+
+    def definir_dados(self, x, y):
+        """Troca a curva; como em Line2D.set_data, cabe ao chamador o relim/autoscale do eixo."""
+        self.piramide = PiramideMinMax(x, y)
+        self.linha.set_data(*self._decimar(*self._limites_dados()))
+
+    def atualizar(self):
+        """Redecima para os limites atuais do eixo x."""
+        self.linha.set_data(*self._decimar(*sorted(self.ax.get_xlim())))
@@ -0,0 +1,40 @@
+"""Exploração interativa dos parâmetros simbólicos da planta.
+
+Depois da análise, os ganhos do PID ficam fixos e cada parâmetro livre de
+G(s) ganha um controle deslizante. A cada movimento só a parte numérica é
+refeita: os coeficientes saem da função já compilada da EntradaFT (sem
+subs nem Poly do SymPy) e a malha é simulada na mesma grade de tempo da
+análise, de modo que a interface só troca os dados das linhas.
+"""
+import numpy as np
+
+from .malha_fechada import malha_fechada_pid, simular_malha
+
+
+def faixa_parametro(valor, fator=4.0):
+    """Faixa do controle deslizante em torno do valor analisado (mesmo sinal; [-1, 1] para zero)."""
+    valor = float(valor)
+    if valor == 0:
+        return -1.0, 1.0
+    limites = (valor / fator, valor * fator)
+    return min(limites), max(limites)
+
+
+class ExploradorParametros:
+    """Simula a malha com ganhos fixos para novos valores dos parâmetros de uma EntradaFT."""
+
+    def __init__(self, entrada_ft, valores, Kp, Ki, Kd, tempo):
+        self.entrada_ft = entrada_ft
+        self.simbolos = [str(p) for p in entrada_ft.simbolos]
+        self.valores = {str(k): float(v) for k, v in valores.items()}
+        self.ganhos = (Kp, Ki, Kd)
+        self.tempo = np.asarray(tempo)
+
+    def faixas(self):
+        return {nome: faixa_parametro(valor) for nome, valor in self.valores.items()}
+
+    def simular(self, **novos):
+        """Atualiza os parâmetros dados e devolve a RespostaMalhaFechada na grade fixa."""
+        self.valores.update({k: float(v) for k, v in novos.items()})
+        num, den = self.entrada_ft.coeficientes(self.valores)
+        return simular_malha(malha_fechada_pid(num, den, *self.ganhos), t_sim=self.tempo)
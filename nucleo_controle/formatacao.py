@@ -0,0 +1,42 @@
+"""Formatação de FTs em texto puro (sem LaTeX), usada nos rótulos do ASD."""
+
+
+def formatar_ft(num_coefs, den_coefs):
+    sobrescrito = {'0': '⁰', '1': '¹', '2': '²', '3': '³', '4': '⁴',
+                   '5': '⁵', '6': '⁶', '7': '⁷', '8': '⁸', '9': '⁹'}
+
+    def termo_str(coef, grau):
+        if abs(coef) < 1e-12:
+            return ''
+        s_coef = f"{abs(coef):.3g}" if abs(coef) != 1 or grau == 0 else ''
+        s_sinal = '-' if coef < 0 else ''
+        s_var = ''
+        if grau > 0:
+            expoente = ''.join(sobrescrito[d] for d in str(grau))
+            s_var = f"s{expoente}"
+        return f"{s_sinal}{s_coef}{s_var}"
+
+    def polinomio_str(coefs):
+        termos = []
+        grau_max = len(coefs) - 1
+        for i, c in enumerate(coefs):
+            grau = grau_max - i
+            t = termo_str(c, grau)
+            if t:
+                termos.append(t)
+        if not termos:
+            return '0'
+        s = termos[0]
+        for termo in termos[1:]:
+            if termo.startswith('-'):
+                s += ' - ' + termo[1:]
+            else:
+                s += ' + ' + termo
+        return s
+
+    num_str = polinomio_str(num_coefs)
+    den_str = polinomio_str(den_coefs)
+
+    largura = max(len(num_str), len(den_str))
+    barra = '―' * largura
+    return f"{num_str}\n{barra}\n{den_str}"
@@ -0,0 +1,246 @@
+"""Análise em frequência feita diretamente sobre os polinômios da FT.
+
+O ganho último (Ku) e o período último (Pu) do método de Ziegler-Nichols em
+malha fechada são obtidos sem simular: o cruzamento com o eixo imaginário de
+den(s) + K*num(s) acontece nas frequências em que a fase de G(jω) é -180°,
+isto é, nas raízes reais de Im{num(jω) * conj(den(jω))} = 0.
+
+As margens seguem a mesma ideia, para uma planta ou uma família inteira de
+uma vez: os cruzamentos de fase são essas raízes e os de ganho são as raízes
+reais de |num(jω)|² - |den(jω)|² = 0, todas calculadas pelos autovalores de
+matrizes companheiras empilhadas. G(jω) é avaliada por Horner vetorizado
+(sistemas x frequências), e a grade de Bode/Nyquist é refinada onde a fase
+ou o módulo variam mais que a tolerância entre dois pontos (ressonâncias) e
+inclui as frequências de cruzamento exatas.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from .polinomios import raizes_lote
+
+PontoCritico = namedtuple("PontoCritico", ["Ku", "Pu", "wu"])
+Margens = namedtuple("Margens", ["ganho", "fase", "atraso", "w_180", "w_c"])
+RespostaFrequencia = namedtuple("RespostaFrequencia", ["w", "G", "modulo_db", "fase_graus", "margens"])
+
+
+def _sem_zeros_iniciais(coefs):
+    coefs = np.atleast_1d(np.asarray(coefs))
+    nao_nulos = np.flatnonzero(coefs)
+    return coefs[nao_nulos[0]:] if len(nao_nulos) else coefs[:0]
+
+
+def polinomio_em_jw(coefs):
+    """Reescreve p(s) como polinômio de coeficientes complexos na variável real ω (s = jω)."""
+    coefs = np.asarray(coefs, dtype=float)
+    graus = np.arange(len(coefs) - 1, -1, -1)
+    return coefs * (1j ** graus)
+
+
+def _raizes_reais_positivas(poli, tol=1e-7):
+    poli = _sem_zeros_iniciais(poli)
+    if len(poli) < 2:
+        return np.empty(0)
+    raizes = np.roots(poli)
+    reais = np.real(raizes[np.abs(np.imag(raizes)) <= tol * np.maximum(1.0, np.abs(raizes))])
+    return np.sort(reais[reais > tol])
+
+
+def ganho_ultimo(num, den, tol=1e-7):
+    """Ganho e período últimos da malha den(s) + K*num(s) = 0, para K > 0.
+
+    Retorna PontoCritico(Ku, Pu, wu) com o menor ganho positivo que leva um par
+    de polos ao eixo imaginário (ω > 0), ou None se isso nunca acontece - caso
+    em que o método de Z-N em malha fechada não se aplica.
+    """
+    num = _sem_zeros_iniciais(np.asarray(num, dtype=float))
+    den = _sem_zeros_iniciais(np.asarray(den, dtype=float))
+    if len(num) == 0 or len(den) == 0:
+        return None
+
+    N, D = polinomio_em_jw(num), polinomio_em_jw(den)
+    # Fase de G(jω) = ±180°  <=>  Im{N(jω) * conj(D(jω))} = 0
+    cruzamento = np.imag(np.polymul(N, np.conj(D)))
+    candidatos = _raizes_reais_positivas(cruzamento, tol)
+    if len(candidatos) == 0:
+        return None
+
+    N_w, D_w = np.polyval(N, candidatos), np.polyval(D, candidatos)
+    validos = np.abs(N_w) > tol * np.maximum(1.0, np.abs(D_w))
+    if not np.any(validos):
+        return None
+    K = -D_w[validos] / N_w[validos]
+    w = candidatos[validos]
+
+    positivos = (np.real(K) > 0) & (np.abs(np.imag(K)) <= 1e-6 * np.maximum(1.0, np.abs(K)))
+    if not np.any(positivos):
+        return None
+    K, w = np.real(K[positivos]), w[positivos]
+    i = np.argmin(K)
+    return PontoCritico(float(K[i]), float(2 * np.pi / w[i]), float(w[i]))
+
+
+def _unico(coefs):
+    """Um único polinômio (escalar ou sequência de números), e não uma lista de polinômios."""
+    return not np.iterable(coefs) or not np.iterable(coefs[0])
+
+
+def _lote(coefs):
+    """Coeficientes de um ou vários polinômios como array (N, n+1), alinhados à direita."""
+    if _unico(coefs) or isinstance(coefs, np.ndarray):
+        return np.atleast_2d(np.asarray(coefs, dtype=float))
+    linhas = [np.atleast_1d(np.asarray(c, dtype=float)) for c in coefs]
+    lote = np.zeros((len(linhas), max(len(c) for c in linhas)))
+    for i, c in enumerate(linhas):
+        lote[i, lote.shape[1] - len(c):] = c
+    return lote
+
+
+def horner(coefs, s):
+    """p(s) para N polinômios (N, n+1) em pontos s (W,) ou (N, W): array (N, W)."""
+    acumulado = np.zeros(np.broadcast_shapes((coefs.shape[0], 1), np.shape(s)), dtype=complex)
+    for k in range(coefs.shape[1]):
+        acumulado = acumulado * s + coefs[:, k, None]
+    return acumulado
+
+
+def resposta_frequencia(num, den, w):
+    """G(jω) de N sistemas nas frequências w: array (N, W) (ou (W,) para um único sistema)."""
+    s = 1j * np.asarray(w, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        G = horner(_lote(num), s) / horner(_lote(den), s)
+    return G[0] if _unico(num) and _unico(den) else G
+
+
+def _polimul_lote(a, b):
+    produto = np.zeros((a.shape[0], a.shape[1] + b.shape[1] - 1), dtype=np.result_type(a, b))
+    for k in range(a.shape[1]):
+        produto[:, k:k + b.shape[1]] += a[:, k, None] * b
+    return produto
+
+
+def _raizes_reais_lote(coefs, tol=1e-7):
+    """Raízes reais ω ≥ 0 de N polinômios reais (N, n+1): array (N, max(n, 1)) com NaN onde não há raiz."""
+    escala = np.max(np.abs(coefs), axis=1, keepdims=True)
+    escala[escala == 0] = 1.0
+    coefs = coefs / escala
+    # Pelo menos uma coluna: ganho puro (n = 0) não tem cruzamentos, mas as margens ainda escolhem uma
+    raizes = np.full((coefs.shape[0], max(coefs.shape[1] - 1, 1)), np.nan)
+    # Agrupa por grau efetivo: cada grupo sai de uma única chamada a eigvals
+    nulos_iniciais = np.argmax(np.abs(coefs) > 1e-12, axis=1)
+    for z in np.unique(nulos_iniciais):
+        linhas = np.flatnonzero(nulos_iniciais == z)
+        grupo = coefs[linhas, z:]
+        if grupo.shape[1] < 2:
+            continue
+        r = raizes_lote(grupo)
+        reais = (np.abs(r.imag) <= tol * np.maximum(1.0, np.abs(r))) & (r.real >= -tol)
+        raizes[linhas[:, None], np.arange(r.shape[1])] = np.where(reais, np.abs(r.real), np.nan)
+    return raizes
+
+
+def _polinomios_cruzamento(num_l, den_l):
+    """Coeficientes em ω de Im{N(jω)·conj(D(jω))} (fase ±180°) e |N(jω)|² - |D(jω)|² (módulo 1)."""
+    N = num_l * 1j ** np.arange(num_l.shape[1] - 1, -1, -1)
+    D = den_l * 1j ** np.arange(den_l.shape[1] - 1, -1, -1)
+    fase = np.imag(_polimul_lote(N, np.conj(D)))
+    NN, DD = np.real(_polimul_lote(N, np.conj(N))), np.real(_polimul_lote(D, np.conj(D)))
+    largura = max(NN.shape[1], DD.shape[1])
+    modulo = np.zeros((num_l.shape[0], largura))
+    modulo[:, largura - NN.shape[1]:] += NN
+    modulo[:, largura - DD.shape[1]:] -= DD
+    return fase, modulo
+
+
+def margens(num, den, tol=1e-7):
+    """Margens de ganho (absoluta), fase (graus) e atraso (s) exatas, de um sistema ou de um lote.
+
+    Mesmos critérios do ctl.margin: entre os cruzamentos de fase com
+    Re{G} < 0 vale o de margem de ganho mais próxima de 1 (em log) e, entre
+    os de ganho, o de menor |margem de fase|. A margem de atraso é o menor
+    (margem de fase em rad, em [0, 2π)) / ω_c entre os cruzamentos de ganho.
+    Sem cruzamento, a margem é inf e a frequência NaN. Com num/den em lote
+    ((N, ·) ou lista de listas), cada campo é um array (N,).
+    """
+    num_l, den_l = _lote(num), _lote(den)
+    n = max(num_l.shape[0], den_l.shape[0])
+    num_l, den_l = np.broadcast_to(num_l, (n, num_l.shape[1])), np.broadcast_to(den_l, (n, den_l.shape[1]))
+    poli_fase, poli_modulo = _polinomios_cruzamento(num_l, den_l)
+    w_180, w_c = _raizes_reais_lote(poli_fase, tol), _raizes_reais_lote(poli_modulo, tol)
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        G_180 = horner(num_l, 1j * np.nan_to_num(w_180)) / horner(den_l, 1j * np.nan_to_num(w_180))
+        validos = ~np.isnan(w_180) & np.isfinite(G_180) & (G_180.real < 0)
+        gm = np.where(validos, 1.0 / np.abs(G_180), np.nan)
+        distancia = np.where(validos, np.abs(np.log(gm)), np.inf)
+
+        G_c = horner(num_l, 1j * np.nan_to_num(w_c)) / horner(den_l, 1j * np.nan_to_num(w_c))
+        validos_c = ~np.isnan(w_c) & np.isfinite(G_c) & (w_c > 0)
+        pm = np.where(validos_c, np.remainder(np.angle(G_c, deg=True), 360.0) - 180.0, np.nan)
+        atrasos = np.where(validos_c, np.deg2rad(np.remainder(pm, 360.0)) / w_c, np.inf)
+
+    linhas = np.arange(n)
+    i_g = np.argmin(distancia, axis=1)
+    i_c = np.argmin(np.where(validos_c, np.abs(pm), np.inf), axis=1)
+    tem_g, tem_c = validos.any(axis=1), validos_c.any(axis=1)
+    resultado = Margens(np.where(tem_g, gm[linhas, i_g], np.inf), np.where(tem_c, pm[linhas, i_c], np.inf),
+                        np.min(atrasos, axis=1), np.where(tem_g, w_180[linhas, i_g], np.nan),
+                        np.where(tem_c, w_c[linhas, i_c], np.nan))
+    if _unico(num) and _unico(den):
+        return Margens(*(float(v[0]) for v in resultado))
+    return resultado
+
+
+def _frequencias_caracteristicas(num_l, den_l):
+    raizes = [raizes_lote(c[:, np.argmax(np.abs(c).max(axis=0) > 0):]) for c in (num_l, den_l) if c.shape[1] > 1]
+    modulos = np.abs(np.concatenate([r.ravel() for r in raizes])) if raizes else np.empty(0)
+    return modulos[np.isfinite(modulos) & (modulos > 1e-9)]
+
+
+def grade_frequencia(num, den, w_limites=None, pontos=200, tol_fase=5.0, tol_modulo_db=1.0, refinos=6, maximo=5000):
+    """Grade log em ω comum a todos os sistemas, refinada onde a resposta varia rápido.
+
+    Sem `w_limites`, vai de uma década abaixo do menor a uma acima do maior
+    |polo|/|zero|. Os cruzamentos exatos de ganho e de fase entram na grade.
+    A cada refino, cada intervalo em que algum sistema muda mais que
+    `tol_fase` graus ou `tol_modulo_db` dB ganha o ponto médio geométrico.
+    """
+    num_l, den_l = _lote(num), _lote(den)
+    if w_limites is None:
+        caracteristicas = _frequencias_caracteristicas(num_l, den_l)
+        if len(caracteristicas):
+            w_limites = (10 ** (np.floor(np.log10(caracteristicas.min())) - 1),
+                         10 ** (np.ceil(np.log10(caracteristicas.max())) + 1))
+        else:
+            w_limites = (1e-2, 1e2)
+    w = np.logspace(np.log10(w_limites[0]), np.log10(w_limites[1]), pontos)
+    m = margens(num_l, den_l)
+    cruzamentos = np.concatenate([np.atleast_1d(m.w_180), np.atleast_1d(m.w_c)])
+    cruzamentos = cruzamentos[np.isfinite(cruzamentos) & (cruzamentos > w[0]) & (cruzamentos < w[-1])]
+    w = np.unique(np.concatenate([w, cruzamentos]))
+
+    for _ in range(refinos):
+        G = np.atleast_2d(resposta_frequencia(num_l, den_l, w))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            modulo = 20 * np.log10(np.abs(G))
+            fase = np.degrees(np.unwrap(np.angle(G), axis=1))
+            salto = (np.abs(np.diff(fase, axis=1)) > tol_fase) | (np.abs(np.diff(modulo, axis=1)) > tol_modulo_db)
+        intervalos = np.flatnonzero(salto.any(axis=0))
+        if len(intervalos) == 0 or len(w) + len(intervalos) > maximo:
+            break
+        w = np.sort(np.concatenate([w, np.sqrt(w[intervalos] * w[intervalos + 1])]))
+    return w
+
+
+def analise_frequencia(num, den, w=None, **kwargs):
+    """Bode/Nyquist prontos para plotar e margens exatas (RespostaFrequencia).
+
+    G, modulo_db e fase_graus (desenrolada) têm forma (W,) para um sistema ou
+    (N, W) para um lote; `kwargs` vão para `grade_frequencia` quando w não é dado.
+    """
+    w = grade_frequencia(num, den, **kwargs) if w is None else np.asarray(w, dtype=float)
+    G = resposta_frequencia(num, den, w)
+    with np.errstate(divide="ignore"):
+        modulo_db = 20 * np.log10(np.abs(G))
+    fase_graus = np.degrees(np.unwrap(np.angle(G), axis=-1))
+    return RespostaFrequencia(w, G, modulo_db, fase_graus, margens(num, den))
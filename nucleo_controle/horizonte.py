@@ -0,0 +1,115 @@
+"""Planejamento da grade de tempo das simulações a partir dos polos.
+
+Antes toda resposta era simulada em `np.linspace(0, 75, 2000)`: plantas
+rápidas gastavam quase todas as amostras numa reta e plantas lentas eram
+truncadas antes de acomodar, o que estragava `y_final = resposta[-1]` e a
+estimativa K/L/T. Aqui o horizonte vem do polo estável mais lento (tempo até
+a exponencial cair abaixo de `tol`) e o passo vem da dinâmica mais rápida
+(constante de tempo e período de oscilação). Depois da simulação a cauda já
+acomodada é cortada.
+
+O python-control exige tempos igualmente espaçados, por isso a grade é
+uniforme; a concentração de amostras onde a resposta varia vem da escolha
+do passo e do corte da cauda.
+"""
+import numpy as np
+import control as ctl
+
+from .rastreio import rastreador
+
+TOL_ACOMODACAO = 2e-3
+
+
+def _polos(sistemas):
+    polos = [np.atleast_1d(ctl.poles(sistema)) for sistema in sistemas]
+    return np.concatenate(polos) if polos else np.array([])
+
+
+def grade_tempo(*sistemas, tol=TOL_ACOMODACAO, pontos_por_ciclo=25, pontos_por_constante=50,
+                minimo=200, maximo=4000, t_padrao=10.0):
+    """Vetor de tempo uniforme adequado à dinâmica de todos os `sistemas` juntos.
+
+    Horizonte: ln(1/tol) constantes de tempo do polo estável mais lento (com
+    folga para polos repetidos), 10 períodos para polos oscilatórios sobre o
+    eixo imaginário e ln(100) constantes de tempo para polos instáveis.
+    Passo: `pontos_por_constante` amostras na constante de tempo do polo real
+    mais rápido e `pontos_por_ciclo` amostras no período natural do par
+    complexo mais rápido. O número
+    de amostras fica entre `minimo` e `maximo`.
+    """
+    polos = _polos(sistemas)
+    modulo = np.abs(polos)
+    escala = max(float(modulo.max()), 1.0) if modulo.size else 1.0
+    relevantes = polos[modulo > 1e-9 * escala]  # integradores puros não definem escala de tempo
+    if relevantes.size == 0:
+        return np.linspace(0, t_padrao, minimo)
+
+    sigma = -relevantes.real
+    omega = np.abs(relevantes.imag)
+    margem = 1e-9 * escala
+    horizontes = []
+    estaveis = sigma > margem
+    if np.any(estaveis):
+        horizontes.append(1.5 * np.log(1 / tol) / sigma[estaveis].min())
+    oscilatorios = (np.abs(sigma) <= margem) & (omega > 0)
+    if np.any(oscilatorios):
+        horizontes.append(10 * 2 * np.pi / omega[oscilatorios].min())
+    instaveis = sigma < -margem
+    if np.any(instaveis):
+        horizontes.append(np.log(100) / -sigma[instaveis].max())
+    horizonte = min(horizontes) if np.any(instaveis) else max(horizontes)
+
+    reais = omega <= margem
+    passo = np.inf
+    if np.any(reais):
+        passo = 1 / (pontos_por_constante * np.abs(sigma[reais]).max())
+    if np.any(~reais):
+        passo = min(passo, 2 * np.pi / (pontos_por_ciclo * np.abs(relevantes[~reais]).max()))
+    n = int(np.clip(np.ceil(horizonte / passo) + 1, minimo, maximo))
+    return np.linspace(0, horizonte, n)
+
+
+def indice_acomodacao(resposta, tol=TOL_ACOMODACAO):
+    """Primeiro índice a partir do qual a resposta fica dentro de ±tol do valor final.
+
+    A faixa é relativa à maior excursão do sinal, de modo que respostas que
+    voltam a zero (perturbação rejeitada) também têm critério.
+    """
+    resposta = np.asarray(resposta)
+    final = resposta[-1]
+    faixa = tol * max(np.ptp(resposta), abs(final), 1e-12)
+    fora = np.flatnonzero(np.abs(resposta - final) > faixa)
+    return int(fora[-1]) + 1 if len(fora) else 0
+
+
+def _saidas_degrau(sistema, tempo):
+    """Respostas ao degrau de todas as saídas de um sistema de uma entrada, uma por linha."""
+    return list(np.asarray(ctl.step_response(sistema, T=tempo).outputs).reshape(-1, len(tempo)))
+
+
+def simular_degrau(*sistemas, tol=TOL_ACOMODACAO, extensoes=3, folga=0.25, minimo=200, maximo=4000):
+    """Resposta ao degrau de cada sistema numa grade comum: (tempo, resposta_1, resposta_2, ...).
+
+    Um sistema com várias saídas (uma entrada) contribui uma resposta por
+    saída, todas da mesma integração.
+
+    Se algum sistema estável ainda não acomodou no fim da grade, o horizonte
+    é dobrado (até `extensoes` vezes). No fim a cauda acomodada é cortada,
+    mantendo `folga` (fração do tempo de acomodação) depois do último sistema
+    a acomodar, sem ficar com menos de `minimo` / 2 amostras.
+    """
+    tempo = grade_tempo(*sistemas, tol=tol, minimo=minimo, maximo=maximo)
+    estaveis = all(np.all(np.real(_polos([sistema])) < 0) for sistema in sistemas)
+    for tentativa in range(extensoes + 1):
+        with rastreador.trecho("step_response", pontos=len(tempo)):
+            respostas = [resposta for sistema in sistemas for resposta in _saidas_degrau(sistema, tempo)]
+        indices = [indice_acomodacao(resposta, tol) for resposta in respostas]
+        if not estaveis or not all(np.isfinite(r).all() for r in respostas):
+            return (tempo, *respostas)
+        if max(indices) < 0.9 * len(tempo) or tentativa == extensoes:
+            break
+        tempo = np.linspace(0, 2 * tempo[-1], min(2 * len(tempo), maximo))
+
+    corte = min(len(tempo), int(np.ceil(max(indices) * (1 + folga))) + 1)
+    corte = max(corte, min(len(tempo), minimo // 2))
+    return (tempo[:corte], *(resposta[:corte] for resposta in respostas))
@@ -0,0 +1,340 @@
+"""Identificação K, L, T (primeira ordem com atraso) a partir de ensaios ao degrau gravados.
+
+`identificar_curva_reacao` trabalha sobre uma resposta simulada inteira na
+memória. Ensaios reais (históricos da planta em CSV, milhões de amostras
+com ruído) são lidos aqui em blocos - CSV linha a linha ou .npy mapeado em
+memória - e passam uma única vez por um `IdentificadorStreaming`:
+
+- suavização e derivada por regressão linear local numa janela centrada de
+  `janela` amostras (Savitzky-Golay de 1ª ordem sobre os tempos reais),
+  com as últimas amostras de cada bloco guardadas para o seguinte;
+- o instante do degrau sai da coluna de entrada (primeira amostra que se
+  afasta da linha de base) ou é dado;
+- o ponto de inclinação máxima é acompanhado incrementalmente, e a curva
+  suavizada é guardada decimada (passo dobrado quando o buffer enche)
+  para os cruzamentos de 28% e 63%;
+- o valor final é a média das últimas amostras (buffer circular).
+
+A memória fica limitada por `janela`, `max_pontos` e pelo tamanho do bloco,
+qualquer que seja o tamanho do arquivo. Métodos: "tangente" e "63" (os
+mesmos do FT_Controle e do ASD) e "28_63" (Smith: T = 1,5·(t63 - t28),
+L = t63 - T).
+
+Uso:
+    python -m nucleo_controle.identificacao ensaio.csv --tempo t --saida y --entrada u --metodo 28_63
+"""
+import argparse
+import csv
+import itertools
+import json
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from .memoria import rss_mb
+from .motor import sintonia_zn_reacao
+from .rastreio import rastreador
+
+IdentificacaoEnsaio = namedtuple("IdentificacaoEnsaio", [
+    "K", "L", "T", "metodo", "t_degrau", "y_inicial", "y_final", "amplitude",
+    "inclinacao", "t_inf", "y_inf", "amostras", "tempo", "resposta"])
+
+METODOS = ("tangente", "63", "28_63")
+# Blocos internos limitados: as somas acumuladas da regressão ficam precisas
+BLOCO_INTERNO = 65536
+
+
+def _regressao_local(t, y, janela):
+    """Valor suavizado e inclinação da reta ajustada em cada janela completa de `janela` amostras.
+
+    Retorna (t_centro, y_suave, inclinacao), com len(t) - janela + 1 pontos.
+    """
+    t0, y0 = t[0], y[0]
+    tr, yr = t - t0, y - y0
+    ct, cy, ctt, cty = (np.concatenate(([0.0], np.cumsum(v))) for v in (tr, yr, tr * tr, tr * yr))
+    St, Sy, Stt, Sty = (c[janela:] - c[:-janela] for c in (ct, cy, ctt, cty))
+    n = float(janela)
+    variancia = n * Stt - St * St
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inclinacao = np.where(variancia > 0, (n * Sty - St * Sy) / variancia, 0.0)
+    meio = janela // 2
+    t_centro = t[meio:len(t) - meio]
+    y_suave = y0 + Sy / n + inclinacao * (t_centro - t0 - St / n)
+    return t_centro, y_suave, inclinacao
+
+
+class IdentificadorStreaming:
+    """Acumula um ensaio ao degrau bloco a bloco e identifica K, L e T no final.
+
+    entrada_presente: se os blocos trazem a coluna de entrada u (o degrau é
+    detectado nela). Sem entrada, o degrau ocorre em `t_degrau` (padrão: o
+    primeiro instante) com amplitude `amplitude`.
+    """
+
+    def __init__(self, janela=101, t_degrau=None, amplitude=1.0, entrada_presente=False,
+                 limiar_degrau=None, amostras_base=50, amostras_finais=500, max_pontos=20000):
+        if janela < 3:
+            raise ValueError("A janela de suavização precisa de ao menos 3 amostras.")
+        self.janela = janela | 1
+        self.entrada_presente = entrada_presente
+        self.t_degrau = t_degrau
+        self.amplitude = amplitude
+        self.limiar_degrau = limiar_degrau
+        self.amostras_base = amostras_base
+        self.amostras_finais = amostras_finais
+        self.max_pontos = max_pontos
+        self.amostras = 0
+
+        self._t_resto = self._y_resto = np.empty(0)
+        self._base_u = []
+        self._u0 = None
+        self._u_finais = self._y_finais = np.empty(0)
+        # Linha de base de y: soma e contagem das amostras suavizadas anteriores ao degrau
+        self._soma_base, self._n_base, self._primeiro_suave = 0.0, 0, None
+        self._maximo = (-np.inf, np.nan, np.nan)   # (inclinação, t, y suavizado)
+        self._minimo = (np.inf, np.nan, np.nan)
+        self._curva_t, self._curva_y = [], []
+        self._passo, self._contador = 1, 0
+
+    def alimentar(self, t, y, u=None):
+        """Processa um bloco de amostras (arrays 1-D do mesmo tamanho, tempo crescente)."""
+        t, y = np.asarray(t, dtype=float), np.asarray(y, dtype=float)
+        u = None if u is None else np.asarray(u, dtype=float)
+        for inicio in range(0, len(t), BLOCO_INTERNO):
+            fim = inicio + BLOCO_INTERNO
+            self._alimentar(t[inicio:fim], y[inicio:fim], None if u is None else u[inicio:fim])
+
+    def _alimentar(self, t, y, u):
+        if not len(t):
+            return
+        self.amostras += len(t)
+        self._y_finais = np.concatenate((self._y_finais, y))[-self.amostras_finais:]
+        if self.entrada_presente:
+            if u is None:
+                raise ValueError("O identificador espera a coluna de entrada em todos os blocos.")
+            self._u_finais = np.concatenate((self._u_finais, u))[-self.amostras_finais:]
+            if self.t_degrau is None:
+                self._detectar_degrau(t, u)
+        elif self.t_degrau is None:
+            self.t_degrau = float(t[0])
+
+        t_todo = np.concatenate((self._t_resto, t))
+        y_todo = np.concatenate((self._y_resto, y))
+        self._t_resto, self._y_resto = t_todo[-(self.janela - 1):], y_todo[-(self.janela - 1):]
+        if len(t_todo) < self.janela:
+            return
+        t_c, y_s, m = _regressao_local(t_todo, y_todo, self.janela)
+        if self._primeiro_suave is None:
+            self._primeiro_suave = float(y_s[0])
+
+        # Antes do degrau (ou enquanto ele não foi detectado) as amostras só entram na linha de base
+        corte = len(t_c) if self.t_degrau is None else int(np.searchsorted(t_c, self.t_degrau, side="left"))
+        if corte:
+            self._soma_base += float(np.sum(y_s[:corte]))
+            self._n_base += corte
+        t_c, y_s, m = t_c[corte:], y_s[corte:], m[corte:]
+        if not len(t_c):
+            return
+
+        i, j = int(np.argmax(m)), int(np.argmin(m))
+        if m[i] > self._maximo[0]:
+            self._maximo = (float(m[i]), float(t_c[i]), float(y_s[i]))
+        if m[j] < self._minimo[0]:
+            self._minimo = (float(m[j]), float(t_c[j]), float(y_s[j]))
+        self._guardar_curva(t_c, y_s)
+
+    def _detectar_degrau(self, t, u):
+        """Primeira amostra de u fora da faixa da linha de base (mediana ± limiar)."""
+        if self._u0 is None:
+            faltam = self.amostras_base - len(self._base_u)
+            self._base_u.extend(u[:faltam].tolist())
+            if len(self._base_u) < self.amostras_base:
+                return
+            base = np.asarray(self._base_u)
+            self._u0 = float(np.median(base))
+            if self.limiar_degrau is None:
+                ruido = float(np.median(np.abs(base - self._u0)))
+                self.limiar_degrau = max(10 * 1.4826 * ruido, 1e-9 * max(1.0, abs(self._u0)))
+        fora = np.flatnonzero(np.abs(u - self._u0) > self.limiar_degrau)
+        if len(fora):
+            self.t_degrau = float(t[fora[0]])
+
+    def _guardar_curva(self, t_c, y_s):
+        """Curva suavizada decimada: no máximo `max_pontos`, com o passo dobrado a cada enchimento."""
+        indices = np.arange(len(t_c))
+        pegar = ((self._contador + indices) % self._passo) == 0
+        self._contador += len(t_c)
+        self._curva_t.extend(t_c[pegar].tolist())
+        self._curva_y.extend(y_s[pegar].tolist())
+        while len(self._curva_t) > self.max_pontos:
+            self._curva_t, self._curva_y = self._curva_t[::2], self._curva_y[::2]
+            self._passo *= 2
+
+    def resultado(self, metodo="tangente", minimo=1e-4):
+        """IdentificacaoEnsaio com K, L, T pelo `metodo`; tempo relativo ao degrau e resposta em desvio / amplitude.
+
+        L (e T, nos métodos por porcentagens) menores ou iguais a zero são
+        trocados por `minimo`, como em identificar_curva_reacao.
+        """
+        if metodo not in METODOS:
+            raise ValueError(f"Método de identificação desconhecido: {metodo!r}.")
+        if self.t_degrau is None:
+            raise ValueError("Nenhum degrau foi encontrado na coluna de entrada.")
+        if not self._curva_t:
+            raise ValueError("Não há amostras suficientes depois do degrau para a janela de suavização.")
+
+        y0 = self._soma_base / self._n_base if self._n_base else self._primeiro_suave
+        y_final = float(np.mean(self._y_finais))
+        amplitude = self.amplitude
+        if self.entrada_presente:
+            amplitude = float(np.mean(self._u_finais)) - self._u0
+        if abs(amplitude) < 1e-12:
+            raise ValueError("A amplitude do degrau na entrada é nula.")
+        variacao = y_final - y0
+        m, t_inf, y_inf = self._maximo if variacao >= 0 else self._minimo
+        if not np.isfinite(m) or abs(m) < 1e-12 or np.sign(m) != np.sign(variacao):
+            raise ValueError("A inclinação da curva é muito baixa para este método.")
+
+        K = variacao / amplitude
+        L = (t_inf - self.t_degrau) - (y_inf - y0) / m
+        tempo = np.asarray(self._curva_t) - self.t_degrau
+        resposta = (np.asarray(self._curva_y) - y0) / amplitude
+        if metodo == "tangente":
+            T = variacao / m
+        else:
+            fracao = (np.asarray(self._curva_y) - y0) / variacao
+            t63 = _cruzamento(tempo, fracao, 0.632 if metodo == "28_63" else 0.63)
+            if metodo == "63":
+                T = t63 - L
+            else:
+                T = 1.5 * (t63 - _cruzamento(tempo, fracao, 0.283))
+                L = t63 - T
+            if T <= 0: T = minimo
+        if L <= 0: L = minimo
+        return IdentificacaoEnsaio(float(K), float(L), float(T), metodo, self.t_degrau, float(y0), y_final,
+                                   float(amplitude), float(m / amplitude), float(t_inf - self.t_degrau),
+                                   float((y_inf - y0) / amplitude), self.amostras, tempo, resposta)
+
+
+def _cruzamento(tempo, fracao, nivel):
+    """Primeiro instante em que `fracao` atinge `nivel`, interpolado entre as amostras vizinhas."""
+    acima = np.flatnonzero(fracao >= nivel)
+    if not len(acima):
+        raise ValueError(f"A resposta não atinge {100 * nivel:.1f}% da variação final.")
+    k = acima[0]
+    if k == 0:
+        return float(tempo[0])
+    f0, f1 = fracao[k - 1], fracao[k]
+    return float(tempo[k - 1] + (nivel - f0) * (tempo[k] - tempo[k - 1]) / (f1 - f0))
+
+
+def _coluna(nome, cabecalho):
+    if isinstance(nome, int) or str(nome).isdigit():
+        return int(nome)
+    if cabecalho is None or nome not in cabecalho:
+        raise ValueError(f"Coluna {nome!r} não encontrada no cabeçalho: {cabecalho}.")
+    return cabecalho.index(nome)
+
+
+def ler_blocos_csv(caminho, tempo=0, saida=1, entrada=None, linhas_por_bloco=100_000):
+    """Gera (t, y, u ou None) em blocos de até `linhas_por_bloco` linhas de um CSV.
+
+    Colunas por nome (com cabeçalho) ou índice. O separador é detectado na
+    primeira linha; com ";" a vírgula decimal é aceita.
+    """
+    with open(caminho, newline="", encoding="utf-8-sig") as arquivo:
+        primeira = arquivo.readline()
+        separador = csv.Sniffer().sniff(primeira, delimiters=",;\t ").delimiter
+        campos = [c.strip() for c in primeira.strip().split(separador)]
+        try:
+            [float(c.replace(",", ".")) for c in campos]
+            cabecalho, pendentes = None, [primeira]
+        except ValueError:
+            cabecalho, pendentes = campos, []
+        colunas = [_coluna(c, cabecalho) for c in (tempo, saida) + ((entrada,) if entrada is not None else ())]
+        virgula_decimal = separador == ";"
+
+        linhas = itertools.chain(pendentes, arquivo)
+        while True:
+            bloco = [linha for linha in itertools.islice(linhas, linhas_por_bloco) if linha.strip()]
+            if not bloco:
+                return
+            if virgula_decimal:
+                bloco = [linha.replace(",", ".") for linha in bloco]
+            dados = np.loadtxt(bloco, delimiter=None if separador == " " else separador, usecols=colunas, ndmin=2)
+            yield dados[:, 0], dados[:, 1], dados[:, 2] if entrada is not None else None
+
+
+def ler_blocos_npy(caminho, tempo=0, saida=1, entrada=None, linhas_por_bloco=1_000_000):
+    """Gera (t, y, u ou None) em blocos de um .npy 2-D (amostras x colunas) mapeado em memória."""
+    dados = np.load(caminho, mmap_mode="r")
+    if dados.ndim != 2:
+        raise ValueError("O arquivo .npy deve ter forma (amostras, colunas).")
+    for inicio in range(0, dados.shape[0], linhas_por_bloco):
+        bloco = np.asarray(dados[inicio:inicio + linhas_por_bloco], dtype=float)
+        yield bloco[:, int(tempo)], bloco[:, int(saida)], bloco[:, int(entrada)] if entrada is not None else None
+
+
+def ler_blocos(caminho, tempo=0, saida=1, entrada=None, linhas_por_bloco=None):
+    """ler_blocos_npy para .npy e ler_blocos_csv para os demais arquivos."""
+    leitor = ler_blocos_npy if caminho.lower().endswith(".npy") else ler_blocos_csv
+    kwargs = {"linhas_por_bloco": linhas_por_bloco} if linhas_por_bloco else {}
+    return leitor(caminho, tempo, saida, entrada, **kwargs)
+
+
+def identificar_arquivo(caminho, tempo=0, saida=1, entrada=None, metodo="tangente", progresso=None,
+                        linhas_por_bloco=None, **kwargs):
+    """Lê o ensaio em blocos e devolve a IdentificacaoEnsaio; kwargs vão para o IdentificadorStreaming.
+
+    `progresso(amostras)` é chamado depois de cada bloco (ex.: para cancelar
+    a tarefa da interface).
+    """
+    identificador = IdentificadorStreaming(entrada_presente=entrada is not None, **kwargs)
+    with rastreador.trecho("identificar_arquivo", arquivo=caminho):
+        for t, y, u in ler_blocos(caminho, tempo, saida, entrada, linhas_por_bloco):
+            identificador.alimentar(t, y, u)
+            if progresso:
+                progresso(identificador.amostras)
+    return identificador.resultado(metodo)
+
+
+def sintonia_ensaio(ensaio):
+    """Ganhos de Z-N (Kp, Ki, Kd) para o modelo identificado.
+
+    sintonia_zn_reacao supõe ganho estático unitário (as plantas do
+    FT_Controle); num ensaio real K está em unidades de engenharia, então os
+    ganhos são divididos por K.
+    """
+    return tuple(g / ensaio.K for g in sintonia_zn_reacao(ensaio.K, ensaio.L, ensaio.T))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Identificação K, L, T de um ensaio ao degrau gravado (CSV ou .npy), em blocos.")
+    parser.add_argument("arquivo", help="arquivo .csv ou .npy com o ensaio")
+    parser.add_argument("--tempo", default="0", help="coluna do tempo (nome ou índice)")
+    parser.add_argument("--saida", default="1", help="coluna da variável de processo (nome ou índice)")
+    parser.add_argument("--entrada", default=None, help="coluna da entrada; sem ela, use --t-degrau e --amplitude")
+    parser.add_argument("--metodo", choices=METODOS, default="tangente")
+    parser.add_argument("--janela", type=int, default=101, help="amostras da janela de suavização")
+    parser.add_argument("--t-degrau", type=float, default=None, help="instante do degrau (sem coluna de entrada)")
+    parser.add_argument("--amplitude", type=float, default=1.0, help="amplitude do degrau (sem coluna de entrada)")
+    parser.add_argument("--linhas-por-bloco", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    ensaio = identificar_arquivo(args.arquivo, args.tempo, args.saida, args.entrada, args.metodo,
+                                 linhas_por_bloco=args.linhas_por_bloco, janela=args.janela,
+                                 t_degrau=args.t_degrau, amplitude=args.amplitude)
+    Kp, Ki, Kd = sintonia_ensaio(ensaio)
+    resultado = {"K": ensaio.K, "L": ensaio.L, "T": ensaio.T, "metodo": ensaio.metodo, "t_degrau": ensaio.t_degrau,
+                 "y_inicial": ensaio.y_inicial, "y_final": ensaio.y_final, "amplitude": ensaio.amplitude,
+                 "Kp": Kp, "Ki": Ki, "Kd": Kd, "amostras": ensaio.amostras,
+                 "segundos": time.perf_counter() - inicio, "rss_mb": rss_mb()}
+    json.dump(resultado, sys.stdout, indent=2, ensure_ascii=False)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Cache de figuras estáticas (equações em LaTeX e diagramas de blocos) rasterizadas em PNG.
+
+O layout do mathtext e o desenho Agg dominam o tempo das seções de
+equações e diagramas, e o resultado só depende do conteúdo (as strings
+LaTeX, os nomes das variáveis) e do tamanho da figura. Cada variante é
+desenhada uma vez numa Figure avulsa (sem pyplot), gravada em PNG e
+guardada num LRU limitado; a interface escolhe, via `converter`, o objeto
+que fica em cache (ex.: ImageTk.PhotoImage), de modo que uma nova análise do
+mesmo sistema custa só uma consulta ao dicionário.
+"""
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from .rastreio import rastreador
+
+
+def renderizar_png(desenhar, figsize, dpi=100):
+    """Desenha `desenhar(fig)` numa Figure do tamanho dado e devolve os bytes do PNG."""
+    fig = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(fig)
+    desenhar(fig)
+    buffer = BytesIO()
+    fig.savefig(buffer, format="png", dpi=dpi)
+    return buffer.getvalue()
+
+
+class CacheImagens:
+    """LRU de imagens renderizadas, chaveadas por (conteúdo, tamanho, dpi)."""
+
+    def __init__(self, capacidade=64, converter=None):
+        self.capacidade = capacidade
+        self.converter = converter or (lambda png: png)
+        self.acertos = self.falhas = 0
+        self._entradas = OrderedDict()
+        self._trava = threading.Lock()
+
+    def obter(self, conteudo, desenhar, figsize, dpi=100):
+        """Imagem convertida de `desenhar(fig)`; só renderiza se (conteudo, figsize, dpi) não estiver em cache.
+
+        `conteudo` deve identificar completamente o desenho (ex.: o nome do
+        diagrama e as strings LaTeX que ele mostra).
+        """
+        chave = (conteudo, tuple(figsize), dpi)
+        with self._trava:
+            if chave in self._entradas:
+                self._entradas.move_to_end(chave)
+                self.acertos += 1
+                return self._entradas[chave]
+
+        with rastreador.trecho("renderizar_png", conteudo=conteudo[0] if isinstance(conteudo, tuple) else conteudo):
+            imagem = self.converter(renderizar_png(desenhar, figsize, dpi))
+        with self._trava:
+            self.falhas += 1
+            self._entradas[chave] = imagem
+            while len(self._entradas) > self.capacidade:
+                self._entradas.popitem(last=False)
+        return imagem
+
+    def limpar(self):
+        with self._trava:
+            self._entradas.clear()
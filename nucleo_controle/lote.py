@@ -0,0 +1,156 @@
+"""Sintonia em lote pela linha de comando.
+
+Lê plantas de um arquivo CSV ou JSONL, distribui a análise num pool de
+processos e grava cada resultado em JSONL assim que fica pronto, de modo que
+a memória não cresce com o tamanho do lote.
+
+Formato de entrada (uma planta por linha/registro):
+    JSONL: {"id": "p1", "num": [2], "den": [10, 1]}
+           {"id": "p2", "equacao": "a*diff(y(t),t) + y(t) = u(t)", "parametros": {"a": 3}}
+    CSV:   colunas id, num, den (coeficientes separados por espaço) ou
+           id, equacao, entrada, saida; demais colunas viram parâmetros.
+
+Com --acervo, a resposta em malha fechada de cada planta vai para um
+acervo.AcervoRespostas (o JSONL ganha o campo "acervo_id"), para comparar ou
+desenhar depois sem re-simular.
+
+Uso:
+    python -m nucleo_controle.lote plantas.jsonl -o resultados.jsonl --metodo frequencia -j 8
+    python -m nucleo_controle.lote plantas.jsonl -o resultados.jsonl --acervo varredura/
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from .acervo import AcervoRespostas
+from .cache_ft import CacheFT
+from .motor import analisar_equacao, analisar_planta
+
+COLUNAS_FIXAS = {"id", "num", "den", "equacao", "entrada", "saida"}
+
+# Um cache por processo: lotes com a mesma EDO e parâmetros diferentes só derivam G(s) uma vez
+_cache_ft = CacheFT()
+
+
+def _coeficientes(valor):
+    if isinstance(valor, str):
+        return [float(c) for c in valor.replace(",", " ").split()]
+    return [float(c) for c in valor]
+
+
+def ler_plantas(caminho):
+    """Gera os registros do arquivo um a um (CSV ou JSONL, pela extensão)."""
+    with open(caminho, newline="", encoding="utf-8") as arquivo:
+        if caminho.lower().endswith(".csv"):
+            for linha in csv.DictReader(arquivo):
+                registro = {k: v for k, v in linha.items() if k in COLUNAS_FIXAS and v not in (None, "")}
+                parametros = {k: v for k, v in linha.items() if k not in COLUNAS_FIXAS and v not in (None, "")}
+                if parametros:
+                    registro["parametros"] = parametros
+                yield registro
+        else:
+            for linha in arquivo:
+                if linha.strip():
+                    yield json.loads(linha)
+
+
+def processar_registro(registro, metodo="reacao", respostas=False):
+    """Analisa um registro; erros viram o campo "erro" em vez de interromper o lote."""
+    try:
+        if "equacao" in registro:
+            parametros = {k: float(v) for k, v in registro.get("parametros", {}).items()}
+            resultado = analisar_equacao(registro["equacao"], registro.get("entrada", "u"),
+                                         registro.get("saida", "y"), parametros, metodo, cache=_cache_ft,
+                                         respostas=respostas)
+        else:
+            resultado = analisar_planta(_coeficientes(registro["num"]), _coeficientes(registro["den"]), metodo,
+                                        respostas=respostas)
+    except Exception as e:
+        resultado = {"erro": str(e)}
+    resultado["id"] = registro.get("id")
+    return resultado
+
+
+def _processar(args):
+    return processar_registro(*args)
+
+
+def executar_lote(registros, saida, metodo="reacao", processos=None, em_voo=None, relatorio=None, acervo=None):
+    """Processa os registros e escreve um JSON por linha em `saida` (arquivo aberto).
+
+    No máximo `em_voo` registros ficam pendentes ao mesmo tempo, então a
+    memória é limitada mesmo para entradas muito grandes. Com `acervo` (um
+    AcervoRespostas), as respostas em malha fechada são acrescentadas a ele
+    por este processo, à medida que chegam. Retorna (total, falhas, segundos).
+    """
+    processos = processos or os.cpu_count() or 1
+    em_voo = em_voo or processos * 8
+    total = falhas = 0
+    inicio = time.perf_counter()
+
+    def gravar(resultado):
+        nonlocal total, falhas
+        total += 1
+        falhas += "erro" in resultado
+        if "resposta" in resultado:
+            identificacao = {k: resultado[k] for k in ("K", "L", "T", "Ku", "Pu") if k in resultado}
+            resultado["acervo_id"] = int(acervo.anexar_resposta(
+                resultado.pop("resposta"), resultado["Kp"], resultado["Ki"], resultado["Kd"],
+                resultado["num"], resultado["den"], **identificacao))
+        saida.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+        if relatorio and total % 1000 == 0:
+            decorrido = time.perf_counter() - inicio
+            relatorio(f"{total} plantas | {total / decorrido:.1f} plantas/s")
+
+    if processos == 1:
+        for registro in registros:
+            gravar(processar_registro(registro, metodo, acervo is not None))
+    else:
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            pendentes = deque()
+            for registro in registros:
+                pendentes.append(executor.submit(_processar, (registro, metodo, acervo is not None)))
+                if len(pendentes) >= em_voo:
+                    gravar(pendentes.popleft().result())
+            while pendentes:
+                gravar(pendentes.popleft().result())
+    saida.flush()
+    if acervo is not None:
+        acervo.sincronizar()
+    return total, falhas, time.perf_counter() - inicio
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sintonia PID (Ziegler-Nichols) em lote, sem interface gráfica.")
+    parser.add_argument("entrada", help="arquivo .csv ou .jsonl com as plantas")
+    parser.add_argument("-o", "--saida", default="-", help="arquivo .jsonl de resultados (padrão: stdout)")
+    parser.add_argument("--metodo", choices=["reacao", "frequencia"], default="reacao",
+                        help="curva de reação (Z-N 1) ou resposta em frequência (Z-N 2)")
+    parser.add_argument("-j", "--processos", type=int, default=None, help="número de processos (padrão: todos os núcleos)")
+    parser.add_argument("--acervo", default=None, help="diretório do acervo onde acrescentar as respostas em malha fechada")
+    args = parser.parse_args(argv)
+
+    def relatorio(msg):
+        print(msg, file=sys.stderr, flush=True)
+
+    saida = sys.stdout if args.saida == "-" else open(args.saida, "w", encoding="utf-8")
+    acervo = AcervoRespostas(args.acervo) if args.acervo else None
+    try:
+        total, falhas, segundos = executar_lote(ler_plantas(args.entrada), saida, args.metodo,
+                                                args.processos, relatorio=relatorio, acervo=acervo)
+    finally:
+        if saida is not sys.stdout:
+            saida.close()
+        if acervo is not None:
+            acervo.fechar()
+    taxa = total / segundos if segundos > 0 else float("inf")
+    relatorio(f"Concluído: {total} plantas ({falhas} com erro) em {segundos:.2f} s - {taxa:.1f} plantas/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Malha fechada PID + planta numa única realização em espaço de estados.
+
+Todas as funções de transferência da malha de realimentação unitária com
+C(s) = Nc/s, Nc = Kd*s² + Kp*s + Ki, e G(s) = num/den compartilham o mesmo
+denominador Δ = s*den + Nc*num:
+
+    Y/R = Nc*num / Δ     (referência)
+    Y/D = s*num / Δ      (perturbação em degrau na entrada da planta)
+    U/R = Nc*den / Δ     (esforço de controle para a referência)
+    U/D = -Nc*num / Δ    (esforço de controle para a perturbação)
+
+Por isso uma forma canônica controlável com uma saída por numerador basta:
+um degrau unitário na entrada dá, numa só integração, as quatro respostas.
+"""
+from collections import namedtuple
+
+import numpy as np
+import control as ctl
+
+from .horizonte import simular_degrau
+from .polinomios import polinomio_caracteristico_pid
+
+MalhaFechada = namedtuple("MalhaFechada", ["num_pid", "den_pid", "num_referencia", "num_perturbacao",
+                                           "num_controle", "num_controle_perturbacao", "den"])
+RespostaMalhaFechada = namedtuple("RespostaMalhaFechada", ["tempo", "saida", "perturbacao", "controle",
+                                                           "controle_perturbacao", "metricas"])
+
+
+def _sem_zeros_iniciais(coefs):
+    coefs = np.atleast_1d(np.asarray(coefs, dtype=float))
+    nao_nulos = np.flatnonzero(coefs)
+    return coefs[nao_nulos[0]:] if len(nao_nulos) else coefs[-1:]
+
+
+def malha_fechada_pid(num, den, Kp, Ki, Kd):
+    """Polinômios (coeficientes, maior grau primeiro) de todas as saídas da malha com PID."""
+    num, den = _sem_zeros_iniciais(num), _sem_zeros_iniciais(den)
+    num_pid = _sem_zeros_iniciais([Kd, Kp, Ki])
+    den_mf = _sem_zeros_iniciais(polinomio_caracteristico_pid(num, den, Kp, Ki, Kd))
+    num_c = np.polymul(num_pid, num)
+    return MalhaFechada(num_pid, np.array([1.0, 0.0]), num_c, np.polymul([1.0, 0.0], num),
+                        np.polymul(num_pid, den), -num_c, den_mf)
+
+
+def realizacao_malha_fechada(malha):
+    """Sistema em espaço de estados de uma entrada (degrau) e quatro saídas, na ordem de MalhaFechada.
+
+    Numeradores de grau maior que o denominador (o derivativo sobre um degrau
+    na referência) geram impulsos em t = 0 no esforço de controle; eles não
+    são representáveis numa resposta amostrada e ficam de fora - resta o
+    termo constante da divisão polinomial, que vai para D.
+    """
+    den = malha.den / malha.den[0]
+    n = len(den) - 1
+    A = np.zeros((n, n))
+    A[:-1, 1:] = np.eye(n - 1)
+    A[-1, :] = -den[:0:-1]
+    B = np.zeros((n, 1))
+    B[-1, 0] = 1.0
+
+    numeradores = (malha.num_referencia, malha.num_perturbacao, malha.num_controle, malha.num_controle_perturbacao)
+    C, D = np.zeros((len(numeradores), n)), np.zeros((len(numeradores), 1))
+    for i, numerador in enumerate(numeradores):
+        quociente, resto = np.polydiv(numerador / malha.den[0], den)
+        D[i, 0] = quociente[-1]
+        C[i, :len(resto)] = resto[::-1]
+    return ctl.ss(A, B, C, D)
+
+
+def metricas_degrau(tempo, resposta, faixa=0.02):
+    """Métricas clássicas da resposta ao degrau: sobressinal, tempos de subida, pico e acomodação."""
+    tempo, resposta = np.asarray(tempo), np.asarray(resposta)
+    y_final = resposta[-1]
+    if not np.isfinite(y_final) or abs(y_final) < 1e-12:
+        nan = float("nan")
+        return {"valor_final": float(y_final), "sobressinal": nan, "tempo_subida": nan,
+                "tempo_pico": nan, "tempo_acomodacao": nan}
+
+    normalizada = resposta / y_final
+    idx_pico = np.argmax(normalizada)
+    i10 = np.argmax(normalizada >= 0.1)
+    i90 = np.argmax(normalizada >= 0.9)
+    fora = np.flatnonzero(np.abs(normalizada - 1) > faixa)
+    t_acomodacao = tempo[min(fora[-1] + 1, len(tempo) - 1)] if len(fora) else tempo[0]
+    return {
+        "valor_final": float(y_final),
+        "sobressinal": float(max(0.0, normalizada[idx_pico] - 1) * 100),
+        "tempo_subida": float(tempo[i90] - tempo[i10]),
+        "tempo_pico": float(tempo[idx_pico]),
+        "tempo_acomodacao": float(t_acomodacao),
+    }
+
+
+def indices_integrais(tempo, erros):
+    """IAE, ISE e ITAE (regra do trapézio) de um ou mais sinais de erro, um por linha."""
+    tempo, erros = np.asarray(tempo), np.atleast_2d(erros)
+    dt = np.diff(tempo)
+    integrandos = np.stack([np.abs(erros), erros**2, tempo * np.abs(erros)])
+    integrais = np.sum(0.5 * (integrandos[..., 1:] + integrandos[..., :-1]) * dt, axis=-1)
+    return dict(zip(("IAE", "ISE", "ITAE"), integrais))
+
+
+def metricas_malha_fechada(tempo, saida, perturbacao, controle):
+    """Métricas do degrau na referência, índices integrais do erro e da perturbação e pico de esforço."""
+    metricas = metricas_degrau(tempo, saida)
+    indices = indices_integrais(tempo, np.vstack([1.0 - np.asarray(saida), perturbacao]))
+    for nome, valores in indices.items():
+        metricas[nome] = float(valores[0])
+        metricas[f"{nome}_perturbacao"] = float(valores[1])
+    metricas["pico_perturbacao"] = float(np.max(np.abs(perturbacao)))
+    metricas["pico_controle"] = float(np.max(np.abs(controle)))
+    return metricas
+
+
+def simular_malha(malha, t_sim=None):
+    """Integra referência, perturbação e esforço de controle de uma MalhaFechada de uma só vez.
+
+    Sem `t_sim`, a grade de tempo vem dos polos da malha fechada (horizonte.py).
+    """
+    sistema = realizacao_malha_fechada(malha)
+    if t_sim is None:
+        tempo, saida, perturbacao, controle, controle_perturbacao = simular_degrau(sistema)
+    else:
+        tempo = np.asarray(t_sim)
+        saida, perturbacao, controle, controle_perturbacao = np.asarray(ctl.step_response(sistema, T=tempo).outputs)[:, 0]
+    metricas = metricas_malha_fechada(tempo, saida, perturbacao, controle)
+    return RespostaMalhaFechada(tempo, saida, perturbacao, controle, controle_perturbacao, metricas)
+
+
+def simular_malha_fechada(num, den, Kp, Ki, Kd, t_sim=None):
+    """Monta a malha PID + planta e simula todas as respostas (RespostaMalhaFechada)."""
+    return simular_malha(malha_fechada_pid(num, den, Kp, Ki, Kd), t_sim)
@@ -0,0 +1,25 @@
+"""Medição da memória residente (RSS) do processo, sem dependências obrigatórias."""
+import os
+import sys
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def rss_mb():
+    """Memória residente atual em MB (psutil, /proc ou pico via resource, nessa ordem)."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / 2**20
+    try:
+        with open("/proc/self/statm") as arquivo:
+            return int(arquivo.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return pico / 2**20 if sys.platform == "darwin" else pico / 2**10
+    except ImportError:
+        return float("nan")
@@ -0,0 +1,226 @@
+"""Motor de análise e sintonia PID sem interface gráfica.
+
+Reúne as etapas que antes viviam dentro dos callbacks do FT_Controle e do
+ASD: EDO -> G(s), identificação K/L/T pela curva de reação, Ku/Pu pelo
+cruzamento com o eixo imaginário, ganhos de Ziegler-Nichols e métricas da
+resposta ao degrau em malha fechada. Nenhuma função aqui toca em widgets;
+erros de análise são sinalizados com ValueError.
+"""
+from collections import namedtuple
+
+import numpy as np
+import sympy as sp
+from sympy.abc import t, s
+import control as ctl
+
+from .frequencia import ganho_ultimo
+from .horizonte import simular_degrau
+from .malha_fechada import simular_malha_fechada
+from .otimizacao import otimizar_pid
+from .rastreio import rastreador
+
+ParametrosCurva = namedtuple("ParametrosCurva", ["K", "L", "T", "t_inf", "y_inf", "inclinacao"])
+
+
+def _termo_edo(fator, funcoes):
+    """Identifica y(t), u(t) ou uma derivada delas; devolve (função, ordem) ou None."""
+    if fator in funcoes:
+        return fator, 0
+    if isinstance(fator, sp.Derivative) and fator.expr in funcoes and set(fator.variables) == {t}:
+        return fator.expr, len(fator.variables)
+    return None
+
+
+def coeficientes_edo_linear(expr, y_func, u_func):
+    """Coeficientes de cada ordem de derivada de y e u em `expr` (= 0), numa só passada.
+
+    Retorna (coef_y, coef_u), dicionários {ordem: coeficiente}, ou None se a
+    expressão não for uma EDO linear de coeficientes constantes (ou simbólicos
+    independentes de t) - nesse caso o chamador usa o caminho geral do SymPy.
+    """
+    coefs = {y_func: {}, u_func: {}}
+    for termo in sp.Add.make_args(sp.expand(expr)):
+        encontrado, resto = None, []
+        for fator in sp.Mul.make_args(termo):
+            classe = _termo_edo(fator, coefs)
+            if classe is None:
+                resto.append(fator)
+            elif encontrado is None:
+                encontrado = classe
+            else:
+                return None
+        if encontrado is None:
+            return None
+        coef = sp.Mul(*resto)
+        if coef.has(t) or coef.atoms(sp.Derivative) or coef.atoms(sp.core.function.AppliedUndef):
+            return None
+        func, ordem = encontrado
+        coefs[func][ordem] = coefs[func].get(ordem, 0) + coef
+    return coefs[y_func], coefs[u_func]
+
+
+def _polinomio_em_s(coefs):
+    return sp.Add(*(c * s**ordem for ordem, c in coefs.items()))
+
+
+def derivar_ft(equacao, var_u="u", var_y="y"):
+    """Converte a EDO em texto (ex.: "10*diff(y(t),t) + y(t) = 2*u(t)") na G(s) simbólica.
+
+    EDOs lineares (de qualquer ordem) têm num e den montados direto dos
+    coeficientes de cada derivada; as demais passam pelo sp.solve.
+    """
+    equacao = equacao.strip()
+    if not equacao:
+        raise ValueError("O campo da equação está vazio.")
+
+    u_func, y_func = sp.Function(var_u)(t), sp.Function(var_y)(t)
+    U_s, Y_s = sp.symbols(f"{var_u.capitalize()}(s) {var_y.capitalize()}(s)")
+
+    lado_esq_str, lado_dir_str = (equacao.split("=") if "=" in equacao else (equacao, "0"))
+    with rastreador.trecho("sympify"):
+        lado_esq = sp.sympify(lado_esq_str, locals={"diff": sp.diff})
+        lado_dir = sp.sympify(lado_dir_str, locals={"diff": sp.diff})
+
+    with rastreador.trecho("edo_linear"):
+        linear = coeficientes_edo_linear(lado_esq - lado_dir, y_func, u_func)
+        if linear is not None:
+            coef_y, coef_u = linear
+            den = _polinomio_em_s(coef_y)
+            if den == 0:
+                raise ValueError("Não foi possível isolar a variável de saída Y(s).")
+            return sp.cancel(-_polinomio_em_s(coef_u) / den)
+
+    def aplicar_laplace(expr):
+        res = expr
+        for T_func, S_var in [(y_func, Y_s), (u_func, U_s)]:
+            for ordem in range(10, -1, -1):
+                res = res.replace(sp.Derivative(T_func, (t, ordem)), s**ordem * S_var) if ordem > 0 else res.replace(T_func, S_var)
+        return res
+
+    with rastreador.trecho("aplicar_laplace"):
+        eq_s = sp.Eq(aplicar_laplace(lado_esq), aplicar_laplace(lado_dir))
+    with rastreador.trecho("solve"):
+        sol = sp.solve(eq_s, Y_s)
+    if not sol:
+        raise ValueError("Não foi possível isolar a variável de saída Y(s).")
+    return sp.cancel(sol[0] / U_s)
+
+
+def parametros_livres(Gs_simbolica):
+    """Símbolos de G(s) que precisam de valor numérico, em ordem alfabética."""
+    return sorted(Gs_simbolica.free_symbols - {s}, key=str)
+
+
+def ft_numerica(Gs_simbolica, valores=None):
+    """Substitui os parâmetros e devolve (Gs_numerica, num, den) com coeficientes float."""
+    valores = {sp.Symbol(str(k)): v for k, v in (valores or {}).items()}
+    faltando = [p for p in parametros_livres(Gs_simbolica) if p not in valores]
+    if faltando:
+        raise ValueError(f"Faltam valores para os parâmetros: {', '.join(map(str, faltando))}.")
+    Gs_numerica = Gs_simbolica.subs(valores)
+    num = [float(c) for c in sp.Poly(sp.numer(Gs_numerica), s).all_coeffs()]
+    den = [float(c) for c in sp.Poly(sp.denom(Gs_numerica), s).all_coeffs()]
+    return Gs_numerica, num, den
+
+
+def identificar_curva_reacao(tempo, resposta, metodo="tangente", minimo=1e-4):
+    """Estima K, L e T (modelo de primeira ordem com atraso) pela reta tangente.
+
+    metodo="tangente": T = K / inclinação máxima (FT_Controle).
+    metodo="63": T = t(63%) - L, como no ASD.
+    L (e T, no método dos 63%) menores ou iguais a zero são trocados por `minimo`.
+    """
+    tempo, resposta = np.asarray(tempo), np.asarray(resposta)
+    y_final = resposta[-1]
+    dy = np.gradient(resposta, tempo)
+    idx_inf = np.argmax(dy)
+    t_inf, y_inf, m = tempo[idx_inf], resposta[idx_inf], dy[idx_inf]
+    if m < 1e-6:
+        raise ValueError("A inclinação da curva é muito baixa para este método.")
+
+    K, L = y_final, t_inf - y_inf / m
+    if metodo == "63":
+        T = np.interp(0.63 * y_final, resposta, tempo) - L
+        if T <= 0: T = minimo
+    else:
+        T = y_final / m
+    if L <= 0: L = minimo
+    return ParametrosCurva(float(K), float(L), float(T), float(t_inf), float(y_inf), float(m))
+
+
+def sintonia_zn_reacao(K, L, T):
+    """Ganhos PID de Ziegler-Nichols pela curva de reação (Kp, Ki, Kd)."""
+    Kp = 1.2 * T / L
+    return Kp, Kp / (2 * L), Kp * (0.5 * L)
+
+
+def sintonia_zn_frequencia(Ku, Pu):
+    """Ganhos PID de Ziegler-Nichols pelo ganho e período últimos (Kp, Ki, Kd)."""
+    Kp = 0.6 * Ku
+    return Kp, Kp / (0.5 * Pu), Kp * (0.125 * Pu)
+
+
+def analisar_planta(num, den, metodo="reacao", t_sim=None, otimizar=False, respostas=False):
+    """Executa a análise completa de uma planta num/den e devolve um dicionário de resultados.
+
+    metodo="reacao" usa a curva de reação (Z-N 1) e metodo="frequencia" usa
+    Ku/Pu (Z-N 2). O dicionário contém os parâmetros identificados, os ganhos
+    Kp/Ki/Kd e as métricas da resposta ao degrau em malha fechada. Sem
+    `t_sim`, a grade de tempo de cada simulação vem dos polos (horizonte.py) e
+    as métricas incluem IAE/ISE/ITAE da referência e da perturbação. Com
+    `otimizar`, a chave "otimizado" traz os ganhos refinados por ITAE a partir
+    dos de Z-N (otimizacao.py) e as métricas correspondentes. Com `respostas`,
+    a chave "resposta" traz a RespostaMalhaFechada dos ganhos de Z-N (para o
+    acervo.py, sem simular de novo).
+    """
+    sistema_ma = ctl.TransferFunction(num, den)
+    if np.any(np.real(sistema_ma.poles()) > 0):
+        raise ValueError("O sistema em malha aberta é INSTÁVEL. Os métodos de sintonia não serão aplicados.")
+    def degrau(sistema):
+        if t_sim is None:
+            return simular_degrau(sistema)
+        return ctl.step_response(sistema, T=t_sim)
+
+    resultado = {"num": [float(c) for c in num], "den": [float(c) for c in den], "metodo": metodo}
+    if metodo == "reacao":
+        tempo, resposta = degrau(sistema_ma)
+        curva = identificar_curva_reacao(tempo, resposta)
+        resultado.update(K=curva.K, L=curva.L, T=curva.T)
+        Kp, Ki, Kd = sintonia_zn_reacao(curva.K, curva.L, curva.T)
+    elif metodo == "frequencia":
+        ponto = ganho_ultimo(num, den)
+        if ponto is None or ponto.Ku <= 1:
+            raise ValueError("O sistema não possui uma margem de ganho > 1. O método Z-N 2 não é aplicável.")
+        resultado.update(Ku=ponto.Ku, Pu=ponto.Pu)
+        Kp, Ki, Kd = sintonia_zn_frequencia(ponto.Ku, ponto.Pu)
+    else:
+        raise ValueError(f"Método de sintonia desconhecido: {metodo!r}.")
+    resultado.update(Kp=Kp, Ki=Ki, Kd=Kd)
+
+    resposta = simular_malha_fechada(num, den, Kp, Ki, Kd, t_sim=t_sim)
+    resultado["metricas"] = resposta.metricas
+    if respostas:
+        resultado["resposta"] = resposta
+    if otimizar:
+        otimo = otimizar_pid(num, den, (Kp, Ki, Kd))
+        resultado["otimizado"] = {"Kp": otimo.Kp, "Ki": otimo.Ki, "Kd": otimo.Kd, "custo": otimo.custo,
+                                  "metricas": simular_malha_fechada(num, den, otimo.Kp, otimo.Ki, otimo.Kd, t_sim=t_sim).metricas}
+    return resultado
+
+
+def analisar_equacao(equacao, var_u="u", var_y="y", valores=None, metodo="reacao", t_sim=None, cache=None,
+                     otimizar=False, respostas=False):
+    """Igual a `analisar_planta`, partindo da EDO em texto e dos valores dos parâmetros.
+
+    Com `cache` (um cache_ft.CacheFT) a derivação simbólica é reaproveitada.
+    """
+    if cache is not None:
+        entrada = cache.obter(equacao, var_u, var_y)
+        Gs_simbolica = entrada.Gs_simbolica
+        num, den = entrada.coeficientes(valores)
+    else:
+        Gs_simbolica = derivar_ft(equacao, var_u, var_y)
+        _, num, den = ft_numerica(Gs_simbolica, valores)
+    resultado = analisar_planta(num, den, metodo, t_sim, otimizar, respostas)
+    resultado["G"] = str(Gs_simbolica)
+    return resultado
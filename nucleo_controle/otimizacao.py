@@ -0,0 +1,160 @@
+"""Sintonia PID por otimização (ITAE/IAE) a partir dos ganhos de Ziegler-Nichols.
+
+Os ganhos de Z-N são só um ponto de partida: costumam dar sobressinal alto.
+Aqui uma população de candidatos (Kp, Ki, Kd) é simulada de uma vez como
+arrays NumPy - planta discretizada (ZOH) uma única vez, PID discreto com
+derivativo filtrado, um passo de tempo por iteração para a população
+inteira - e uma busca por entropia cruzada no espaço log dos ganhos
+minimiza o índice escolhido, penalizando sobressinal e esforço de controle
+acima dos limites. Com `processos`, cada geração é dividida em blocos
+avaliados em paralelo.
+"""
+import math
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import control as ctl
+
+from .horizonte import grade_tempo
+from .malha_fechada import malha_fechada_pid, realizacao_malha_fechada
+
+ResultadoOtimizacao = namedtuple("ResultadoOtimizacao", ["Kp", "Ki", "Kd", "custo", "custo_inicial",
+                                                         "avaliacoes", "segundos"])
+PlantaDiscreta = namedtuple("PlantaDiscreta", ["A", "B", "C", "D", "dt", "passos"])
+
+INDICES = ("ITAE", "IAE")
+
+
+def discretizar_planta(num, den, dt, passos):
+    """Planta num/den em espaço de estados discretizada por ZOH com passo `dt`."""
+    sistema = ctl.c2d(ctl.ss(ctl.tf(num, den)), dt, "zoh")
+    return PlantaDiscreta(np.asarray(sistema.A), np.asarray(sistema.B)[:, 0], np.asarray(sistema.C)[0],
+                          float(np.asarray(sistema.D)[0, 0]), dt, passos)
+
+
+def simular_populacao(planta, Kp, Ki, Kd, filtro=2.0, inicio_esforco=5):
+    """Degrau unitário na referência para N candidatos ao mesmo tempo.
+
+    PID discreto u = Kp*e + Ki*∫e + Kd*de/dt, com derivativo sobre o erro
+    (como em malha_fechada) filtrado por uma constante de tempo de `filtro`
+    passos. Retorna arrays (N,) com IAE, ITAE, sobressinal (%) e pico de
+    |u|; o pico ignora os `inicio_esforco` primeiros passos, onde fica o
+    impulso do derivativo sobre o degrau. Candidatos que divergem recebem
+    índices infinitos.
+    """
+    Kp, Ki, Kd = (np.asarray(k, dtype=float) for k in (Kp, Ki, Kd))
+    A, B, C, D, dt = planta.A, planta.B, planta.C, planta.D, planta.dt
+    N = Kp.shape[0]
+    x = np.zeros((N, len(B)))
+    integral, derivada, e_ant, u = (np.zeros(N) for _ in range(4))
+    iae, itae, y_max, u_pico = (np.zeros(N) for _ in range(4))
+    a = filtro / (filtro + 1.0)
+    with np.errstate(over="ignore", invalid="ignore"):
+        for k in range(planta.passos):
+            y = x @ C + D * u
+            e = 1.0 - y
+            integral += e * dt
+            derivada = a * derivada + (1 - a) * (e - e_ant) / dt
+            u = Kp * e + Ki * integral + Kd * derivada
+            x = x @ A.T + u[:, None] * B
+            e_ant = e
+
+            iae += np.abs(e) * dt
+            itae += (k * dt) * np.abs(e) * dt
+            np.maximum(y_max, y, out=y_max)
+            if k >= inicio_esforco:
+                np.maximum(u_pico, np.abs(u), out=u_pico)
+
+        divergentes = ~np.isfinite(y) | (np.abs(e) > 1.0)
+        sobressinal = np.maximum(0.0, y_max - 1.0) * 100
+    for indice in (iae, itae, sobressinal, u_pico):
+        indice[divergentes | ~np.isfinite(indice)] = np.inf
+    return {"IAE": iae, "ITAE": itae, "sobressinal": sobressinal, "pico_controle": u_pico}
+
+
+def custo_populacao(planta, ganhos, indice="ITAE", sobressinal_max=10.0, esforco_max=None, peso=20.0):
+    """Índice escolhido multiplicado por (1 + peso * violações relativas das restrições)."""
+    r = simular_populacao(planta, ganhos[:, 0], ganhos[:, 1], ganhos[:, 2])
+    violacao = np.maximum(0.0, r["sobressinal"] - sobressinal_max) / 100
+    if esforco_max is not None:
+        violacao = violacao + np.maximum(0.0, r["pico_controle"] / esforco_max - 1.0)
+    with np.errstate(invalid="ignore", over="ignore"):
+        custo = r[indice] * (1.0 + peso * violacao)
+    return np.where(np.isfinite(custo), custo, np.inf)
+
+
+def _avaliar_bloco(args):
+    return custo_populacao(*args)
+
+
+def _horizonte(num, den, Kp, Ki, Kd, passos_max):
+    # O PID discreto precisa de amostragem bem mais fina que a usada só para desenhar a resposta
+    malha = malha_fechada_pid(num, den, Kp, Ki, Kd)
+    tempo = grade_tempo(realizacao_malha_fechada(malha), pontos_por_ciclo=100, pontos_por_constante=100,
+                        minimo=min(400, passos_max), maximo=passos_max)
+    return tempo[1] - tempo[0], len(tempo)
+
+
+def otimizar_pid(num, den, ganhos_iniciais, indice="ITAE", sobressinal_max=10.0, esforco_max=None,
+                 populacao=512, geracoes=12, elite=0.1, processos=None, semente=None, passos_max=800):
+    """Refina (Kp, Ki, Kd) partindo dos ganhos de Z-N; devolve ResultadoOtimizacao.
+
+    Busca por entropia cruzada em log(ganhos): a cada geração a população é
+    sorteada em torno da média, a fração `elite` de menor custo define a nova
+    média e o novo desvio. Sem `esforco_max`, o limite de esforço é o pico
+    de |u| da própria sintonia de Z-N (o otimizado não pode ser mais
+    agressivo que ela). `processos`: None/1 avalia na thread atual, 0 usa
+    todos os núcleos.
+    """
+    if indice not in INDICES:
+        raise ValueError(f"Índice desconhecido: {indice!r} (use {' ou '.join(INDICES)}).")
+    inicio = time.perf_counter()
+    ganhos_iniciais = np.maximum(np.asarray(ganhos_iniciais, dtype=float), 0.0)
+    escala = max(ganhos_iniciais.max(), 1e-6)
+    ganhos_iniciais = np.where(ganhos_iniciais > 0, ganhos_iniciais, 1e-3 * escala)  # log precisa de ganhos > 0
+
+    dt, passos = _horizonte(num, den, *ganhos_iniciais, passos_max)
+    planta = discretizar_planta(num, den, dt, passos)
+    if esforco_max is None:
+        esforco_max = float(simular_populacao(planta, *ganhos_iniciais[:, None])["pico_controle"][0])
+        esforco_max = esforco_max if np.isfinite(esforco_max) and esforco_max > 0 else None
+    restricoes = (indice, sobressinal_max, esforco_max)
+
+    processos = (os.cpu_count() or 1) if processos == 0 else (processos or 1)
+    executor = ProcessPoolExecutor(max_workers=processos) if processos > 1 else None
+
+    def avaliar(ganhos):
+        if executor is None:
+            return custo_populacao(planta, ganhos, *restricoes)
+        blocos = np.array_split(ganhos, processos)
+        return np.concatenate(list(executor.map(_avaliar_bloco, [(planta, b) + restricoes for b in blocos])))
+
+    try:
+        rng = np.random.default_rng(semente)
+        media, desvio = np.log(ganhos_iniciais), np.full(3, 1.0)
+        custo_inicial = float(avaliar(ganhos_iniciais[None, :])[0])
+        melhor, custo_melhor = ganhos_iniciais, custo_inicial
+        n_elite = max(2, int(math.ceil(elite * populacao)))
+        avaliacoes = 1
+        for _ in range(geracoes):
+            amostras = np.exp(media + desvio * rng.standard_normal((populacao, 3)))
+            amostras[0] = melhor
+            custos = avaliar(amostras)
+            avaliacoes += populacao
+            ordem = np.argsort(custos)
+            if custos[ordem[0]] < custo_melhor:
+                melhor, custo_melhor = amostras[ordem[0]], float(custos[ordem[0]])
+            escolhidos = np.log(amostras[ordem[:n_elite]])
+            media = 0.7 * escolhidos.mean(axis=0) + 0.3 * media
+            desvio = 0.7 * escolhidos.std(axis=0) + 0.3 * desvio
+            if desvio.max() < 1e-3:
+                break
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    Kp, Ki, Kd = (float(g) for g in melhor)
+    return ResultadoOtimizacao(Kp, Ki, Kd, custo_melhor, custo_inicial, avaliacoes, time.perf_counter() - inicio)
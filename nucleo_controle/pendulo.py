@@ -0,0 +1,271 @@
+"""Pêndulo invertido sobre carrinho: modelo não linear simulado em lote.
+
+Mesma convenção de sinais das matrizes A e B do notebook (θ = 0 com o
+pêndulo em pé, força F positiva aumentando θ), agora sem linearizar:
+
+    (M + m)·x'' + b·x' - m·l·cos(θ)·θ'' + m·l·θ'²·sin(θ) = F
+    (I + m·l²)·θ'' - m·l·cos(θ)·x''                 = m·g·l·sin(θ)
+
+O estado de cada trajetória é (x, x', θ, θ') e N trajetórias - condições
+iniciais e/ou conjuntos de parâmetros diferentes - avançam juntas como um
+array (N, 4) num RK4 de passo fixo, com o PID sobre o ângulo na malha e
+saturação opcional da força.
+
+O modelo linearizado também é montado em lote (`matrizes_lote`): A, B, C e
+D para N conjuntos de parâmetros, polos e FTs em forma fechada (a cúbica do
+denominador de θ/F) e postos de controlabilidade/observabilidade por
+determinantes 4x4 vetorizados, sem SymPy nem laços por modelo.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+ResultadoPendulo = namedtuple("ResultadoPendulo", ["tempo", "estados", "final", "caiu", "estabilizado"])
+
+PARAMETROS_PADRAO = {"M": 0.5, "m": 0.3, "l": 0.5, "b": 0.1, "I": 0.006, "g": 9.81}
+
+
+def _parametros(parametros, N):
+    p = dict(PARAMETROS_PADRAO, **(parametros or {}))
+    return {k: np.broadcast_to(np.asarray(v, dtype=float), (N,)) for k, v in p.items()}
+
+
+def aceleracoes(estado, F, p):
+    """x'' e θ'' do modelo não linear para estados (N, 4) e forças (N,)."""
+    return _aceleracoes(estado[:, 1], estado[:, 2], estado[:, 3], F, _constantes(p))
+
+
+def _constantes(p):
+    M, m, l, b, I, g = p["M"], p["m"], p["l"], p["b"], p["I"], p["g"]
+    return M + m, I + m * l**2, m * l, b, m * g * l
+
+
+def _aceleracoes(x_p, theta, theta_p, F, constantes):
+    massa, J, ml, b, mgl = constantes
+    sen, cos = np.sin(theta), np.cos(theta)
+    forca = F - b * x_p - ml * theta_p**2 * sen
+    ml_cos = ml * cos
+    det = massa * J - ml_cos**2
+    x_pp = (J * forca + ml_cos * mgl * sen) / det
+    theta_pp = (massa * mgl * sen + ml_cos * forca) / det
+    return x_pp, theta_pp
+
+
+def simular_carro_pendulo(estado0, Kp, Ki, Kd, parametros=None, t_final=10.0, dt=5e-3,
+                          forca_max=None, salvar_cada=None, angulo_queda=np.pi / 2, tol=1e-2):
+    """Simula N trajetórias do carrinho com PID no ângulo (referência θ = 0).
+
+    estado0: (N, 4) ou (4,) com (x, x', θ, θ'). Ganhos e `parametros` (chaves
+    M, m, l, b, I, g) podem ser escalares ou arrays (N,). O derivativo usa a
+    velocidade angular medida (sem chute). Com `forca_max`, |F| é limitada e
+    a integral não acumula enquanto a força está saturada no mesmo sentido
+    do erro (anti-windup). `salvar_cada`: guarda o estado a cada tantos
+    passos (None guarda só o estado final, o bastante para mapear regiões de
+    atração sem ocupar memória).
+
+    Retorna ResultadoPendulo: tempo e estados (n_salvos, N, 4) ou None, o
+    estado final (N, 4), `caiu` (|θ| passou de `angulo_queda` em algum
+    instante) e `estabilizado` (terminou com |θ| e |θ'| abaixo de `tol`).
+    """
+    estado = np.atleast_2d(np.asarray(estado0, dtype=float))
+    N = estado.shape[0]
+    constantes = _constantes(_parametros(parametros, N))
+    Kp, Ki, Kd = (np.broadcast_to(np.asarray(k, dtype=float), (N,)) for k in (Kp, Ki, Kd))
+    caiu = np.zeros(N, dtype=bool)
+
+    # Estado em colunas separadas (x, x', θ, θ', ∫e): cada etapa do RK4 opera em arrays (N,) contíguos
+    y = [estado[:, i].copy() for i in range(4)] + [np.zeros(N)]
+
+    def derivadas(x, x_p, theta, theta_p, integral):
+        erro = -theta
+        F = Kp * erro + Ki * integral - Kd * theta_p
+        if forca_max is not None:
+            saturada = (np.abs(F) > forca_max) & (np.sign(F) == np.sign(erro))
+            erro = np.where(saturada, 0.0, erro)
+            F = np.clip(F, -forca_max, forca_max)
+        x_pp, theta_pp = _aceleracoes(x_p, theta, theta_p, F, constantes)
+        return x_p, x_pp, theta_p, theta_pp, erro
+
+    passos = int(round(t_final / dt))
+    tempo, estados = None, None
+    if salvar_cada:
+        tempo = np.arange(0, passos + 1, salvar_cada) * dt
+        estados = np.empty((len(tempo), N, 4))
+        estados[0] = estado
+
+    with np.errstate(over="ignore", invalid="ignore"):
+        for k in range(1, passos + 1):
+            k1 = derivadas(*y)
+            k2 = derivadas(*(a + 0.5 * dt * d for a, d in zip(y, k1)))
+            k3 = derivadas(*(a + 0.5 * dt * d for a, d in zip(y, k2)))
+            k4 = derivadas(*(a + dt * d for a, d in zip(y, k3)))
+            y = [a + dt / 6 * (d1 + 2 * (d2 + d3) + d4) for a, d1, d2, d3, d4 in zip(y, k1, k2, k3, k4)]
+            caiu |= ~(np.abs(y[2]) <= angulo_queda)
+            if salvar_cada and k % salvar_cada == 0:
+                estados[k // salvar_cada] = np.column_stack(y[:4])
+
+    final = np.column_stack(y[:4])
+    estabilizado = ~caiu & (np.abs(final[:, 2]) < tol) & (np.abs(final[:, 3]) < tol)
+    return ResultadoPendulo(tempo, estados, final, caiu, estabilizado)
+
+
+def planta_simplificada(parametros):
+    """Modelo simplificado das células de Z-N e Routh: G(s) = B2 / (s² - A22·s), em lote.
+
+    `parametros`: dicionário M, m, l, b, I (escalares ou arrays (N,)).
+    Retorna (num, den) com formas (N, 1) e (N, 3).
+    """
+    M, m, l, b, I = (np.atleast_1d(np.asarray(parametros[k], dtype=float)) for k in ("M", "m", "l", "b", "I"))
+    denom = I * (M + m) + M * m * l**2
+    A22 = -(I + m * l**2) * b / denom
+    B2 = (I + m * l**2) / denom
+    um = np.ones_like(B2)
+    return B2[:, None], np.column_stack([um, -A22, np.zeros_like(B2)])
+
+
+def regiao_atracao(theta0_vals, omega0_vals, Kp, Ki, Kd, parametros=None, **kwargs):
+    """Mapa booleano (n_theta, n_omega) das condições iniciais (θ0, θ'0) que o PID estabiliza.
+
+    Todas as combinações da grade são simuladas juntas; `kwargs` vão para
+    `simular_carro_pendulo` (t_final, dt, forca_max, ...).
+    """
+    theta0, omega0 = np.meshgrid(theta0_vals, omega0_vals, indexing="ij")
+    estado0 = np.zeros((theta0.size, 4))
+    estado0[:, 2], estado0[:, 3] = theta0.ravel(), omega0.ravel()
+    resultado = simular_carro_pendulo(estado0, Kp, Ki, Kd, parametros, **kwargs)
+    return resultado.estabilizado.reshape(theta0.shape)
+
+
+MatrizesPendulo = namedtuple("MatrizesPendulo", ["A", "B", "C", "D"])
+
+# Saídas das células de espaço de estados: posição x (x1) e ângulo θ (x3)
+C_PENDULO = np.array([[1.0, 0.0, 0.0, 0.0], [0.0, 0.0, 1.0, 0.0]])
+
+
+def _parametros_lote(parametros):
+    p = dict(PARAMETROS_PADRAO, **(parametros or {}))
+    N = int(np.prod(np.broadcast_shapes(*(np.shape(v) for v in p.values()))) or 1)
+    return _parametros(p, N), N
+
+
+def matrizes_lote(parametros=None):
+    """A (N, 4, 4), B (N, 4, 1), C (N, 2, 4) e D (N, 2, 1) do modelo linearizado das células do notebook.
+
+    Mesmas expressões das matrizes simbólicas (estado x, x', θ, θ'), avaliadas
+    de uma vez para arrays de M, m, b, l, I, g (escalares entram por broadcast).
+    """
+    p, N = _parametros_lote(parametros)
+    M, m, l, b, I, g = p["M"], p["m"], p["l"], p["b"], p["I"], p["g"]
+    denom = I * (M + m) + M * m * l**2
+    A = np.zeros((N, 4, 4))
+    A[:, 0, 1] = A[:, 2, 3] = 1.0
+    A[:, 1, 1] = -(I + m * l**2) * b / denom
+    A[:, 1, 2] = m**2 * g * l**2 / denom
+    A[:, 3, 1] = -m * l * b / denom
+    A[:, 3, 2] = m * g * l * (M + m) / denom
+    B = np.zeros((N, 4, 1))
+    B[:, 1, 0] = (I + m * l**2) / denom
+    B[:, 3, 0] = m * l / denom
+    return MatrizesPendulo(A, B, np.broadcast_to(C_PENDULO, (N, 2, 4)), np.zeros((N, 2, 1)))
+
+
+def raizes_cubica(a2, a1, a0):
+    """Raízes (N, 3) de s³ + a2·s² + a1·s + a0 por Cardano, com um passo de Newton de polimento."""
+    a2, a1, a0 = (np.asarray(c, dtype=complex) for c in (a2, a1, a0))
+    p = a1 - a2**2 / 3
+    q = 2 * a2**3 / 27 - a2 * a1 / 3 + a0
+    raiz = np.sqrt(q**2 / 4 + p**3 / 27)
+    # Escolhe o sinal que evita cancelamento; C = 0 só quando p = q = 0 (raiz tripla)
+    w = np.where(np.abs(-q / 2 + raiz) >= np.abs(-q / 2 - raiz), -q / 2 + raiz, -q / 2 - raiz)
+    C = w ** (1 / 3)
+    omega = np.exp(2j * np.pi / 3) ** np.arange(3)
+    Ck = C[..., None] * omega
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = np.where(np.abs(Ck) > 0, Ck - p[..., None] / (3 * Ck), 0.0)
+    s = t - a2[..., None] / 3
+    f = ((s + a2[..., None]) * s + a1[..., None]) * s + a0[..., None]
+    df = (3 * s + 2 * a2[..., None]) * s + a1[..., None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        passo = np.where(np.abs(df) > 0, f / df, 0.0)
+    return s - passo
+
+
+def autovalores_lote(parametros=None):
+    """Autovalores (N, 4) de A: det(sI - A) = s·(cúbica do denominador de θ/F), sem eigvals por matriz."""
+    _, cubico = funcoes_transferencia_lote(parametros)["theta"]
+    raizes = raizes_cubica(cubico[:, 1], cubico[:, 2], cubico[:, 3])
+    return np.column_stack([np.zeros(len(cubico), dtype=complex), raizes])
+
+
+def _det4(a):
+    """Determinante de uma pilha (4, 4, N) - lote no último eixo - por menores 2x2, elemento a elemento."""
+    s0 = a[0, 0] * a[1, 1] - a[1, 0] * a[0, 1]
+    s1 = a[0, 0] * a[1, 2] - a[1, 0] * a[0, 2]
+    s2 = a[0, 0] * a[1, 3] - a[1, 0] * a[0, 3]
+    s3 = a[0, 1] * a[1, 2] - a[1, 1] * a[0, 2]
+    s4 = a[0, 1] * a[1, 3] - a[1, 1] * a[0, 3]
+    s5 = a[0, 2] * a[1, 3] - a[1, 2] * a[0, 3]
+    c5 = a[2, 2] * a[3, 3] - a[3, 2] * a[2, 3]
+    c4 = a[2, 1] * a[3, 3] - a[3, 1] * a[2, 3]
+    c3 = a[2, 1] * a[3, 2] - a[3, 1] * a[2, 2]
+    c2 = a[2, 0] * a[3, 3] - a[3, 0] * a[2, 3]
+    c1 = a[2, 0] * a[3, 2] - a[3, 0] * a[2, 2]
+    c0 = a[2, 0] * a[3, 1] - a[3, 0] * a[2, 1]
+    return s0 * c5 - s1 * c4 + s2 * c3 + s3 * c2 - s4 * c1 + s5 * c0
+
+
+def _posto4(matriz, tol):
+    """Posto de uma pilha (k, 4, N), k ≥ 4: 4 quando |det| / (produto das normas das colunas) passa de tol.
+
+    Para k > 4 o teste é feito na Gram (com tol²). Só os casos próximos de
+    singulares passam pelo SVD.
+    """
+    if matriz.shape[0] == 4:
+        quadrada, normas = matriz, np.prod(np.sqrt(np.einsum("kin,kin->in", matriz, matriz)), axis=0)
+    else:
+        quadrada = np.einsum("kin,kjn->ijn", matriz, matriz)
+        normas, tol = np.prod(np.einsum("iin->in", quadrada), axis=0), tol**2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        relativo = np.where(normas > 0, np.abs(_det4(quadrada)) / normas, 0.0)
+    postos = np.full(matriz.shape[-1], 4)
+    duvidosos = np.flatnonzero(relativo <= tol)
+    if len(duvidosos):
+        casos = np.moveaxis(matriz[..., duvidosos], -1, 0)
+        escala = np.abs(casos).max(axis=(-2, -1), keepdims=True)
+        postos[duvidosos] = np.linalg.matrix_rank(casos / np.where(escala > 0, escala, 1.0))
+    return postos
+
+
+def postos_lote(A, B, C, tol=1e-10):
+    """Postos (N,) das matrizes de controlabilidade [B AB A²B A³B] e de observabilidade [C; CA; CA²; CA³].
+
+    Os produtos são feitos com o lote no último eixo: o matmul empilhado do
+    NumPy é lento para matrizes 4x4.
+    """
+    A, B, C = (np.moveaxis(np.asarray(x, dtype=float), 0, -1) for x in (A, B, C))
+    blocos_c, blocos_o = [B], [C]
+    for _ in range(3):
+        blocos_c.append(np.einsum("ijn,jkn->ikn", A, blocos_c[-1]))
+        blocos_o.append(np.einsum("ijn,jkn->ikn", blocos_o[-1], A))
+    controlabilidade = np.concatenate(blocos_c, axis=1)
+    observabilidade = np.concatenate(blocos_o, axis=0)
+    return _posto4(np.swapaxes(controlabilidade, 0, 1), tol), _posto4(observabilidade, tol)
+
+
+def funcoes_transferencia_lote(parametros=None):
+    """FTs da força F para θ e para x, em lote: {"theta": (num, den), "x": (num, den)}.
+
+    θ(s)/F(s) = (m·l/q)·s / (s³ + b(I + m·l²)/q·s² - (M + m)·m·g·l/q·s - b·m·g·l/q), com o
+    cancelamento do polo e do zero em s = 0; x(s)/F(s) tem denominador
+    s·(o mesmo polinômio de 3º grau). q = I(M + m) + M·m·l². Coeficientes em
+    potências decrescentes de s, formas (N, k).
+    """
+    p, N = _parametros_lote(parametros)
+    M, m, l, b, I, g = p["M"], p["m"], p["l"], p["b"], p["I"], p["g"]
+    q = I * (M + m) + M * m * l**2
+    J = I + m * l**2
+    cubico = np.column_stack([np.ones(N), b * J / q, -(M + m) * m * g * l / q, -b * m * g * l / q])
+    num_theta = np.column_stack([m * l / q, np.zeros(N)])
+    num_x = np.column_stack([J / q, np.zeros(N), -m * g * l / q])
+    den_x = np.column_stack([cubico, np.zeros(N)])
+    return {"theta": (num_theta, cubico), "x": (num_x, den_x)}
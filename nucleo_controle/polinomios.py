@@ -0,0 +1,45 @@
+"""Operações sobre polinômios empilhados, comuns a Routh, robustez e frequência.
+
+Os coeficientes ficam em arrays (..., n+1), do maior grau para o menor, e
+as dimensões à esquerda são o lote: ganhos numa grade (routh.py), plantas
+sorteadas (robustez.py) ou famílias de sistemas (frequencia.py). Cada
+operação é feita de uma vez para o lote inteiro, sem laço em Python por
+polinômio.
+"""
+import numpy as np
+
+
+def polinomio_caracteristico_pid(num, den, Kp, Ki, Kd):
+    """Coeficientes de s*den(s) + (Kd*s² + Kp*s + Ki)*num(s) para plantas e/ou ganhos em lote.
+
+    num e den são um polinômio (1-D, zeros à esquerda descartados) ou uma
+    pilha (..., ·) alinhada à direita; Kp, Ki e Kd são escalares ou arrays.
+    O resultado tem forma broadcast(lote de num, lote de den, Kp, Ki, Kd) +
+    (ordem+1,).
+    """
+    num, den = (np.asarray(p, dtype=float) for p in (num, den))
+    if num.ndim <= 1:
+        num = np.trim_zeros(np.atleast_1d(num), "f")
+    if den.ndim <= 1:
+        den = np.trim_zeros(np.atleast_1d(den), "f")
+    ganhos = [np.asarray(k, dtype=float) for k in (Kd, Kp, Ki)]
+    forma = np.broadcast_shapes(num.shape[:-1], den.shape[:-1], *(g.shape for g in ganhos))
+
+    # Graus: s*den tem len(den) + 1 coeficientes e Kd*s²*num tem len(num) + 2
+    ordem = max(den.shape[-1], num.shape[-1] + 1)
+    coefs = np.zeros(forma + (ordem + 1,))
+    coefs[..., ordem - den.shape[-1]:ordem] += den
+    for ganho, desloc in zip(ganhos, (2, 1, 0)):
+        fim = ordem + 1 - desloc
+        coefs[..., fim - num.shape[-1]:fim] += ganho[..., None] * num
+    return coefs
+
+
+def raizes_lote(coefs):
+    """Raízes de N polinômios de mesmo grau (N, n+1) pelos autovalores das matrizes companheiras."""
+    coefs = np.asarray(coefs, dtype=float)
+    N, n = coefs.shape[0], coefs.shape[1] - 1
+    companheira = np.zeros((N, n, n))
+    companheira[:, 0, :] = -coefs[:, 1:] / coefs[:, :1]
+    companheira[:, np.arange(1, n), np.arange(n - 1)] = 1.0
+    return np.linalg.eigvals(companheira)
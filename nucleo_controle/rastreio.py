@@ -0,0 +1,160 @@
+"""Medição de tempo por etapa das análises (trechos), com exportação para Chrome trace.
+
+Cada etapa é envolvida em `with rastreador.trecho("nome"):`. Desativado, o
+trecho é um único objeto nulo compartilhado - uma chamada e um teste de
+atributo por etapa. Ativado, cada trecho guarda início, duração,
+caminho (os trechos que o contêm) e thread, e vai para a sessão em que
+foi aberto: a da thread, se ela foi vinculada a uma (tarefas.Tarefa vincula
+a thread de trabalho à sessão da análise que a criou), ou a atual. Assim um
+trabalho cancelado que ainda termina uma etapa não mistura seus trechos nos
+da análise seguinte. `resumo()` agrega por caminho para o painel das
+interfaces e `exportar()` acrescenta os trechos da sessão a um arquivo no
+formato de eventos do Chrome (chrome://tracing, Perfetto), que pode crescer
+entre execuções.
+
+Ativação: variável de ambiente NUCLEO_RASTREIO ("1" liga o painel; um
+caminho liga e define o arquivo de trace) ou `rastreador.ativo = True`.
+"""
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+
+Trecho = namedtuple("Trecho", ["nome", "caminho", "inicio_ns", "duracao_ns", "thread", "args"])
+LinhaResumo = namedtuple("LinhaResumo", ["nome", "profundidade", "segundos", "chamadas", "fracao"])
+
+
+class _TrechoNulo:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULO = _TrechoNulo()
+
+
+class _TrechoAtivo:
+    __slots__ = ("rastreador", "nome", "args", "inicio", "caminho", "sessao")
+
+    def __init__(self, rastreador, nome, args):
+        self.rastreador, self.nome, self.args = rastreador, nome, args
+
+    def __enter__(self):
+        local = self.rastreador._local
+        self.caminho = getattr(local, "caminho", ()) + (self.nome,)
+        local.caminho = self.caminho
+        sessao = getattr(local, "sessao", None)
+        self.sessao = self.rastreador._trechos if sessao is None else sessao
+        self.inicio = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        fim = time.perf_counter_ns()
+        self.rastreador._local.caminho = self.caminho[:-1]
+        # list.append é atômico sob o GIL: threads de trabalho e de interface gravam na mesma sessão;
+        # uma sessão já descartada por iniciar_sessao recebe o trecho e é esquecida com ele
+        self.sessao.append(Trecho(self.nome, self.caminho, self.inicio, fim - self.inicio,
+                                  threading.get_ident(), self.args))
+        return False
+
+
+class Rastreador:
+    """Coleta trechos de uma sessão (uma análise) e os exporta."""
+
+    def __init__(self, ativo=False, arquivo=None):
+        self.ativo = ativo
+        self.arquivo = arquivo
+        self._local = threading.local()
+        self._trechos = []
+        self._origem = time.perf_counter_ns()
+        # Relógio de parede do início do processo, para alinhar sessões de execuções diferentes no trace
+        self._epoca_us = time.time_ns() // 1000 - self._origem // 1000
+
+    def trecho(self, nome, **args):
+        """Context manager que mede a etapa `nome`; `args` vão para o trace."""
+        if not self.ativo:
+            return _NULO
+        return _TrechoAtivo(self, nome, args)
+
+    def iniciar_sessao(self):
+        """Descarta os trechos anteriores: o painel mostra só a análise atual."""
+        self._trechos = []
+        self._origem = time.perf_counter_ns()
+
+    def sessao_atual(self):
+        """Identidade da sessão atual, para `vincular_thread` numa thread criada por ela."""
+        return self._trechos
+
+    def vincular_thread(self, sessao):
+        """Os trechos abertos nesta thread vão para `sessao`, mesmo depois de um novo iniciar_sessao."""
+        self._local.sessao = sessao
+
+    def trechos(self):
+        return sorted(self._trechos, key=lambda t: t.inicio_ns)
+
+    def resumo(self):
+        """Linhas (nome, profundidade, segundos, chamadas, fração da sessão), uma por caminho de trechos.
+
+        Filhos aparecem logo abaixo do pai; irmãos, na ordem em que começaram.
+        """
+        trechos = self.trechos()
+        if not trechos:
+            return []
+        total_ns = max(t.inicio_ns + t.duracao_ns for t in trechos) - self._origem
+        linhas = {}
+        for t in trechos:
+            ns, n, ordem = linhas.get(t.caminho, (0, 0, len(linhas)))
+            linhas[t.caminho] = (ns + t.duracao_ns, n + 1, ordem)
+        ordem = {caminho: valores[2] for caminho, valores in linhas.items()}
+        chaves = sorted(linhas, key=lambda c: tuple(ordem.get(c[:i + 1], -1) for i in range(len(c))))
+        return [LinhaResumo(c[-1], len(c) - 1, linhas[c][0] / 1e9, linhas[c][1],
+                            linhas[c][0] / total_ns if total_ns > 0 else 0.0) for c in chaves]
+
+    def formatar_resumo(self):
+        return "\n".join(f"{'    ' * l.profundidade}{l.nome:<{32 - 4 * l.profundidade}} {1e3 * l.segundos:9.1f} ms"
+                         f"  {100 * l.fracao:5.1f}%" + (f"  ({l.chamadas}x)" if l.chamadas > 1 else "")
+                         for l in self.resumo())
+
+    def exportar(self, caminho=None, processo="nucleo_controle"):
+        """Acrescenta os trechos da sessão ao arquivo de trace (formato de array JSON do Chrome).
+
+        O array fica aberto (sem "]"), como o formato permite, para que as
+        sessões seguintes só acrescentem linhas. Retorna o caminho ou None.
+        """
+        caminho = caminho or self.arquivo
+        trechos = self.trechos()
+        if not caminho or not trechos:
+            return None
+        pid = os.getpid()
+        linhas = [json.dumps({"name": t.nome, "cat": processo, "ph": "X", "pid": pid, "tid": t.thread,
+                              "ts": self._epoca_us + t.inicio_ns // 1000, "dur": t.duracao_ns / 1000,
+                              "args": {k: str(v) for k, v in t.args.items()}}, ensure_ascii=False)
+                  for t in trechos]
+        pasta = os.path.dirname(os.path.abspath(caminho))
+        os.makedirs(pasta, exist_ok=True)
+        novo = not os.path.exists(caminho) or os.path.getsize(caminho) == 0
+        with open(caminho, "a", encoding="utf-8") as arquivo:
+            if novo:
+                arquivo.write("[\n")
+            arquivo.write("".join(f"{linha},\n" for linha in linhas))
+        return caminho
+
+
+def arquivo_rastreio_padrao():
+    return os.path.join(os.path.expanduser("~"), ".cache", "nucleo_controle", "rastreio.json")
+
+
+def _do_ambiente():
+    valor = os.environ.get("NUCLEO_RASTREIO", "").strip()
+    if not valor or valor == "0":
+        return Rastreador()
+    return Rastreador(ativo=True, arquivo=arquivo_rastreio_padrao() if valor == "1" else valor)
+
+
+# Instância compartilhada pelo núcleo e pelas interfaces
+rastreador = _do_ambiente()
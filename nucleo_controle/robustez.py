@@ -0,0 +1,97 @@
+"""Robustez do PID por Monte Carlo sob incerteza nos parâmetros da planta.
+
+Cada amostra dos parâmetros físicos gera uma planta e, com os ganhos fixos,
+um polinômio característico de malha fechada. Os polos de todas as
+amostras de um bloco saem de uma única chamada a `np.linalg.eigvals` sobre
+a pilha de matrizes companheiras (N, n, n). Os blocos são processados em
+sequência e só acumuladores (contagens, mínimos e histogramas de bordas
+fixas) sobrevivem entre eles, então a memória não depende do total de
+amostras.
+"""
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from .pendulo import PARAMETROS_PADRAO, planta_simplificada
+from .polinomios import polinomio_caracteristico_pid, raizes_lote
+
+ResultadoRobustez = namedtuple("ResultadoRobustez", [
+    "amostras", "prob_estavel", "amortecimento_pior", "amortecimento_p5",
+    "hist_real", "hist_imag", "bordas_real", "bordas_imag", "segundos"])
+
+# Desvio padrão relativo padrão de cada parâmetro (carrinhos reais variam mais em massa e atrito)
+DISPERSAO_PADRAO = {"M": 0.10, "m": 0.05, "l": 0.02, "b": 0.30, "I": 0.05, "g": 0.0}
+
+
+def amostrar_parametros(nominais, dispersao, n, rng, distribuicao="normal"):
+    """Sorteia n conjuntos de parâmetros: {nome: array (n,)}, sempre positivos.
+
+    `dispersao` é relativa ao valor nominal: desvio padrão (normal) ou
+    meia-largura (uniforme).
+    """
+    amostras = {}
+    for nome, valor in nominais.items():
+        rel = dispersao.get(nome, 0.0)
+        if rel == 0:
+            amostras[nome] = np.full(n, float(valor))
+            continue
+        if distribuicao == "uniforme":
+            fator = rng.uniform(1 - rel, 1 + rel, n)
+        else:
+            fator = 1 + rel * rng.standard_normal(n)
+        amostras[nome] = valor * np.maximum(fator, 1e-3)
+    return amostras
+
+
+def analise_robustez(Kp, Ki, Kd, nominais=None, dispersao=None, amostras=1_000_000, bloco=200_000,
+                     distribuicao="normal", bins=80, semente=None):
+    """Probabilidade de estabilidade, pior amortecimento e histogramas do polo dominante.
+
+    Planta: o modelo simplificado do notebook (pendulo.planta_simplificada).
+    O polo dominante de cada amostra é o de maior parte real; o amortecimento
+    da amostra é o menor ζ = -Re(p)/|p| entre seus polos (`amortecimento_p5`
+    é o percentil 5 desse ζ, com resolução de 0,001). As bordas dos
+    histogramas vêm do primeiro bloco (percentis 0,1-99,9 com folga) e
+    valores fora delas caem nas classes extremas.
+    """
+    inicio = time.perf_counter()
+    nominais = dict(PARAMETROS_PADRAO, **(nominais or {}))
+    dispersao = DISPERSAO_PADRAO if dispersao is None else dispersao
+    rng = np.random.default_rng(semente)
+
+    estaveis, amortecimento_pior = 0, np.inf
+    bordas_zeta = np.linspace(-1.0, 1.0, 2001)  # ζ = -Re/|p| está sempre em [-1, 1]
+    hist_zeta = np.zeros(len(bordas_zeta) - 1, dtype=np.int64)
+    bordas_real = bordas_imag = hist_real = hist_imag = None
+    feitas = 0
+    while feitas < amostras:
+        n = min(bloco, amostras - feitas)
+        p = amostrar_parametros(nominais, dispersao, n, rng, distribuicao)
+        num, den = planta_simplificada(p)
+        polos = raizes_lote(polinomio_caracteristico_pid(num, den, Kp, Ki, Kd))
+
+        dominante = polos[np.arange(n), np.argmax(polos.real, axis=1)]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            zeta = np.where(np.abs(polos) > 0, -polos.real / np.abs(polos), 1.0).min(axis=1)
+        estaveis += int(np.count_nonzero(dominante.real < 0))
+        amortecimento_pior = min(amortecimento_pior, float(zeta.min()))
+        hist_zeta += np.histogram(np.clip(zeta, -1.0, 1.0), bordas_zeta)[0]
+
+        if bordas_real is None:
+            bordas_real = _bordas(dominante.real, bins)
+            bordas_imag = _bordas(np.abs(dominante.imag), bins)
+            hist_real, hist_imag = np.zeros(bins, dtype=np.int64), np.zeros(bins, dtype=np.int64)
+        hist_real += np.histogram(np.clip(dominante.real, bordas_real[0], bordas_real[-1]), bordas_real)[0]
+        hist_imag += np.histogram(np.clip(np.abs(dominante.imag), bordas_imag[0], bordas_imag[-1]), bordas_imag)[0]
+        feitas += n
+
+    amortecimento_p5 = float(bordas_zeta[1:][np.searchsorted(np.cumsum(hist_zeta), 0.05 * feitas)])
+    return ResultadoRobustez(feitas, estaveis / feitas, amortecimento_pior, amortecimento_p5,
+                             hist_real, hist_imag, bordas_real, bordas_imag, time.perf_counter() - inicio)
+
+
+def _bordas(valores, bins):
+    baixo, alto = np.percentile(valores, [0.1, 99.9])
+    folga = 0.1 * max(alto - baixo, 1e-9 * max(abs(baixo), abs(alto), 1.0))
+    return np.linspace(baixo - folga, alto + folga, bins + 1)
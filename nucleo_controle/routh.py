@@ -0,0 +1,115 @@
+"""Critério de Routh-Hurwitz vetorizado.
+
+Em vez de montar uma tabela por vez (como `analise_routh` no notebook do
+pêndulo), todas as tabelas de um lote de polinômios são construídas juntas,
+linha a linha, como arrays NumPy empilhados. Só as duas últimas linhas ficam
+em memória, então o custo é O(N * ordem²) e a memória é O(N * ordem).
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .polinomios import polinomio_caracteristico_pid
+
+EPS_ROUTH = 1e-9
+
+
+def primeira_coluna_routh(coefs, eps=EPS_ROUTH):
+    """Calcula a primeira coluna da tabela de Routh de um lote de polinômios.
+
+    coefs: array (..., n+1) com os coeficientes em potências decrescentes de s.
+    Retorna (coluna, especial): coluna tem forma (..., n+1); especial marca os
+    polinômios em que foi preciso trocar um pivô nulo por `eps` ou substituir
+    uma linha nula pela derivada do polinômio auxiliar.
+    """
+    a = np.asarray(coefs, dtype=float)
+    forma_lote = a.shape[:-1]
+    a = a.reshape(-1, a.shape[-1])
+    N, n1 = a.shape
+    n = n1 - 1
+    m = n // 2 + 1
+
+    escala = np.max(np.abs(a), axis=1)
+    escala[escala == 0] = 1.0
+    tol = eps * escala
+
+    linha_a = np.zeros((N, m))
+    linha_b = np.zeros((N, m))
+    linha_a[:, :len(range(0, n1, 2))] = a[:, 0::2]
+    linha_b[:, :len(range(1, n1, 2))] = a[:, 1::2]
+
+    coluna = np.empty((N, n1))
+    coluna[:, 0] = linha_a[:, 0]
+    especial = np.abs(linha_a[:, 0]) <= tol
+
+    for i in range(1, n1):
+        # linha_a é a linha i-1 (potência n-i+1) e linha_b é a linha i
+        nula = np.all(np.abs(linha_b) <= tol[:, None], axis=1)
+        if np.any(nula):
+            # Linha nula: usa a derivada do polinômio auxiliar da linha anterior
+            p = n - i + 1
+            fatores = np.clip(p - 2 * np.arange(m), 0, None)
+            linha_b[nula] = linha_a[nula] * fatores
+            especial |= nula
+        pivo_nulo = np.abs(linha_b[:, 0]) <= tol
+        if np.any(pivo_nulo):
+            linha_b[pivo_nulo, 0] = tol[pivo_nulo]
+            especial |= pivo_nulo
+        coluna[:, i] = linha_b[:, 0]
+        if i == n:
+            break
+
+        nova = np.zeros((N, m))
+        nova[:, :-1] = (linha_b[:, :1] * linha_a[:, 1:] - linha_a[:, :1] * linha_b[:, 1:]) / linha_b[:, :1]
+        linha_a, linha_b = linha_b, nova
+
+    return coluna.reshape(forma_lote + (n1,)), especial.reshape(forma_lote)
+
+
+def mudancas_de_sinal(coluna):
+    """Número de trocas de sinal na primeira coluna (= polos no semiplano direito)."""
+    sinais = np.sign(coluna)
+    return np.sum(sinais[..., :-1] != sinais[..., 1:], axis=-1)
+
+
+def estavel_routh(coefs, eps=EPS_ROUTH):
+    """Retorna um array booleano: True onde o polinômio é estritamente Hurwitz."""
+    coluna, especial = primeira_coluna_routh(coefs, eps)
+    return (mudancas_de_sinal(coluna) == 0) & ~especial
+
+
+def _bloco_estabilidade(args):
+    num, den, Kp, Ki, Kd, eps = args
+    Kp_g, Ki_g, Kd_g = np.meshgrid(Kp, Ki, Kd, indexing="ij")
+    coefs = polinomio_caracteristico_pid(num, den, Kp_g, Ki_g, Kd_g)
+    return estavel_routh(coefs, eps)
+
+
+def regiao_estabilidade_pid(num, den, Kp_vals, Ki_vals, Kd_vals, processos=None,
+                            pontos_por_bloco=1_000_000, eps=EPS_ROUTH):
+    """Volume booleano de estabilidade da malha PID + planta num/den.
+
+    Retorna um array (len(Kp_vals), len(Ki_vals), len(Kd_vals)); estabilidade[i, j, k]
+    indica se (Kp_vals[i], Ki_vals[j], Kd_vals[k]) estabiliza a malha fechada.
+    O volume é dividido em blocos de fatias de Kp com no máximo
+    `pontos_por_bloco` pontos; com `processos` > 1 os blocos são distribuídos
+    num ProcessPoolExecutor (processos=0 usa todos os núcleos).
+    """
+    Kp_vals = np.atleast_1d(np.asarray(Kp_vals, dtype=float))
+    Ki_vals = np.atleast_1d(np.asarray(Ki_vals, dtype=float))
+    Kd_vals = np.atleast_1d(np.asarray(Kd_vals, dtype=float))
+
+    fatia = len(Ki_vals) * len(Kd_vals)
+    passo = max(1, pontos_por_bloco // max(fatia, 1))
+    blocos = [(num, den, Kp_vals[i:i + passo], Ki_vals, Kd_vals, eps)
+              for i in range(0, len(Kp_vals), passo)]
+
+    if processos == 0:
+        processos = os.cpu_count() or 1
+    if processos and processos > 1 and len(blocos) > 1:
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            partes = list(executor.map(_bloco_estabilidade, blocos))
+    else:
+        partes = [_bloco_estabilidade(b) for b in blocos]
+    return np.concatenate(partes, axis=0)
@@ -0,0 +1,315 @@
+"""Tabela de Routh simbólica compilada em desigualdades de estabilidade.
+
+`routh.py` monta a tabela numérica a cada consulta. Aqui a tabela é montada
+uma vez, com os ganhos e os parâmetros da planta como símbolos, e vira um
+predicado NumPy:
+
+1. Tabela sem frações: cada linha nova é b0·a[j+1] - a0·b[j+1], dividida
+   (divisão exata) pelo pivô de três linhas acima, como no esquema de
+   Bareiss. A primeira coluna sai igual aos menores de Hurwitz Δ1, Δ2, ...,
+   polinômios de grau baixo em vez de frações aninhadas.
+2. Pivô identicamente nulo com a linha não nula: troca por ε > 0 simbólico.
+   Linha inteira nula: troca pela derivada do polinômio auxiliar. Nos dois
+   casos o polinômio nunca é estritamente Hurwitz e o predicado é falso.
+3. Cada pivô é fatorado; fatores positivos conhecidos (constantes, símbolos
+   declarados positivos, condições anteriores) saem, fatores ao quadrado
+   viram "≠ 0" e o resto vira uma desigualdade "> 0".
+4. As desigualdades são compiladas com lambdify: consultar N conjuntos de
+   ganhos custa algumas comparações vetorizadas.
+
+Como o sinal do coeficiente líder pode depender dos símbolos, há dois ramos:
+todos os pivôs positivos ou, para líder negativo, os pivôs de -p(s)
+positivos (Δk de -p = (-1)^k Δk de p). Os artefatos ficam num LRU por
+estrutura do polinômio (expressões dos coeficientes).
+"""
+import threading
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+import sympy as sp
+from sympy.abc import s
+
+from .rastreio import rastreador
+
+TabelaRouth = namedtuple("TabelaRouth", ["linhas", "primeira_coluna", "pivos_nulos", "linhas_nulas", "escala"])
+CurvaFronteira = namedtuple("CurvaFronteira", ["condicao", "x", "y"])
+
+KP, KI, KD = sp.symbols("Kp Ki Kd", real=True)
+EPSILON = sp.Symbol("epsilon", positive=True)
+
+
+def _exato(expr):
+    """Troca floats por racionais: as divisões da tabela precisam ser exatas."""
+    return sp.nsimplify(sp.sympify(expr), rational=True)
+
+
+def _coeficientes_polinomiais(coefs):
+    """Coeficientes exatos multiplicados pelo mmc dos denominadores (as raízes não mudam), e o mmc.
+
+    Plantas com parâmetros simbólicos costumam ter coeficientes racionais
+    (ex.: B2 = (I + m·l²)/q); a tabela e a fatoração trabalham com polinômios.
+    """
+    coefs = [sp.together(_exato(c)) for c in coefs]
+    mmc = sp.lcm_list([sp.denom(c) for c in coefs]) if coefs else sp.Integer(1)
+    return [sp.expand(sp.cancel(c * mmc)) for c in coefs], mmc
+
+
+def polinomio_pid_simbolico(num, den):
+    """Coeficientes (potências decrescentes de s) de s·den(s) + (Kd·s² + Kp·s + Ki)·num(s)."""
+    num = sp.Poly([_exato(c) for c in num], s)
+    den = sp.Poly([_exato(c) for c in den], s)
+    caracteristico = s * den + sp.Poly(KD * s**2 + KP * s + KI, s) * num
+    return [sp.expand(c) for c in caracteristico.all_coeffs()]
+
+
+def _dividir(expr, divisor):
+    """expr / divisor quando a divisão é exata; senão expr (o divisor é um pivô positivo)."""
+    if divisor == 1:
+        return expr
+    quociente = sp.cancel(expr / divisor)
+    return sp.expand(quociente) if sp.denom(quociente) == 1 else expr
+
+
+def tabela_routh_simbolica(coefs):
+    """Tabela de Routh sem frações de um polinômio com coeficientes simbólicos.
+
+    coefs: potências decrescentes de s. Retorna TabelaRouth com as linhas
+    (listas de expressões), a primeira coluna, os índices das linhas cujo pivô
+    foi trocado por ε, os das linhas nulas trocadas pela derivada do
+    polinômio auxiliar e a escala: a tabela é a de escala·p(s), com os
+    denominadores dos coeficientes eliminados.
+    """
+    coefs, escala = _coeficientes_polinomiais(coefs)
+    while len(coefs) > 1 and coefs[0] == 0:
+        coefs = coefs[1:]
+    n = len(coefs) - 1
+    m = n // 2 + 1
+
+    def completar(valores):
+        return list(valores) + [sp.Integer(0)] * (m - len(valores))
+
+    linhas = [completar(coefs[0::2]), completar(coefs[1::2])][:n + 1]
+    pivos_nulos, linhas_nulas = [], []
+    for i in range(1, n + 1):
+        if i >= 2:
+            a, b = linhas[i - 2], linhas[i - 1]
+            nova = [sp.expand(b[0] * a[j + 1] - a[0] * b[j + 1]) for j in range(m - 1)] + [sp.Integer(0)]
+            divisor = linhas[i - 3][0] if i >= 4 else 1
+            linhas.append([_dividir(e, divisor) for e in nova])
+        linha = linhas[i]
+        if all(e == 0 for e in linha):
+            # Raízes simétricas: derivada do polinômio auxiliar da linha anterior (potência n - i + 1)
+            p = n - i + 1
+            linhas[i] = [sp.expand(e * (p - 2 * j)) if p - 2 * j > 0 else sp.Integer(0)
+                         for j, e in enumerate(linhas[i - 1])]
+            linhas_nulas.append(i)
+            linha = linhas[i]
+        if linha[0] == 0:
+            linha[0] = EPSILON
+            pivos_nulos.append(i)
+    return TabelaRouth(linhas, [linha[0] for linha in linhas], pivos_nulos, linhas_nulas, escala)
+
+
+def linhas_classicas(tabela):
+    """Linhas da tabela de Routh clássica (com frações), para exibição.
+
+    Cada linha sem frações é a clássica multiplicada por um fator λ_i da
+    construção: λ_0 = λ_1 = escala, λ_i = λ_(i-2)·pivô_(i-1)/pivô_(i-3)
+    (divisor 1 nas linhas 2 e 3) e λ_i = λ_(i-1) nas linhas nulas trocadas
+    pela derivada. Um pivô trocado por ε aparece como ε/λ_i. A tabela de
+    `routh_simbolico` vem dos coeficientes já sem denominadores (escala 1);
+    para as linhas do polinômio original, monte-a com tabela_routh_simbolica.
+    """
+    linhas, fatores = tabela.linhas, []
+    for i in range(len(linhas)):
+        if i < 2:
+            fator = tabela.escala
+        elif i in tabela.linhas_nulas:
+            fator = fatores[i - 1]
+        else:
+            fator = fatores[i - 2] * linhas[i - 1][0] / (linhas[i - 3][0] if i >= 4 else 1)
+        fatores.append(fator)
+    return [[sp.cancel(e / fator) for e in linha] for linha, fator in zip(linhas, fatores)]
+
+
+def _condicoes_positivas(pivos):
+    """Desigualdades equivalentes a "todos os pivôs > 0", na ordem da tabela.
+
+    Retorna (maiores, diferentes): expressões g com g > 0 e f com f ≠ 0; None se
+    algum pivô não pode ser positivo.
+    """
+    maiores, diferentes, conhecidos = [], [], set()
+    for pivo in pivos:
+        constante, fatores = sp.factor_list(pivo)
+        if constante == 0:
+            return None
+        sinal = 1 if constante > 0 else -1
+        impares = []
+        for fator, multiplicidade in fatores:
+            if fator in conhecidos or fator.is_positive:
+                continue
+            if -fator in conhecidos or fator.is_negative:
+                sinal = -sinal if multiplicidade % 2 else sinal
+                continue
+            if multiplicidade % 2:
+                impares.append(fator)
+            elif fator not in diferentes:
+                diferentes.append(fator)
+        if not impares:
+            if sinal < 0:
+                return None
+            continue
+        condicao = sp.expand(sinal * sp.Mul(*impares)) if len(impares) > 1 or sinal < 0 else impares[0]
+        maiores.append(condicao)
+        conhecidos.add(condicao)
+    return maiores, diferentes
+
+
+class RouthSimbolico:
+    """Tabela de Routh simbólica de um polinômio e seu predicado de estabilidade compilado."""
+
+    def __init__(self, coefs):
+        with rastreador.trecho("routh_simbolico", ordem=len(coefs) - 1):
+            self.tabela = tabela_routh_simbolica(coefs)
+            self.coefs, _ = _coeficientes_polinomiais(coefs)
+            self.simbolos = sorted(set().union(*(sp.sympify(c).free_symbols for c in self.coefs)),
+                                   key=lambda x: x.name)
+            self.ramos = self._ramos()
+            self._predicado = sp.lambdify(self.simbolos, [list(maiores) + list(diferentes)
+                                                          for maiores, diferentes in self.ramos], modules="numpy")
+        self._fronteiras = {}
+
+    def _ramos(self):
+        """Listas (maiores, diferentes) alternativas: líder positivo e/ou líder negativo."""
+        if self.tabela.pivos_nulos or self.tabela.linhas_nulas:
+            return []
+        pivos = self.tabela.primeira_coluna
+        lider = pivos[0]
+        candidatos = []
+        if not lider.is_negative:
+            candidatos.append(pivos)
+        if not lider.is_positive:
+            candidatos.append([-lider] + [(-1) ** k * e for k, e in enumerate(pivos[1:], start=1)])
+        return [ramo for ramo in map(_condicoes_positivas, candidatos) if ramo is not None]
+
+    @property
+    def condicoes(self):
+        """Ramos de desigualdades SymPy; a malha é estável se todas as de algum ramo valem."""
+        return [[sp.StrictGreaterThan(g, 0) for g in maiores] + [sp.Ne(f, 0) for f in diferentes]
+                for maiores, diferentes in self.ramos]
+
+    def desigualdades(self, variavel):
+        """Como `condicoes`, mas com `variavel` isolada onde a desigualdade é linear nela.
+
+        O isolamento só é feito quando o sinal do coeficiente de `variavel` é
+        conhecido (ex.: plantas numéricas); as demais ficam como estão.
+        """
+        variavel = sp.Symbol(variavel, real=True) if isinstance(variavel, str) else variavel
+        ramos = []
+        for relacoes in self.condicoes:
+            isoladas = []
+            for relacao in relacoes:
+                expr = relacao.lhs
+                if isinstance(relacao, sp.StrictGreaterThan) and variavel in expr.free_symbols \
+                        and sp.degree(expr, variavel) == 1:
+                    coef = expr.coeff(variavel)
+                    limite = sp.simplify(-(expr - coef * variavel) / coef)
+                    if coef.is_positive:
+                        relacao = sp.StrictGreaterThan(variavel, limite)
+                    elif coef.is_negative:
+                        relacao = sp.StrictLessThan(variavel, limite)
+                isoladas.append(relacao)
+            ramos.append(isoladas)
+        return ramos
+
+    def estavel(self, **valores):
+        """Predicado vetorizado: True onde o polinômio é estritamente Hurwitz.
+
+        `valores` dá um escalar ou array por símbolo (pelo nome: Kp=..., M=...);
+        os arrays fazem broadcast entre si.
+        """
+        faltando = [x.name for x in self.simbolos if x.name not in valores]
+        if faltando:
+            raise ValueError(f"Valores ausentes para: {', '.join(faltando)}")
+        argumentos = [np.asarray(valores[x.name], dtype=float) for x in self.simbolos]
+        forma = np.broadcast_shapes(*(a.shape for a in argumentos)) if argumentos else ()
+        resultado = np.zeros(forma, dtype=bool)
+        if not self.ramos:
+            return resultado
+        with np.errstate(all="ignore"):
+            for (maiores, _), avaliados in zip(self.ramos, self._predicado(*argumentos)):
+                ramo = np.ones(forma, dtype=bool)
+                for k, valor in enumerate(avaliados):
+                    ramo &= (np.asarray(valor) > 0) if k < len(maiores) else (np.asarray(valor) != 0)
+                resultado |= ramo
+        return resultado
+
+    def fronteira(self, x, y, x_vals, **fixos):
+        """Curvas g = 0 de cada condição no plano (x, y), resolvidas analiticamente para y.
+
+        Os demais símbolos recebem os valores de `fixos`. Retorna uma lista de
+        CurvaFronteira(condicao, x, y) com y (NaN onde a raiz é complexa);
+        condições que não dependem de y, só de x, dão retas verticais com
+        x escalar e y None. As soluções simbólicas ficam em cache por (x, y).
+        """
+        x = next(simbolo for simbolo in self.simbolos if simbolo.name == str(x))
+        y = next(simbolo for simbolo in self.simbolos if simbolo.name == str(y))
+        outros = [simbolo for simbolo in self.simbolos if simbolo not in (x, y)]
+        chave = (x, y)
+        if chave not in self._fronteiras:
+            solucoes = []
+            for ramo in self.ramos:
+                for g in ramo[0]:
+                    if y in g.free_symbols:
+                        raizes, variavel = sp.solve(g, y), x
+                    elif x in g.free_symbols:
+                        raizes, variavel = sp.solve(g, x), None
+                    else:
+                        continue
+                    for raiz in raizes:
+                        argumentos = ([variavel] if variavel is not None else []) + outros
+                        solucoes.append((g, variavel is None, sp.lambdify(argumentos, raiz, modules="numpy")))
+            self._fronteiras[chave] = solucoes
+
+        x_vals = np.asarray(x_vals, dtype=float)
+        valores_fixos = [fixos[simbolo.name] for simbolo in outros]
+        curvas = []
+        with np.errstate(all="ignore"):
+            for g, vertical, funcao in self._fronteiras[chave]:
+                condicao = sp.StrictGreaterThan(g, 0)
+                if vertical:
+                    valor = complex(funcao(*valores_fixos))
+                    if abs(valor.imag) < 1e-9:
+                        curvas.append(CurvaFronteira(condicao, valor.real, None))
+                    continue
+                valores_y = np.asarray(funcao(x_vals.astype(complex), *valores_fixos), dtype=complex)
+                valores_y = np.broadcast_to(valores_y, x_vals.shape)
+                reais = np.where(np.abs(valores_y.imag) < 1e-9 * np.maximum(1.0, np.abs(valores_y.real)),
+                                 valores_y.real, np.nan)
+                curvas.append(CurvaFronteira(condicao, x_vals, reais))
+        return curvas
+
+
+_CACHE = OrderedDict()
+_TRAVA = threading.Lock()
+CAPACIDADE_CACHE = 32
+
+
+def routh_simbolico(coefs):
+    """RouthSimbolico do polinômio, reaproveitado entre chamadas com os mesmos coeficientes (LRU)."""
+    coefs = tuple(_coeficientes_polinomiais(coefs)[0])
+    with _TRAVA:
+        if coefs in _CACHE:
+            _CACHE.move_to_end(coefs)
+            return _CACHE[coefs]
+    analise = RouthSimbolico(list(coefs))
+    with _TRAVA:
+        _CACHE[coefs] = analise
+        while len(_CACHE) > CAPACIDADE_CACHE:
+            _CACHE.popitem(last=False)
+    return analise
+
+
+def routh_pid(num, den):
+    """RouthSimbolico da malha PID + planta num/den, com Kp, Ki e Kd (e os parâmetros da planta) livres."""
+    return routh_simbolico(polinomio_pid_simbolico(num, den))
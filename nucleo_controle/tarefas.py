@@ -0,0 +1,68 @@
+"""Execução de análises em segundo plano para as interfaces gráficas.
+
+O trabalho pesado roda numa thread e publica cada resultado parcial numa
+fila; a interface (Tk via `after`, Kivy via `Clock`) consome a fila no
+próprio laço de eventos e desenha cada seção assim que ela chega. Nenhum
+widget é tocado fora da thread principal.
+"""
+import queue
+import threading
+
+from .rastreio import rastreador
+
+
+class TarefaCancelada(Exception):
+    """Levantada por `Tarefa.verificar` quando o usuário cancela a análise."""
+
+
+class Tarefa:
+    """Uma análise em andamento: thread de trabalho + fila de mensagens + sinal de cancelamento."""
+
+    def __init__(self, alvo, *args):
+        self.fila = queue.Queue()
+        self._cancelar = threading.Event()
+        self._thread = threading.Thread(target=self._executar, args=(alvo,) + args, daemon=True)
+        # Os trechos medidos pela thread ficam na sessão da análise que a criou, mesmo se ela for cancelada
+        self._sessao_rastreio = rastreador.sessao_atual()
+
+    def _executar(self, alvo, *args):
+        rastreador.vincular_thread(self._sessao_rastreio)
+        try:
+            alvo(self, *args)
+        except TarefaCancelada:
+            pass
+        except Exception as e:
+            self.publicar("erro", ("Erro Durante a Análise", f"Ocorreu um erro: {e}"))
+        finally:
+            self.fila.put(("fim", None))
+
+    def iniciar(self):
+        self._thread.start()
+        return self
+
+    def cancelar(self):
+        self._cancelar.set()
+
+    @property
+    def cancelada(self):
+        return self._cancelar.is_set()
+
+    def verificar(self):
+        """Ponto de cancelamento entre etapas do trabalho."""
+        if self._cancelar.is_set():
+            raise TarefaCancelada()
+
+    def publicar(self, tipo, dados=None):
+        if not self._cancelar.is_set():
+            self.fila.put((tipo, dados))
+
+    def mensagens(self):
+        """Esvazia a fila sem bloquear; mensagens de uma tarefa cancelada são descartadas."""
+        while True:
+            try:
+                tipo, dados = self.fila.get_nowait()
+            except queue.Empty:
+                return
+            if self._cancelar.is_set() and tipo != "fim":
+                continue
+            yield tipo, dados
@@ -0,0 +1,243 @@
+"""Execução do PID em tempo discreto, em malha de taxa fixa, com instrumentação.
+
+Os ganhos contínuos (Kp, Ki, Kd) calculados pelas sintonias viram um PID
+discreto com período Ts: derivativo sobre a medição com filtro de primeira
+ordem (Td/N), anti-windup por retrocálculo e transferência sem solavanco
+entre manual e automático.
+
+A planta roda noutro processo (um substituto local do equipamento real),
+discretizada por ZOH, e conversa com o controlador por um par de sockets:
+a cada ciclo o controlador envia u e recebe a nova medição y. O laço do
+controlador agenda cada ciclo num instante absoluto t0 + k*Ts e registra
+o atraso de ativação (jitter), a latência do cálculo, a latência do ciclo
+completo (E/S incluída) e as perdas de prazo, para saber quais taxas
+(1 kHz, 10 kHz, ...) a máquina sustenta.
+
+Uso:
+    python -m nucleo_controle.tempo_real --num 1 --den 1 3 3 1 --ganhos 4.8 2.6 2.2 --taxa 1000 10000
+"""
+import argparse
+import multiprocessing as mp
+import socket
+import struct
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from .otimizacao import discretizar_planta
+
+RelatorioTempoReal = namedtuple("RelatorioTempoReal", [
+    "taxa", "ciclos", "perdas", "jitter_us", "latencia_calculo_us", "latencia_ciclo_us",
+    "tempo", "referencia", "saida", "controle"])
+
+_DOUBLE = struct.Struct("<d")
+PERCENTIS = (50, 90, 99, 99.9, 100)
+
+
+class PIDDiscreto:
+    """PID de posição discretizado com período Ts.
+
+    u = Kp*e + I + D, com e = r - y;
+    D: derivativo sobre a medição (sem chute na mudança de referência),
+       filtrado com constante de tempo Tf (Euler para trás); por padrão
+       Tf = Td/N, ou Ts quando Kp = 0 e Td = Kd/Kp não existe;
+    I: integral por Euler, com retrocálculo (constante Tt) quando u satura
+       em [u_min, u_max];
+    modo manual: a saída é imposta e a integral acompanha, de modo que a
+       volta ao automático não dá salto em u.
+    """
+
+    def __init__(self, Kp, Ki, Kd, Ts, N=10.0, u_min=None, u_max=None, Tt=None, Tf=None):
+        self.Kp, self.Ki, self.Kd, self.Ts = float(Kp), float(Ki), float(Kd), float(Ts)
+        self.u_min = -np.inf if u_min is None else float(u_min)
+        self.u_max = np.inf if u_max is None else float(u_max)
+        Td = self.Kd / self.Kp if self.Kp else 0.0
+        if Tf is None:
+            Tf = Td / N if Td else self.Ts
+        self._ad = Tf / (Tf + self.Ts)
+        self._bd = self.Kd / (Tf + self.Ts)
+        # Tt padrão: média geométrica de Ti e Td (regra usual), ou Ti sem derivativo
+        Ti = self.Kp / self.Ki if self.Ki else np.inf
+        Tt = Tt if Tt else (np.sqrt(Ti * Td) if Td else Ti)
+        # Sem Kp não há Ti nem Td: retrocálculo em um período
+        self._at = self.Ts / (Tt or self.Ts) if np.isfinite(Tt) else 0.0
+        self.integral = self.derivada = 0.0
+        self.y_anterior = None
+        self.automatico = True
+        self.u = 0.0
+
+    @classmethod
+    def de_ft(cls, pid_tf, Ts, **kwargs):
+        """Constrói a partir de ctl.TransferFunction([Kd, Kp, Ki], [1, 0])."""
+        Kd, Kp, Ki = (list(np.atleast_1d(np.squeeze(pid_tf.num[0][0]))) + [0.0, 0.0, 0.0])[:3]
+        return cls(Kp, Ki, Kd, Ts, **kwargs)
+
+    def manual(self, u):
+        self.automatico = False
+        self.u = min(max(float(u), self.u_min), self.u_max)
+
+    def calcular(self, r, y):
+        """Um período do controlador: devolve a ação u (já limitada)."""
+        if self.y_anterior is None:
+            self.y_anterior = y
+        self.derivada = self._ad * self.derivada - self._bd * (y - self.y_anterior)
+        self.y_anterior = y
+        e = r - y
+        if not self.automatico:
+            # Rastreamento: a integral é o que falta para o P + D reproduzirem a saída manual
+            self.integral = self.u - self.Kp * e - self.derivada
+            return self.u
+
+        v = self.Kp * e + self.integral + self.derivada
+        u = min(max(v, self.u_min), self.u_max)
+        self.integral += self.Ki * self.Ts * e + self._at * (u - v)
+        self.u = u
+        return u
+
+    def retomar_automatico(self):
+        """Volta ao automático sem solavanco (a integral já acompanha a saída manual)."""
+        self.automatico = True
+
+
+def _receber(conexao, n):
+    dados = b""
+    while len(dados) < n:
+        parte = conexao.recv(n - len(dados))
+        if not parte:
+            raise ConnectionError("A planta encerrou a conexão.")
+        dados += parte
+    return dados
+
+
+def processo_planta(conexao, A, B, C, D):
+    """Substituto da planta: a cada u recebido avança um período e responde com y.
+
+    Um valor NaN recebido encerra o processo.
+    """
+    x = np.zeros(A.shape[0])
+    try:
+        while True:
+            u = _DOUBLE.unpack(_receber(conexao, _DOUBLE.size))[0]
+            if np.isnan(u):
+                break
+            x = A @ x + B * u
+            conexao.sendall(_DOUBLE.pack(float(C @ x + D * u)))
+    finally:
+        conexao.close()
+
+
+def iniciar_planta(num, den, Ts):
+    """Discretiza num/den (ZOH, período Ts) e sobe o processo da planta; devolve (processo, socket)."""
+    planta = discretizar_planta(num, den, Ts, 0)
+    lado_controle, lado_planta = socket.socketpair()
+    if lado_controle.family == socket.AF_INET:
+        # No Windows o par é TCP local: sem Nagle, cada amostra de 8 bytes sai na hora
+        for lado in (lado_controle, lado_planta):
+            lado.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    processo = mp.Process(target=processo_planta, args=(lado_planta, planta.A, planta.B, planta.C, planta.D),
+                          daemon=True)
+    processo.start()
+    lado_planta.close()
+    return processo, lado_controle
+
+
+def _percentis(amostras_ns):
+    return dict(zip(PERCENTIS, np.percentile(np.asarray(amostras_ns) / 1e3, PERCENTIS)))
+
+
+def executar_malha(pid, conexao, duracao, referencia=1.0, espera_ativa_us=200):
+    """Laço de taxa fixa (período pid.Ts) contra a planta em `conexao`.
+
+    Cada ciclo k é agendado para t0 + k*Ts: dorme até perto do instante e
+    faz espera ativa nos últimos `espera_ativa_us`. Ciclo: mede y (recebe da
+    planta), calcula u, envia u. `referencia` pode ser um número ou uma
+    função r(t). Retorna RelatorioTempoReal com percentis (µs) de jitter e
+    latências e o número de ciclos que terminaram depois do próximo prazo.
+    """
+    Ts_ns = int(round(pid.Ts * 1e9))
+    ciclos = int(round(duracao / pid.Ts))
+    ref = referencia if callable(referencia) else (lambda t, r=float(referencia): r)
+    jitter, lat_calc, lat_ciclo = (np.empty(ciclos, dtype=np.int64) for _ in range(3))
+    tempo, r_log, y_log, u_log = (np.empty(ciclos) for _ in range(4))
+    espera_ns = espera_ativa_us * 1000
+    perdas = 0
+    relogio = time.perf_counter_ns
+
+    conexao.sendall(_DOUBLE.pack(0.0))
+    t0 = relogio() + Ts_ns
+    for k in range(ciclos):
+        prazo = t0 + k * Ts_ns
+        restante = prazo - relogio()
+        if restante > espera_ns:
+            time.sleep((restante - espera_ns) / 1e9)
+        while relogio() < prazo:
+            pass
+        inicio = relogio()
+
+        y = _DOUBLE.unpack(_receber(conexao, _DOUBLE.size))[0]
+        t = (inicio - t0) / 1e9
+        r = ref(t)
+        antes_calculo = relogio()
+        u = pid.calcular(r, y)
+        fim_calculo = relogio()
+        conexao.sendall(_DOUBLE.pack(u))
+        fim = relogio()
+
+        jitter[k] = inicio - prazo
+        lat_calc[k] = fim_calculo - antes_calculo
+        lat_ciclo[k] = fim - inicio
+        perdas += fim > prazo + Ts_ns
+        tempo[k], r_log[k], y_log[k], u_log[k] = t, r, y, u
+
+    _receber(conexao, _DOUBLE.size)
+    return RelatorioTempoReal(1.0 / pid.Ts, ciclos, perdas, _percentis(jitter), _percentis(lat_calc),
+                              _percentis(lat_ciclo), tempo, r_log, y_log, u_log)
+
+
+def testar_taxa(num, den, Kp, Ki, Kd, taxa, duracao=2.0, **kwargs):
+    """Sobe a planta, roda o PID na `taxa` (Hz) por `duracao` segundos e encerra tudo."""
+    Ts = 1.0 / taxa
+    processo, conexao = iniciar_planta(num, den, Ts)
+    try:
+        return executar_malha(PIDDiscreto(Kp, Ki, Kd, Ts, **kwargs), conexao, duracao)
+    finally:
+        try:
+            conexao.sendall(_DOUBLE.pack(float("nan")))
+        except OSError:
+            pass
+        conexao.close()
+        processo.join(timeout=2)
+
+
+def formatar_relatorio(rel):
+    def linha(nome, p):
+        return f"  {nome:<18}" + " ".join(f"p{k:g}={v:9.1f}" for k, v in p.items())
+    sustenta = "sim" if rel.perdas <= 0.001 * rel.ciclos else "não"
+    return "\n".join([
+        f"{rel.taxa:.0f} Hz | {rel.ciclos} ciclos | prazos perdidos: {rel.perdas} "
+        f"({100 * rel.perdas / max(rel.ciclos, 1):.2f}%) | sustenta: {sustenta}",
+        linha("jitter (µs)", rel.jitter_us),
+        linha("cálculo (µs)", rel.latencia_calculo_us),
+        linha("ciclo (µs)", rel.latencia_ciclo_us),
+        f"  saída final y = {rel.saida[-1]:.4f} (referência {rel.referencia[-1]:.4f})",
+    ])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PID discreto em malha de taxa fixa contra uma planta em outro processo.")
+    parser.add_argument("--num", type=float, nargs="+", required=True, help="coeficientes do numerador de G(s)")
+    parser.add_argument("--den", type=float, nargs="+", required=True, help="coeficientes do denominador de G(s)")
+    parser.add_argument("--ganhos", type=float, nargs=3, metavar=("KP", "KI", "KD"), required=True)
+    parser.add_argument("--taxa", type=float, nargs="+", default=[1000.0], help="taxas de amostragem a testar (Hz)")
+    parser.add_argument("--duracao", type=float, default=2.0, help="segundos por taxa")
+    parser.add_argument("--u-max", type=float, default=None, help="saturação simétrica da ação de controle")
+    args = parser.parse_args(argv)
+
+    limites = {} if args.u_max is None else {"u_min": -args.u_max, "u_max": args.u_max}
+    for taxa in args.taxa:
+        print(formatar_relatorio(testar_taxa(args.num, args.den, *args.ganhos, taxa, args.duracao, **limites)), flush=True)
+
+
+if __name__ == "__main__":
+    main()
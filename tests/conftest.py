@@ -0,0 +1,8 @@
+"""Testes do núcleo numérico: cada motor vetorizado é comparado com a referência direta.
+
+Rodar da raiz do repositório com `python -m pytest tests`.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
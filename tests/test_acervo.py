@@ -0,0 +1,109 @@
+"""Acervo de respostas: gravação só por acréscimo, recuperação de gravações interrompidas e buscas."""
+import numpy as np
+import pytest
+
+from nucleo_controle.acervo import INDICE_DTYPE, AcervoRespostas
+
+
+def curvas_aleatorias(rng, quantidade):
+    """(tempo, canais) com tamanhos e números de canais variados, já no dtype do acervo."""
+    curvas = []
+    for _ in range(quantidade):
+        n, canais = int(rng.integers(5, 40)), int(rng.integers(1, 4))
+        curvas.append((np.linspace(0, 1, n).astype("<f4"), rng.standard_normal((canais, n)).astype("<f4")))
+    return curvas
+
+
+def assert_tracos_iguais(acervo, curvas):
+    assert len(acervo) == len(curvas)
+    for i, (tempo, canais) in enumerate(curvas):
+        traco = acervo.traco(i)
+        np.testing.assert_array_equal(traco.tempo, tempo)
+        np.testing.assert_array_equal(traco.canais, canais)
+
+
+def test_gravacao_e_leitura(tmp_path):
+    curvas = curvas_aleatorias(np.random.default_rng(0), 10)
+    with AcervoRespostas(str(tmp_path)) as acervo:
+        for tempo, canais in curvas:
+            acervo.anexar(tempo, *canais)
+        assert_tracos_iguais(acervo, curvas)
+    with AcervoRespostas(str(tmp_path)) as acervo:
+        assert_tracos_iguais(acervo, curvas)
+
+
+def test_reabertura_depois_de_gravacao_interrompida(tmp_path):
+    rng = np.random.default_rng(1)
+    curvas = curvas_aleatorias(rng, 8)
+    with AcervoRespostas(str(tmp_path)) as acervo:
+        for tempo, canais in curvas:
+            acervo.anexar(tempo, *canais, tipo="malha_aberta", Kp=1.0)
+
+    # Interrupção no meio de uma gravação: amostras sem registro (mais bytes soltos) e registro parcial
+    with open(tmp_path / "amostras.bin", "ab") as arquivo:
+        arquivo.write(rng.standard_normal(37).astype("<f4").tobytes() + b"\x01\x02\x03")
+    with open(tmp_path / "indice.bin", "ab") as arquivo:
+        arquivo.write(b"\xff" * (INDICE_DTYPE.itemsize // 2))
+
+    novas = curvas_aleatorias(rng, 5)
+    with AcervoRespostas(str(tmp_path)) as acervo:
+        for tempo, canais in novas:
+            acervo.anexar(tempo, *canais, tipo="malha_aberta", Kp=2.0)
+        assert_tracos_iguais(acervo, curvas + novas)
+    with AcervoRespostas(str(tmp_path)) as acervo:
+        assert_tracos_iguais(acervo, curvas + novas)
+        np.testing.assert_array_equal(acervo.buscar(Kp=(1.5, 2.5)), np.arange(8, 13))
+
+    tamanho = sum((1 + canais.shape[0]) * len(tempo) for tempo, canais in curvas + novas) * 4
+    assert (tmp_path / "amostras.bin").stat().st_size == tamanho
+    assert (tmp_path / "indice.bin").stat().st_size == 13 * INDICE_DTYPE.itemsize
+
+
+def test_anexar_lote_com_metadados_por_curva(tmp_path):
+    rng = np.random.default_rng(2)
+    tempo = np.linspace(0, 5, 50).astype("<f4")
+    valores = rng.standard_normal((6, 2, 50)).astype("<f4")
+    Kp = np.arange(6, dtype=float)
+    with AcervoRespostas(str(tmp_path)) as acervo:
+        acervo.anexar(tempo, valores[0, 0], tipo="malha_aberta")
+        ids = acervo.anexar_lote(tempo, valores, tipo="malha_fechada", Kp=Kp, Ki=0.5, sobressinal=Kp * 3)
+        assert ids == range(1, 7)
+        for j, i in enumerate(ids):
+            traco = acervo.traco(i)
+            np.testing.assert_array_equal(traco.tempo, tempo)
+            np.testing.assert_array_equal(traco.canais, valores[j])
+            assert traco.registro["Kp"] == Kp[j] and traco.registro["Ki"] == 0.5
+            assert np.isnan(traco.registro["Kd"])
+
+        # Tempo próprio de cada curva e um único canal
+        tempos = np.cumsum(rng.uniform(0.1, 1, (3, 20)), axis=1).astype("<f4")
+        um_canal = rng.standard_normal((3, 20)).astype("<f4")
+        for j, i in enumerate(acervo.anexar_lote(tempos, um_canal)):
+            np.testing.assert_array_equal(acervo.traco(i).tempo, tempos[j])
+            np.testing.assert_array_equal(acervo.traco(i).canais, um_canal[j][None])
+
+
+def test_buscar_por_tipo_planta_e_intervalos(tmp_path):
+    tempo = np.linspace(0, 1, 10)
+    with AcervoRespostas(str(tmp_path)) as acervo:
+        planta_a = acervo.registrar_planta([1.0], [1.0, 1.0])
+        planta_b = acervo.registrar_planta([2.0], [1.0, 3.0, 0.0])
+        assert acervo.registrar_planta([1.0], [1.0, 1.0]) == planta_a
+        acervo.anexar_lote(tempo, np.zeros((4, 10)), tipo="malha_fechada", planta=planta_a,
+                           Kp=[1.0, 2.0, 3.0, 4.0], sobressinal=[5.0, 15.0, 8.0, 30.0])
+        acervo.anexar_lote(tempo, np.zeros((3, 10)), tipo="malha_aberta", planta=planta_b, Kp=[1.0, 2.0, 3.0])
+        acervo.anexar(tempo, np.zeros(10), tipo="malha_fechada", planta=planta_b, Kp=2.5, sobressinal=9.0)
+
+        np.testing.assert_array_equal(acervo.buscar("malha_fechada"), [0, 1, 2, 3, 7])
+        np.testing.assert_array_equal(acervo.buscar(planta=planta_b), [4, 5, 6, 7])
+        np.testing.assert_array_equal(acervo.buscar("malha_fechada", sobressinal=(0, 10)), [0, 2, 7])
+        np.testing.assert_array_equal(acervo.buscar(Kp=(2, 3), sobressinal=(0, np.inf)), [1, 2, 7])
+        # Metadado ausente é NaN e não entra em nenhum intervalo
+        np.testing.assert_array_equal(acervo.buscar("malha_aberta", sobressinal=(-np.inf, np.inf)), [])
+        assert acervo.planta(planta_b) == ([2.0], [1.0, 3.0, 0.0])
+
+
+def test_metadado_desconhecido(tmp_path):
+    with AcervoRespostas(str(tmp_path)) as acervo:
+        with pytest.raises(ValueError, match="ganho_extra"):
+            acervo.anexar([0.0, 1.0], [0.0, 1.0], ganho_extra=1.0)
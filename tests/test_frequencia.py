@@ -0,0 +1,91 @@
+"""Ganho último, margens e resposta em frequência contra o ctl.margin e o ctl.TransferFunction."""
+import control as ctl
+import numpy as np
+import pytest
+
+from nucleo_controle.frequencia import analise_frequencia, ganho_ultimo, margens, resposta_frequencia
+
+# Plantas com cruzamento de fase -180°; as duas últimas são instáveis em malha fechada com K = 1
+PLANTAS = [
+    ([1.0], [1.0, 3.0, 3.0, 1.0]),
+    ([2.0], [1.0, 3.0, 2.0, 0.0]),
+    ([1.0, 2.0], [1.0, 6.0, 11.0, 6.0, 0.0]),
+    ([5.0], [1.0, 4.0, 6.0, 4.0, 1.0]),
+    ([1.0, 1.0], [1.0, 2.0, 3.0, 4.0, 1.0]),
+]
+
+
+def assert_igual_ou_ambos_inf(valor, referencia, rtol=1e-6):
+    if np.isfinite(referencia):
+        assert valor == pytest.approx(referencia, rel=rtol)
+    else:
+        assert not np.isfinite(valor)
+
+
+@pytest.mark.parametrize("num, den", PLANTAS)
+def test_ganho_ultimo_igual_ao_ctl_margin(num, den):
+    gm, _, wcg, _ = ctl.margin(ctl.tf(num, den))
+    ponto = ganho_ultimo(num, den)
+    assert ponto.Ku == pytest.approx(gm, rel=1e-6)
+    assert ponto.wu == pytest.approx(wcg, rel=1e-6)
+    assert ponto.Pu == pytest.approx(2 * np.pi / wcg, rel=1e-6)
+    # Com K = Ku a malha fechada tem polos em ±j·wu
+    polos = np.roots(np.polyadd(den, ponto.Ku * np.asarray(num)))
+    assert np.min(np.abs(polos - 1j * ponto.wu)) < 1e-6 * max(1.0, ponto.wu)
+
+
+def test_ganho_ultimo_sem_cruzamento():
+    # Planta simplificada do pêndulo: a fase fica entre -90° e -180° sem cruzar -180°
+    assert ganho_ultimo([3.4653], [1.0, 0.17822, 0.0]) is None
+    assert ganho_ultimo([1.0], [1.0, 1.0]) is None
+
+
+@pytest.mark.parametrize("num, den", PLANTAS)
+def test_margens_iguais_ao_ctl_margin(num, den):
+    gm, pm, wcg, wcp = ctl.margin(ctl.tf(num, den))
+    resultado = margens(num, den)
+    assert_igual_ou_ambos_inf(resultado.ganho, gm)
+    assert_igual_ou_ambos_inf(resultado.fase, pm)
+    if np.isfinite(wcg):
+        assert resultado.w_180 == pytest.approx(wcg, rel=1e-6)
+    if np.isfinite(wcp):
+        assert resultado.w_c == pytest.approx(wcp, rel=1e-6)
+        # Margem de atraso: a menor entre todos os cruzamentos de ganho
+        _, fases, _, _, w_cs, _ = ctl.stability_margins(ctl.tf(num, den), returnall=True)
+        atraso = np.min(np.deg2rad(np.remainder(fases, 360.0)) / w_cs)
+        assert resultado.atraso == pytest.approx(atraso, rel=1e-6)
+
+
+def test_margens_em_lote_iguais_as_individuais():
+    nums = [num for num, _ in PLANTAS]
+    dens = [den for _, den in PLANTAS]
+    lote = margens(nums, dens)
+    individuais = np.array([margens(num, den) for num, den in PLANTAS])
+    np.testing.assert_allclose(np.column_stack(lote), individuais, rtol=1e-9)
+
+
+def test_resposta_frequencia_igual_ao_ctl():
+    w = np.logspace(-2, 2, 50)
+    for num, den in PLANTAS:
+        esperado = ctl.tf(num, den)(1j * w)
+        np.testing.assert_allclose(resposta_frequencia(num, den, w), esperado, rtol=1e-10)
+    lote = resposta_frequencia([num for num, _ in PLANTAS], [den for _, den in PLANTAS], w)
+    assert lote.shape == (len(PLANTAS), len(w))
+
+
+def test_grade_inclui_cruzamentos():
+    num, den = PLANTAS[1]
+    analise = analise_frequencia(num, den)
+    assert np.min(np.abs(analise.w - analise.margens.w_180)) < 1e-9
+    assert np.min(np.abs(analise.w - analise.margens.w_c)) < 1e-9
+
+
+def test_margens_com_numerador_escalar():
+    # num = 2.0 (não [2.0]) era lido como lote e quebrava em _unico
+    esperado = margens([2.0], [1.0, 3.0, 3.0, 1.0])
+    np.testing.assert_equal(margens(2.0, [1.0, 3.0, 3.0, 1.0]), esperado)
+    np.testing.assert_equal(margens(np.float64(2.0), np.array([1.0, 3.0, 3.0, 1.0])), esperado)
+    # Ganho puro: sem cruzamentos, como no ctl.margin
+    np.testing.assert_equal(margens(2.0, 4.0), (np.inf, np.inf, np.inf, np.nan, np.nan))
+    w = np.logspace(-1, 1, 5)
+    np.testing.assert_allclose(resposta_frequencia(2.0, [1.0, 1.0], w), 2.0 / (1j * w + 1.0))
@@ -0,0 +1,47 @@
+"""Malha fechada PID + planta numa só realização contra o ctl.feedback de cada saída."""
+import control as ctl
+import numpy as np
+import pytest
+
+from nucleo_controle.malha_fechada import malha_fechada_pid, simular_malha_fechada
+
+CASOS = [
+    ([3.4653], [1.0, 0.17822, 0.0], 6.0, 2.4, 3.75),
+    ([1.0], [1.0, 3.0, 3.0, 1.0], 1.2, 0.4, 0.9),
+    ([2.0, 1.0], [1.0, 4.0, 5.0, 2.0], 3.0, 1.0, 0.0),
+    ([1.0], [10.0, 1.0], 2.0, 0.5, 0.0),
+]
+
+
+def referencias(num, den, Kp, Ki, Kd):
+    G, C = ctl.tf(num, den), ctl.tf([Kd, Kp, Ki], [1, 0])
+    return {"num_referencia": ctl.feedback(C * G, 1), "num_perturbacao": ctl.feedback(G, C),
+            "num_controle": ctl.feedback(C, G), "num_controle_perturbacao": -ctl.feedback(C * G, 1)}
+
+
+@pytest.mark.parametrize("num, den, Kp, Ki, Kd", CASOS)
+def test_funcoes_de_transferencia_iguais_ao_feedback(num, den, Kp, Ki, Kd):
+    malha = malha_fechada_pid(num, den, Kp, Ki, Kd)
+    s = 1j * np.logspace(-2, 2, 60)
+    for campo, referencia in referencias(num, den, Kp, Ki, Kd).items():
+        G = np.polyval(getattr(malha, campo), s) / np.polyval(malha.den, s)
+        np.testing.assert_allclose(G, referencia(s), rtol=1e-9, atol=1e-12, err_msg=campo)
+
+
+@pytest.mark.parametrize("num, den, Kp, Ki, Kd", CASOS)
+def test_simulacao_igual_ao_step_response(num, den, Kp, Ki, Kd):
+    resposta = simular_malha_fechada(num, den, Kp, Ki, Kd)
+    refs = referencias(num, den, Kp, Ki, Kd)
+    for campo, saida in (("num_referencia", resposta.saida), ("num_perturbacao", resposta.perturbacao),
+                         ("num_controle_perturbacao", resposta.controle_perturbacao)):
+        esperado = np.squeeze(ctl.step_response(refs[campo], T=resposta.tempo).outputs)
+        np.testing.assert_allclose(saida, esperado, atol=1e-8 * max(1.0, np.max(np.abs(esperado))),
+                                   err_msg=campo)
+
+
+def test_metricas_da_resposta():
+    resposta = simular_malha_fechada(*CASOS[0])
+    metricas = resposta.metricas
+    assert metricas["valor_final"] == pytest.approx(1.0, abs=1e-3)
+    assert metricas["sobressinal"] == pytest.approx(max(0.0, np.max(resposta.saida) - 1.0) * 100, rel=1e-3)
+    assert metricas["pico_controle"] == pytest.approx(np.max(np.abs(resposta.controle)))
@@ -0,0 +1,63 @@
+"""Modelo linearizado do pêndulo em lote contra eigvals, matrix_rank e ss2tf matriz a matriz."""
+import numpy as np
+import pytest
+from scipy.signal import ss2tf
+
+from nucleo_controle.pendulo import (PARAMETROS_PADRAO, autovalores_lote, funcoes_transferencia_lote,
+                                     matrizes_lote, postos_lote, raizes_cubica)
+
+
+def parametros_sorteados(N=200, semente=0, **fixos):
+    rng = np.random.default_rng(semente)
+    parametros = {k: v * rng.uniform(0.8, 1.2, N) for k, v in PARAMETROS_PADRAO.items()}
+    parametros.update(fixos)
+    return parametros
+
+
+def postos_referencia(A, B, C):
+    potencias = [np.linalg.matrix_power(A, k) for k in range(4)]
+    controlabilidade = np.concatenate([P @ B for P in potencias], axis=2)
+    observabilidade = np.concatenate([C @ P for P in potencias], axis=1)
+    return np.linalg.matrix_rank(controlabilidade), np.linalg.matrix_rank(observabilidade)
+
+
+def test_matrizes_lote_com_escalares():
+    mats = matrizes_lote()
+    assert mats.A.shape == (1, 4, 4) and mats.B.shape == (1, 4, 1)
+    assert mats.C.shape == (1, 2, 4) and mats.D.shape == (1, 2, 1)
+
+
+def test_autovalores_iguais_ao_eigvals():
+    parametros = parametros_sorteados()
+    A = matrizes_lote(parametros).A
+    # Compara os polinômios com essas raízes: não depende da ordem dos autovalores
+    np.testing.assert_allclose(np.array([np.poly(r) for r in autovalores_lote(parametros)]),
+                               np.array([np.poly(r) for r in np.linalg.eigvals(A)]), rtol=1e-9, atol=1e-9)
+
+
+def test_raizes_cubica_com_raiz_tripla():
+    raizes = raizes_cubica(np.array([3.0]), np.array([3.0]), np.array([1.0]))
+    np.testing.assert_allclose(raizes, -1.0, atol=1e-5)
+
+
+@pytest.mark.parametrize("fixos", [{}, {"m": 0.0}, {"l": 0.0}, {"b": 0.0}])
+def test_postos_iguais_ao_matrix_rank(fixos):
+    mats = matrizes_lote(parametros_sorteados(**fixos))
+    controlabilidade, observabilidade = postos_lote(mats.A, mats.B, mats.C)
+    referencia_c, referencia_o = postos_referencia(mats.A, mats.B, mats.C)
+    np.testing.assert_array_equal(controlabilidade, referencia_c)
+    np.testing.assert_array_equal(observabilidade, referencia_o)
+
+
+def test_funcoes_transferencia_iguais_ao_ss2tf():
+    parametros = parametros_sorteados(N=50)
+    mats = matrizes_lote(parametros)
+    fts = funcoes_transferencia_lote(parametros)
+    # Fora do eixo imaginário e dos polos; as FTs do lote já cancelam o polo e o zero em s = 0
+    s = 0.3 + 1j * np.logspace(-1, 1, 7)
+    for i in range(50):
+        num, den = ss2tf(mats.A[i], mats.B[i], mats.C[i], mats.D[i])
+        for linha, saida in enumerate(("x", "theta")):
+            num_lote, den_lote = fts[saida]
+            np.testing.assert_allclose(np.polyval(num_lote[i], s) / np.polyval(den_lote[i], s),
+                                       np.polyval(num[linha], s) / np.polyval(den, s), rtol=1e-9, err_msg=saida)
@@ -0,0 +1,66 @@
+"""Trechos do rastreador e sessões das tarefas em segundo plano."""
+import threading
+
+import pytest
+
+from nucleo_controle.rastreio import rastreador
+from nucleo_controle.tarefas import Tarefa
+
+
+@pytest.fixture
+def rastreio_ativo(monkeypatch):
+    monkeypatch.setattr(rastreador, "ativo", True)
+    rastreador.iniciar_sessao()
+    yield rastreador
+    rastreador.iniciar_sessao()
+
+
+def nomes(trechos):
+    return [t.nome for t in trechos]
+
+
+def test_trechos_aninhados_guardam_caminho(rastreio_ativo):
+    with rastreio_ativo.trecho("analise"):
+        with rastreio_ativo.trecho("routh"):
+            pass
+    caminhos = {t.nome: t.caminho for t in rastreio_ativo.trechos()}
+    assert caminhos == {"analise": ("analise",), "routh": ("analise", "routh")}
+    assert [(l.nome, l.profundidade) for l in rastreio_ativo.resumo()] == [("analise", 0), ("routh", 1)]
+
+
+def test_trecho_tardio_de_tarefa_cancelada_fica_na_sessao_antiga(rastreio_ativo):
+    liberar = threading.Event()
+
+    def trabalho(tarefa):
+        liberar.wait(5)
+        with rastreador.trecho("etapa_tardia"):
+            pass
+        tarefa.verificar()
+
+    def trabalho_novo(tarefa):
+        with rastreador.trecho("etapa_nova"):
+            pass
+
+    sessao_antiga = rastreio_ativo.sessao_atual()
+    antiga = Tarefa(trabalho).iniciar()
+    antiga.cancelar()
+
+    # Nova análise: sessão nova e uma tarefa que mede a sua etapa
+    rastreio_ativo.iniciar_sessao()
+    Tarefa(trabalho_novo).iniciar()._thread.join(5)
+    liberar.set()
+    antiga._thread.join(5)
+
+    assert nomes(rastreio_ativo.trechos()) == ["etapa_nova"]
+    assert nomes(sessao_antiga) == ["etapa_tardia"]
+
+
+def test_thread_sem_vinculo_grava_na_sessao_atual(rastreio_ativo):
+    def medir():
+        with rastreador.trecho("etapa_thread"):
+            pass
+
+    thread = threading.Thread(target=medir)
+    thread.start()
+    thread.join(5)
+    assert nomes(rastreio_ativo.trechos()) == ["etapa_thread"]
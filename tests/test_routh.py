@@ -0,0 +1,120 @@
+"""Routh-Hurwitz (numérico em lote e simbólico compilado) contra as raízes do np.roots."""
+import numpy as np
+import pytest
+import sympy as sp
+
+from nucleo_controle.polinomios import polinomio_caracteristico_pid
+from nucleo_controle.routh import estavel_routh, mudancas_de_sinal, primeira_coluna_routh, regiao_estabilidade_pid
+from nucleo_controle.routh_simbolico import linhas_classicas, routh_pid, tabela_routh_simbolica
+
+PLANTA_PENDULO = ([3.4653], [1.0, 0.17822, 0.0])
+
+
+def polinomios_aleatorios(rng, grau, N):
+    """N polinômios de grau `grau` com raízes sorteadas (pares conjugados e reais) e líder positivo."""
+    polinomios = []
+    for _ in range(N):
+        pares = rng.uniform(-3, 1, grau // 2) + 1j * rng.uniform(0, 2, grau // 2)
+        raizes = np.concatenate([pares, pares.conj(), rng.uniform(-3, 1, grau % 2)])
+        polinomios.append(rng.uniform(0.5, 3) * np.real(np.poly(raizes)))
+    return np.array(polinomios)
+
+
+def maior_parte_real(coefs):
+    return np.array([np.roots(c).real.max() for c in coefs])
+
+
+@pytest.mark.parametrize("grau", range(1, 9))
+def test_estavel_routh_igual_a_raizes(grau):
+    coefs = polinomios_aleatorios(np.random.default_rng(grau), grau, 500)
+    maior = maior_parte_real(coefs)
+    longe_do_eixo = np.abs(maior) > 1e-3
+    estavel = estavel_routh(coefs)
+    assert np.array_equal(estavel[longe_do_eixo], maior[longe_do_eixo] < 0)
+
+
+@pytest.mark.parametrize("grau", range(2, 9))
+def test_mudancas_de_sinal_contam_polos_no_semiplano_direito(grau):
+    coefs = polinomios_aleatorios(np.random.default_rng(100 + grau), grau, 500)
+    raizes = [np.roots(c) for c in coefs]
+    longe_do_eixo = np.array([np.abs(r.real).min() > 1e-3 for r in raizes])
+    coluna, especial = primeira_coluna_routh(coefs)
+    direita = np.array([np.sum(r.real > 0) for r in raizes])
+    validos = longe_do_eixo & ~especial
+    assert np.array_equal(mudancas_de_sinal(coluna)[validos], direita[validos])
+
+
+def test_primeira_coluna_mantem_forma_do_lote():
+    coefs = polinomios_aleatorios(np.random.default_rng(7), 4, 12).reshape(3, 4, 5)
+    coluna, especial = primeira_coluna_routh(coefs)
+    assert coluna.shape == (3, 4, 5) and especial.shape == (3, 4)
+    assert np.array_equal(estavel_routh(coefs).ravel(), estavel_routh(coefs.reshape(12, 5)))
+
+
+def test_casos_especiais_nunca_estaveis():
+    # Pivô nulo (s³ + s² + s + 1 tem raízes ±j) e linha nula (s⁴ + 5s² + 4)
+    assert not estavel_routh([1.0, 1.0, 1.0, 1.0])
+    assert not estavel_routh([1.0, 0.0, 5.0, 0.0, 4.0])
+    assert not estavel_routh([1.0, 2.0, 0.0, 1.0])
+
+
+def test_regiao_estabilidade_pid_igual_a_raizes():
+    num, den = PLANTA_PENDULO
+    Kp, Ki, Kd = np.linspace(-2, 10, 13), np.linspace(-1, 30, 11), np.linspace(-1, 5, 7)
+    regiao = regiao_estabilidade_pid(num, den, Kp, Ki, Kd, pontos_por_bloco=200)
+    Kp_g, Ki_g, Kd_g = np.meshgrid(Kp, Ki, Kd, indexing="ij")
+    coefs = polinomio_caracteristico_pid(num, den, Kp_g, Ki_g, Kd_g).reshape(-1, 4)
+    maior = maior_parte_real(coefs)
+    longe_do_eixo = np.abs(maior) > 1e-6
+    assert regiao.shape == (13, 11, 7)
+    assert np.array_equal(regiao.ravel()[longe_do_eixo], maior[longe_do_eixo] < 0)
+
+
+def test_routh_simbolico_igual_ao_numerico():
+    num, den = PLANTA_PENDULO
+    rng = np.random.default_rng(3)
+    Kp, Ki, Kd = rng.uniform(-5, 20, 2000), rng.uniform(-5, 60, 2000), rng.uniform(-2, 8, 2000)
+    simbolico = np.asarray(routh_pid(num, den).estavel(Kp=Kp, Ki=Ki, Kd=Kd))
+    coefs = polinomio_caracteristico_pid(num, den, Kp, Ki, Kd)
+    maior = maior_parte_real(coefs)
+    longe_do_eixo = np.abs(maior) > 1e-6
+    assert np.array_equal(simbolico[longe_do_eixo], maior[longe_do_eixo] < 0)
+    assert np.array_equal(simbolico[longe_do_eixo], estavel_routh(coefs)[longe_do_eixo])
+
+
+def tabela_classica(coefs):
+    """Tabela de Routh clássica, com frações exatas (sem pivôs nem linhas nulos)."""
+    n = len(coefs) - 1
+    m = n // 2 + 1
+    linhas = [list(coefs[0::2]), list(coefs[1::2])]
+    linhas = [linha + [sp.Integer(0)] * (m - len(linha)) for linha in linhas][:n + 1]
+    for _ in range(2, n + 1):
+        a, b = linhas[-2], linhas[-1]
+        linhas.append([(b[0] * a[j + 1] - a[0] * b[j + 1]) / b[0] for j in range(m - 1)] + [sp.Integer(0)])
+    return linhas
+
+
+def test_linhas_classicas_iguais_a_tabela_com_fracoes():
+    rng = np.random.default_rng(11)
+    comparadas = 0
+    for _ in range(150):
+        grau = int(rng.integers(2, 8))
+        coefs = [sp.Rational(int(rng.integers(-9, 10)), int(rng.integers(1, 8))) for _ in range(grau + 1)]
+        if coefs[0] == 0:
+            continue
+        tabela = tabela_routh_simbolica(coefs)
+        if tabela.pivos_nulos or tabela.linhas_nulas:
+            continue
+        # Denominadores eliminados antes da tabela: as linhas impressas são as do polinômio original
+        assert linhas_classicas(tabela) == tabela_classica(coefs)
+        comparadas += 1
+    assert comparadas > 100
+
+
+def test_linhas_classicas_do_pendulo_com_ganhos():
+    num, den = PLANTA_PENDULO
+    coefs = polinomio_caracteristico_pid(num, den, 6.0, 2.4, 3.75)
+    linhas = linhas_classicas(tabela_routh_simbolica(list(coefs)))
+    esperado = tabela_classica([sp.Rational(c) for c in coefs])
+    np.testing.assert_allclose(np.array(linhas, dtype=float), np.array(esperado, dtype=float), rtol=1e-12)
+    assert float(linhas[0][0]) == 1.0
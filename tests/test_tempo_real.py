@@ -0,0 +1,39 @@
+"""PID discreto do laço de tempo real."""
+import numpy as np
+import pytest
+
+from nucleo_controle.tempo_real import PIDDiscreto
+
+
+def resposta_derivativa(pid, passos=5):
+    """Parcela derivativa nos períodos seguintes a um degrau unitário na medição (referência 0)."""
+    pid.calcular(0.0, 0.0)
+    derivadas = []
+    for _ in range(passos):
+        pid.calcular(0.0, 1.0)
+        derivadas.append(pid.derivada)
+    return derivadas
+
+
+def test_derivativo_filtrado_com_kp_nulo():
+    # Kp = 0 não tem Td = Kd/Kp; o filtro cai para Tf = Ts em vez de sumir
+    pid = PIDDiscreto(0.0, 0.0, 1.0, Ts=0.01)
+    derivadas = resposta_derivativa(pid)
+    assert derivadas[0] == pytest.approx(-1.0 / (0.01 + 0.01))
+    np.testing.assert_allclose(np.array(derivadas[1:]) / derivadas[:-1], 0.5)
+
+
+def test_tf_explicito_e_padrao_td_sobre_n():
+    explicito = resposta_derivativa(PIDDiscreto(0.0, 0.0, 1.0, Ts=0.01, Tf=0.09))
+    assert explicito[0] == pytest.approx(-1.0 / 0.1)
+    # Kp = 2, Kd = 1: Td = 0.5 e Tf = Td/N = 0.05
+    padrao = resposta_derivativa(PIDDiscreto(2.0, 0.0, 1.0, Ts=0.01, N=10.0))
+    assert padrao[0] == pytest.approx(-1.0 / 0.06)
+
+
+def test_kp_nulo_com_integral_e_saturacao():
+    pid = PIDDiscreto(0.0, 5.0, 0.0, Ts=0.01, u_min=-1.0, u_max=1.0)
+    saidas = [pid.calcular(1.0, 0.0) for _ in range(500)]
+    assert max(saidas) == 1.0
+    # Retrocálculo em um período: a integral fica presa no limite em vez de crescer sem fim
+    assert pid.integral == pytest.approx(1.0 + 5.0 * 0.01, rel=1e-9)